@@ -0,0 +1,347 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import time
+import unittest
+from collections import deque
+from web3_data_center.clients.base_client import BaseClient, RateLimiter, CircuitBreaker
+from web3_data_center.utils.cache import ResponseCache
+
+
+async def _acquire_many(limiter: RateLimiter, count: int):
+    await asyncio.gather(*[limiter.acquire() for _ in range(count)])
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst_within_bucket_does_not_wait(self):
+        limiter = RateLimiter(rpm=600)
+        start = time.monotonic()
+        asyncio.run(_acquire_many(limiter, 100))
+        self.assertLess(time.monotonic() - start, 0.1, "Requests within the bucket should not sleep")
+
+    def test_waiters_sleep_concurrently(self):
+        limiter = RateLimiter(rpm=600)  # 10 tokens per second
+        start = time.monotonic()
+        asyncio.run(_acquire_many(limiter, 605))
+        elapsed = time.monotonic() - start
+        self.assertLess(elapsed, 1.0, "Overflow callers should sleep in parallel, not one after another")
+
+    def test_429_halves_rate_and_honors_retry_after(self):
+        limiter = RateLimiter(rpm=120)
+        limiter.update_from_response(429, {'Retry-After': '2'})
+        self.assertEqual(limiter.rate_limit, 60)
+        self.assertGreater(limiter.blocked_until, time.monotonic() + 1.5)
+
+    def test_rate_never_drops_below_minimum(self):
+        limiter = RateLimiter(rpm=120, min_rpm=50)
+        for _ in range(5):
+            limiter.update_from_response(429, {})
+        self.assertEqual(limiter.rate_limit, 50)
+
+    def test_success_increases_rate_up_to_maximum(self):
+        limiter = RateLimiter(rpm=100, max_rpm=110)
+        for _ in range(1000):
+            limiter.update_from_response(200, {})
+        self.assertEqual(limiter.rate_limit, 110)
+
+    def test_exhausted_remaining_blocks_until_reset(self):
+        limiter = RateLimiter(rpm=120)
+        limiter.update_from_response(200, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '3'})
+        self.assertGreater(limiter.blocked_until, time.monotonic() + 2.5)
+
+    def test_limiter_shared_per_key(self):
+        first = RateLimiter.for_key('test_api:key', rpm=60)
+        second = RateLimiter.for_key('test_api:key', rpm=999)
+        self.assertIs(first, second)
+
+
+class _FakeClient(BaseClient):
+    """BaseClient whose requests complete after a delay taken from the params."""
+
+    def __init__(self, max_concurrent: int = 5):
+        self.max_concurrent = max_concurrent
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self._in_flight = {}
+        self._revalidations = set()
+        self.cache_rules = []
+        self.response_cache = None
+        self.hedge = None
+        self.latencies = deque(maxlen=200)
+        self.hedged_requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def _send_request(self, endpoint, method="GET", params=None, data=None, headers=None, timeout=None):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = params['delay']
+            # Lets a test make only the first attempt slow
+            await asyncio.sleep(delay if self.calls == 1 else params.get('retry_delay', delay))
+            if params.get('fail'):
+                raise ValueError(endpoint)
+            return {'endpoint': endpoint}
+        finally:
+            self.in_flight -= 1
+
+
+class TestConcurrentRequests(unittest.TestCase):
+    def test_results_follow_input_order(self):
+        client = _FakeClient()
+        requests = [(f"/item/{i}", {'delay': 0.05 - i * 0.01}) for i in range(5)]
+        results = asyncio.run(client._make_concurrent_requests(requests))
+        self.assertEqual([r['endpoint'] for r in results], [f"/item/{i}" for i in range(5)])
+
+    def test_failures_keep_their_position(self):
+        client = _FakeClient()
+        requests = [("/ok", {'delay': 0}), ("/bad", {'delay': 0, 'fail': True}), ("/ok2", {'delay': 0})]
+        results = asyncio.run(client._make_concurrent_requests(requests))
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(results[2]['endpoint'], "/ok2")
+
+    def test_stream_attaches_index_and_bounds_window(self):
+        client = _FakeClient(max_concurrent=50)
+        requests = ((f"/item/{i}", {'delay': 0.001}) for i in range(200))
+
+        async def collect():
+            return [item async for item in client._iter_concurrent_requests(requests, window=8)]
+
+        streamed = asyncio.run(collect())
+        self.assertEqual(sorted(index for index, _ in streamed), list(range(200)))
+        self.assertTrue(all(result['endpoint'] == f"/item/{index}" for index, result in streamed))
+        self.assertLessEqual(client.max_in_flight, 8)
+
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_identical_concurrent_requests_share_one_call(self):
+        client = _FakeClient()
+
+        async def fan_out():
+            return await asyncio.gather(*[
+                client._make_request("/token", params={'delay': 0.01}) for _ in range(10)
+            ])
+
+        results = asyncio.run(fan_out())
+        self.assertEqual(client.calls, 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        # Each caller gets its own object, so mutating one result leaves the others alone
+        self.assertEqual(len({id(result) for result in results}), 10)
+        self.assertEqual(client._in_flight, {})
+
+    def test_post_is_not_coalesced_by_default(self):
+        client = _FakeClient()
+
+        async def fan_out():
+            await asyncio.gather(*[
+                client._make_request("/alert", method="POST", params={'delay': 0.01}) for _ in range(3)
+            ])
+
+        asyncio.run(fan_out())
+        self.assertEqual(client.calls, 3)
+
+    def test_different_params_are_not_coalesced(self):
+        client = _FakeClient()
+
+        async def fan_out():
+            await asyncio.gather(
+                client._make_request("/token", params={'delay': 0.01, 'address': 'a'}),
+                client._make_request("/token", params={'delay': 0.01, 'address': 'b'})
+            )
+
+        asyncio.run(fan_out())
+        self.assertEqual(client.calls, 2)
+
+    def test_errors_propagate_to_every_waiter(self):
+        client = _FakeClient()
+
+        async def fan_out():
+            return await asyncio.gather(*[
+                client._make_request("/bad", params={'delay': 0.01, 'fail': True}) for _ in range(3)
+            ], return_exceptions=True)
+
+        results = asyncio.run(fan_out())
+        self.assertEqual(client.calls, 1)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+
+
+class TestResponseCache(unittest.TestCase):
+    def _cached_client(self, rules):
+        client = _FakeClient()
+        client.api_name = 'fake'
+        client.cache_rules = client._parse_cache_rules(rules)
+        client.response_cache = ResponseCache(max_entries=100)
+        return client
+
+    def test_matching_rule_serves_from_cache(self):
+        client = self._cached_client({"/api?action=getcontractcreation": None})
+        params = {'action': 'getcontractcreation', 'delay': 0}
+
+        async def twice():
+            await client._make_request("/api", params=params)
+            return await client._make_request("/api", params=params)
+
+        self.assertEqual(asyncio.run(twice()), {'endpoint': "/api"})
+        self.assertEqual(client.calls, 1)
+
+    def test_rule_query_params_must_match(self):
+        client = self._cached_client({"/api?action=getcontractcreation": None})
+
+        async def twice():
+            for _ in range(2):
+                await client._make_request("/api", params={'action': 'balance', 'delay': 0})
+
+        asyncio.run(twice())
+        self.assertEqual(client.calls, 2)
+
+    def test_stale_entry_is_served_then_refreshed(self):
+        client = self._cached_client({"/prices": {"ttl": 0.01, "stale": 60}})
+
+        async def scenario():
+            await client._make_request("/prices", params={'delay': 0})
+            await asyncio.sleep(0.02)
+            stale = await client._make_request("/prices", params={'delay': 0})
+            await asyncio.sleep(0.01)  # Let the background refresh finish
+            return stale
+
+        self.assertEqual(asyncio.run(scenario()), {'endpoint': "/prices"})
+        self.assertEqual(client.calls, 2)
+
+    def test_callers_mutating_responses_do_not_touch_the_cache(self):
+        client = self._cached_client({"/api?action=getcontractcreation": None})
+        params = {'action': 'getcontractcreation', 'delay': 0}
+
+        async def scenario():
+            fetched = await client._make_request("/api", params=params)
+            fetched['endpoint'] = "changed"
+            hit = await client._make_request("/api", params=params)
+            hit['endpoint'] = "changed again"
+            return await client._make_request("/api", params=params)
+
+        self.assertEqual(asyncio.run(scenario()), {'endpoint': "/api"})
+        self.assertEqual(client.calls, 1)
+
+    def test_background_refresh_is_kept_until_done(self):
+        client = self._cached_client({"/prices": {"ttl": 0.01, "stale": 60}})
+
+        params = {'delay': 0, 'retry_delay': 0.01}  # Only the refresh is slow
+
+        async def scenario():
+            await client._make_request("/prices", params=params)
+            await asyncio.sleep(0.02)
+            await client._make_request("/prices", params=params)
+            pending = len(client._revalidations)
+            await asyncio.sleep(0.03)
+            return pending, len(client._revalidations)
+
+        self.assertEqual(asyncio.run(scenario()), (1, 0))
+
+    def test_uncacheable_responses_are_not_stored(self):
+        client = self._cached_client({"/api?action=getcontractcreation": None})
+        client._is_cacheable = lambda response: response.get('status') == "1"
+        params = {'action': 'getcontractcreation', 'delay': 0}
+
+        async def twice():
+            for _ in range(2):
+                await client._make_request("/api", params=params)
+
+        asyncio.run(twice())
+        self.assertEqual(client.calls, 2)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker('test', failure_threshold=3, reset_timeout=60)
+        for _ in range(2):
+            breaker.record_failure()
+        breaker.record_success()
+        for _ in range(2):
+            breaker.record_failure()
+        self.assertTrue(breaker.allow(), "A success should reset the failure count")
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertGreater(breaker.retry_in(), 59)
+
+    def test_half_open_lets_one_trial_through(self):
+        breaker = CircuitBreaker('test', failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow(), "Only one trial request at a time")
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker('test', failure_threshold=5, reset_timeout=0.01)
+        for _ in range(5):
+            breaker.record_failure()
+        time.sleep(0.02)
+        breaker.allow()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+
+class TestHedgedRequests(unittest.TestCase):
+    def test_slow_request_is_hedged(self):
+        client = _FakeClient()
+        client.hedge = 0.01
+        start = time.monotonic()
+        result = asyncio.run(client._make_request("/slow", params={'delay': 1, 'retry_delay': 0}))
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(result, {'endpoint': "/slow"})
+        self.assertEqual(client.hedged_requests, 1)
+
+    def test_fast_request_is_not_hedged(self):
+        client = _FakeClient()
+        client.hedge = 0.5
+        asyncio.run(client._make_request("/fast", params={'delay': 0}))
+        self.assertEqual((client.calls, client.hedged_requests), (1, 0))
+
+    def test_p95_hedging_waits_for_samples(self):
+        client = _FakeClient()
+        client.hedge = True
+        self.assertIsNone(client._hedge_delay("GET"))
+        client.latencies.extend([0.1] * 19 + [2.0])
+        self.assertEqual(client._hedge_delay("GET"), 0.1)
+        self.assertIsNone(client._hedge_delay("POST"))
+
+
+class _FakeResponse:
+    def __init__(self, body: bytes, content_type: str = 'application/json'):
+        self.body = body
+        self.content_type = content_type
+
+    async def read(self):
+        return self.body
+
+    def get_encoding(self):
+        return 'utf-8'
+
+
+class TestJsonResponse(unittest.TestCase):
+    def test_decodes_raw_body(self):
+        client = _FakeClient()
+        result = asyncio.run(client._handle_json_response(_FakeResponse(b'{"status": "1"}')))
+        self.assertEqual(result, {'status': '1'})
+
+    def test_plain_text_body_is_returned_as_text(self):
+        client = _FakeClient()
+        result = asyncio.run(client._handle_json_response(_FakeResponse(b'Max rate limit reached', 'text/plain')))
+        self.assertEqual(result, 'Max rate limit reached')
+
+    def test_invalid_json_raises_for_retry(self):
+        client = _FakeClient()
+        with self.assertRaises(json.JSONDecodeError):
+            asyncio.run(client._handle_json_response(_FakeResponse(b'<html></html>', 'text/html')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from web3_data_center.utils import cache
+from web3_data_center.utils.cache import LRUCache, SQLiteStore, TxLocation, TxLocationStore, FundingEdgeStore, file_cache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used_by_count(self):
+        lru = LRUCache(max_entries=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertIn("a", lru)
+        self.assertNotIn("b", lru)
+        self.assertEqual(lru.stats()['evictions'], 1)
+
+    def test_evicts_by_approximate_bytes(self):
+        lru = LRUCache(max_entries=100, max_bytes=20000)
+        for i in range(10):
+            lru.set(f"logs:{i}", ["x" * 100] * 20)
+        self.assertLessEqual(lru.total_bytes, 20000)
+        self.assertGreater(lru.stats()['evictions'], 0)
+        self.assertIn("logs:9", lru)
+
+    def test_oversized_entries_are_rejected(self):
+        lru = LRUCache(max_entries=100, max_bytes=1000)
+        lru.set("huge", ["x" * 1000] * 10)
+        self.assertNotIn("huge", lru)
+        self.assertEqual(lru.stats()['rejections'], 1)
+
+    def test_counts_hits_misses_and_expirations(self):
+        lru = LRUCache()
+        lru.set("fresh", 1)
+        lru.set("expiring", 2, ttl=0.01)
+        time.sleep(0.02)
+        lru.get("fresh")
+        lru.get("expiring")
+        lru.get("missing")
+        stats = lru.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['expirations']), (1, 2, 1))
+
+
+class TestSQLiteStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = SQLiteStore(Path(self.tmpdir.name) / "store.sqlite")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        self.store.set("key", {"funder": "0xabc", "depth": 2})
+        self.assertEqual(self.store.get("key"), {"funder": "0xabc", "depth": 2})
+
+    def test_expired_entries_are_dropped_on_read(self):
+        self.store.set("key", "value", ttl=0.01)
+        time.sleep(0.02)
+        self.assertIsNone(self.store.get("key"))
+        self.assertEqual(len(self.store), 0)
+
+    def test_evict_keeps_newest_entries(self):
+        for i in range(5):
+            self.store.set(f"key{i}", i)
+            time.sleep(0.001)
+        self.store.evict(2)
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.get("key4"), 4)
+        self.assertIsNone(self.store.get("key0"))
+
+
+class TestTxLocationStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = TxLocationStore(Path(self.tmpdir.name) / "tx_locations.sqlite")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_lookup_ignores_prefix_and_case(self):
+        tx_hash = "0x" + "ab" * 32
+        self.store.put_many([(tx_hash, 19000000, 7, "eth_block_2024")])
+        self.assertEqual(self.store.get(tx_hash.upper()[2:]), TxLocation(19000000, 7, "eth_block_2024"))
+        self.assertIsNone(self.store.get("0x" + "cd" * 32))
+
+    def test_later_rows_keep_known_index_and_position(self):
+        self.store.put_many([("0x01", 5, 2, "eth_block_2020")])
+        self.store.put_many([("0x01", 5, None, None), ("not hex", 6, None, None)])
+        self.assertEqual(self.store.get("0x01"), TxLocation(5, 2, "eth_block_2020"))
+        self.assertEqual(len(self.store), 1)
+
+    def test_get_many_spans_parameter_chunks(self):
+        hashes = [hex(i) for i in range(1, 2500)]
+        self.assertEqual(self.store.put_many((h, i, 0, None) for i, h in enumerate(hashes)), len(hashes))
+        found = self.store.get_many(hashes + ["0xffffff"])
+        self.assertEqual(len(found), len(hashes))
+        self.assertEqual(found[hashes[-1]].block_number, len(hashes) - 1)
+
+
+class TestFundingEdgeStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = FundingEdgeStore(Path(self.tmpdir.name) / "funding_edges.sqlite", negative_ttl=0.01)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmpdir.cleanup()
+
+    def test_edges_are_keyed_case_insensitively(self):
+        self.store.put_many({"0xAbC": ("0xfunder", "0xtx")})
+        self.assertEqual(self.store.get_many(["0xabc", "0xdef"]), {"0xabc": ("0xfunder", "0xtx")})
+
+    def test_missing_funder_expires_but_edges_do_not(self):
+        self.store.put_many({"0x1": None, "0x2": ("0xfunder", "0xtx")})
+        self.assertEqual(self.store.get_many(["0x1"]), {"0x1": None})
+        time.sleep(0.02)
+        self.assertEqual(self.store.get_many(["0x1", "0x2"]), {"0x2": ("0xfunder", "0xtx")})
+
+
+class TestFileCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        patcher = mock.patch.object(cache, "get_cache_dir", return_value=Path(self.tmpdir.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def test_results_are_cached_across_instances(self):
+        calls = []
+
+        class Service:
+            @file_cache(namespace="test_service", ttl=60)
+            async def lookup(self, address: str):
+                calls.append(address)
+                return None if address == "0x0" else {"address": address}
+
+        async def scenario():
+            first = await Service().lookup("0x1")
+            second = await Service().lookup("0x1")
+            await Service().lookup("0x0")
+            await Service().lookup("0x0")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first, second)
+        self.assertEqual(calls, ["0x1", "0x0"], "None results should be cached too")
+
+    def test_first_argument_of_a_function_is_part_of_the_key(self):
+        calls = []
+
+        # str has a method named "count", which must not make "a" look like a bound instance
+        @file_cache(namespace="test_plain")
+        async def count(text: str, suffix: str):
+            calls.append(text)
+            return text + suffix
+
+        async def scenario():
+            return await count("a", "!"), await count("b", "!")
+
+        self.assertEqual(asyncio.run(scenario()), ("a!", "b!"))
+        self.assertEqual(calls, ["a", "b"])
+
+    def test_cache_clear(self):
+        calls = []
+
+        @file_cache(namespace="test_clear")
+        async def lookup(address: str):
+            calls.append(address)
+            return address
+
+        asyncio.run(lookup("0x1"))
+        lookup.cache_clear()
+        asyncio.run(lookup("0x1"))
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import unittest
+from web3_data_center.clients.funding_client import FundingClient
+from web3_data_center.core.data_center import DataCenter
+from web3_data_center.core.funding_graph import (
+    FundingEdge, FundingForest, FundingGraph, RelationshipSearch, RootFunder, RootResolver
+)
+
+
+class FakeFunding:
+    """First-fund edges from a child -> funder map, recording every batch asked for."""
+
+    def __init__(self, funders, labels=None):
+        self.funders = funders
+        self.labels = labels or {}
+        self.edge_batches = []
+        self.label_batches = []
+
+    async def fetch_edges(self, addresses):
+        self.edge_batches.append(sorted(addresses))
+        return {
+            address: FundingEdge(self.funders[address], f"tx:{address}") if self.funders.get(address) else None
+            for address in addresses
+            # A funder mapped to False stands for a failed lookup
+            if self.funders.get(address) is not False
+        }
+
+    async def fetch_labels(self, addresses):
+        self.label_batches.append(sorted(addresses))
+        return {address.lower(): self.labels[address] for address in addresses if address in self.labels}
+
+    def graph(self):
+        return FundingGraph(self.fetch_edges, self.fetch_labels)
+
+
+class TestFundingGraph(unittest.TestCase):
+    def test_one_batch_per_level_with_shared_funders_resolved_once(self):
+        funding = FakeFunding({'a': 'f', 'b': 'f', 'c': 'g', 'f': 'root', 'g': 'root'})
+        graph = funding.graph()
+
+        levels = asyncio.run(graph.expand(['a', 'b', 'c', 'a'], max_depth=5))
+        self.assertEqual(levels, [['a', 'b', 'c'], ['f', 'g'], ['root']])
+        self.assertEqual(funding.edge_batches, [['a', 'b', 'c'], ['f', 'g'], ['root']])
+        self.assertEqual(funding.label_batches, [['f', 'g'], ['root']])
+
+    def test_tree_matches_the_recursive_format(self):
+        funding = FakeFunding({'a': 'f', 'f': 'root', 'root': 'older'})
+        graph = funding.graph()
+        asyncio.run(graph.expand(['a', 'z'], max_depth=2))
+
+        tree = graph.tree(['a', 'z'], max_depth=2)
+        self.assertIsNone(tree['z'])
+        self.assertEqual(tree['a']['funder'], 'f')
+        self.assertEqual(tree['a']['funded_at'], 'tx:a')
+        self.assertEqual(tree['a']['next_level'], {'funder': 'root', 'funded_at': 'tx:f', 'is_cex': False, 'next_level': {}})
+
+    def test_stops_at_cex_funders(self):
+        funding = FakeFunding({'a': 'binance', 'binance': 'x'}, labels={'binance': {'type': 'CEX'}})
+        graph = funding.graph()
+        levels = asyncio.run(graph.expand(['a'], max_depth=3))
+
+        self.assertEqual(levels, [['a']])
+        node = graph.tree(['a'], max_depth=3)['a']
+        self.assertTrue(node['is_cex'])
+        self.assertIsNone(node['next_level'])
+
+    def test_addresses_are_deduplicated_case_insensitively(self):
+        funding = FakeFunding({'0xAB': 'f'})
+        graph = funding.graph()
+        asyncio.run(graph.expand(['0xAB', '0xab'], max_depth=1))
+        self.assertEqual(funding.edge_batches, [['0xAB']])
+        self.assertEqual(graph.edge('0xab').funder, 'f')
+
+
+class TestRootResolver(unittest.TestCase):
+    def test_walks_share_batches_and_stop_at_resolved_ancestors(self):
+        funding = FakeFunding({'a': 'f', 'b': 'g', 'f': 'h', 'g': 'h', 'h': 'root'})
+        resolver = RootResolver(FundingGraph(funding.fetch_edges))
+
+        roots = asyncio.run(resolver.resolve(['a', 'b'], max_depth=10))
+        self.assertEqual(roots['a'], RootFunder('root', 'tx:h', 3, True))
+        self.assertEqual(roots['b'], RootFunder('root', 'tx:h', 3, True))
+        self.assertEqual(funding.edge_batches, [['a', 'b'], ['f', 'g'], ['h'], ['root']])
+
+        # Every visited address now points straight at its root
+        self.assertEqual(resolver.roots['g'], RootFunder('root', 'tx:h', 2, True))
+        roots = asyncio.run(resolver.resolve(['c', 'f'], max_depth=10))
+        self.assertEqual(funding.edge_batches[-1], ['c'])
+        self.assertIsNone(roots['c'])
+        self.assertEqual(roots['f'].depth, 2)
+
+    def test_max_depth_cuts_the_chain(self):
+        funding = FakeFunding({'a': 'b', 'b': 'c', 'c': 'd'})
+        resolver = RootResolver(FundingGraph(funding.fetch_edges))
+        self.assertEqual(asyncio.run(resolver.resolve(['a'], max_depth=2))['a'], RootFunder('c', 'tx:b', 2, False))
+        # A deeper walk of the same chain picks up where the cut one stopped
+        self.assertEqual(asyncio.run(resolver.resolve(['b'], max_depth=5))['b'], RootFunder('d', 'tx:c', 2, True))
+        self.assertEqual(asyncio.run(resolver.resolve(['a'], max_depth=2))['a'], RootFunder('c', 'tx:b', 2, False))
+
+    def test_failed_lookup_is_not_a_confirmed_root(self):
+        funding = FakeFunding({'a': 'b', 'b': False})
+        resolver = RootResolver(FundingGraph(funding.fetch_edges))
+        self.assertEqual(asyncio.run(resolver.resolve(['a'], max_depth=5))['a'], RootFunder('b', 'tx:a', 1, False))
+
+    def test_empty_addresses_and_funders_end_their_walks(self):
+        async def fetch_edges(addresses):
+            # b's funding tx came back without a funder
+            edges = {'a': FundingEdge('b', 'tx:a'), 'b': FundingEdge('', 'tx:b')}
+            return {address: edges.get(address) for address in addresses}
+
+        resolver = RootResolver(FundingGraph(fetch_edges))
+
+        async def resolve():
+            return await asyncio.wait_for(resolver.resolve(['', None, 'a'], max_depth=5), timeout=5)
+
+        roots = asyncio.run(resolve())
+        self.assertIsNone(roots[''])
+        self.assertIsNone(roots[None])
+        self.assertEqual(roots['a'], RootFunder('b', 'tx:a', 1, False))
+
+
+class TestRelationshipSearch(unittest.TestCase):
+    def test_stops_once_no_deeper_funder_can_be_closer(self):
+        # a and b meet at f after one hop each; the long chain above f is never walked
+        chain = {f"f{i}": f"f{i + 1}" for i in range(20)}
+        funding = FakeFunding({'a': 'f0', 'b': 'f0', **chain})
+        search = RelationshipSearch(funding.graph(), ['a', 'b'])
+
+        relationships = asyncio.run(search.run())
+        rel = relationships[('a', 'b')]
+        self.assertEqual((rel['common_funder1'], rel['depth1'], rel['depth2']), ('f0', 1, 1))
+        self.assertEqual((rel['tx_hash1'], rel['tx_hash2'], rel['common_type']), ('tx:a', 'tx:b', 2))
+        self.assertEqual(funding.edge_batches, [['a', 'b']])
+
+    def test_uneven_meeting_keeps_the_closest(self):
+        # a reaches r at depth 3 and b at depth 1; the later common funder x must not replace it
+        funding = FakeFunding({'a': 'p', 'p': 'q', 'q': 'r', 'r': 'x', 'b': 'r', 'c': 'z'})
+        relationships = asyncio.run(RelationshipSearch(funding.graph(), ['a', 'b', 'c']).run())
+
+        rel = relationships[('a', 'b')]
+        self.assertEqual((rel['common_funder1'], rel['depth1'], rel['depth2']), ('r', 3, 1))
+        self.assertEqual(set(relationships), {('a', 'b')})
+
+    def test_same_entity_counts_as_common_funder(self):
+        labels = {'h1': {'entity': 'Hot Wallets', 'label': 'Hot 1'}, 'h2': {'entity': 'Hot Wallets'}}
+        funding = FakeFunding({'a': 'h1', 'b': 'h2'}, labels=labels)
+        relationships = asyncio.run(RelationshipSearch(funding.graph(), ['b', 'a']).run())
+
+        rel = relationships[('b', 'a')]
+        self.assertEqual((rel['common_funder1'], rel['common_funder2'], rel['common_type']), ('h2', 'h1', 1))
+        self.assertEqual(rel['entity'], 'Hot Wallets')
+
+    def test_paths_stop_at_cex(self):
+        labels = {'ex': {'type': 'CEX'}}
+        funding = FakeFunding({'a': 'ex', 'b': 'y', 'ex': 'y'}, labels=labels)
+        self.assertEqual(asyncio.run(RelationshipSearch(funding.graph(), ['a', 'b']).run()), {})
+        relationships = asyncio.run(RelationshipSearch(funding.graph(), ['a', 'b'], stop_at_cex=False).run())
+        self.assertEqual(relationships[('a', 'b')]['depth1'], 2)
+
+
+class TestDataCenterRelationship(unittest.TestCase):
+    def test_pair_check_goes_through_the_shared_search(self):
+        chain = {f"f{i}": f"f{i + 1}" for i in range(20)}
+        funding = FakeFunding({'a': 'f0', 'b': 'f0', **chain})
+        center = object.__new__(DataCenter)
+        center._fetch_funding_edges = funding.fetch_edges
+        center._fetch_funder_labels = funding.fetch_labels
+
+        calls = []
+        check_many = center.check_funding_relationships
+
+        async def spy(addresses, *args, **kwargs):
+            calls.append(list(addresses))
+            return await check_many(addresses, *args, **kwargs)
+
+        center.check_funding_relationships = spy
+        # Call past the file cache so the lookup really runs
+        check_pair = DataCenter.check_funding_relationship.__wrapped__
+        rel = asyncio.run(check_pair(center, 'a', 'b'))
+
+        self.assertEqual(calls, [['a', 'b']])
+        self.assertEqual((rel['common_funder1'], rel['depth1'], rel['depth2']), ('f0', 1, 1))
+        # Both paths meet after one hop, so the chain above f0 is never fetched
+        self.assertEqual(funding.edge_batches, [['a', 'b']])
+
+
+class TestFundingForest(unittest.TestCase):
+    def _forest(self, funding, addresses, **kwargs):
+        return asyncio.run(FundingForest(funding.graph(), addresses, **kwargs).build())
+
+    def test_one_batch_per_level_for_all_chains(self):
+        funding = FakeFunding({'dev': 'h', 'a': 'dev', 'b': 'x', 'x': 'h', 'c': 'y'})
+        forest = self._forest(funding, ['dev', 'a', 'b', 'c'])
+
+        self.assertEqual(funding.edge_batches, [['a', 'b', 'c', 'dev'], ['h', 'x', 'y']])
+        self.assertEqual(forest.components(), [['dev', 'a', 'b'], ['c']])
+        self.assertEqual(forest.relationship('dev', 'a'),
+                         {'common_funder': 'dev', 'depth1': 0, 'depth2': 1, 'tx_hash1': None, 'tx_hash2': 'tx:a'})
+        self.assertEqual(forest.relationship('dev', 'b'),
+                         {'common_funder': 'h', 'depth1': 1, 'depth2': 2, 'tx_hash1': 'tx:dev', 'tx_hash2': 'tx:x'})
+        self.assertIsNone(forest.relationship('dev', 'c'))
+        self.assertEqual(forest.relationship('dev', 'a', min_depth=1)['common_funder'], 'h')
+
+    def test_common_funder_of_a_component(self):
+        funding = FakeFunding({'a': 'f', 'b': 'g', 'f': 'h', 'g': 'h'})
+        forest = self._forest(funding, ['a', 'b'])
+        self.assertEqual(forest.common_funder(['a', 'b']), {'common_funder': 'h', 'depths': {'a': 2, 'b': 2}})
+
+    def test_cex_funders_do_not_link(self):
+        funding = FakeFunding({'a': 'ex', 'b': 'ex'}, labels={'ex': {'type': 'CEX'}})
+        self.assertEqual(self._forest(funding, ['a', 'b']).components(), [['a'], ['b']])
+        self.assertEqual(self._forest(funding, ['a', 'b'], stop_at_cex=False).components(), [['a', 'b']])
+
+
+class TestFirstFundBatches(unittest.TestCase):
+    def _client(self, fail_batch_with=None):
+        client = FundingClient.__new__(FundingClient)
+        client.semaphore = asyncio.Semaphore(2)
+        client.batch_size = 3
+        client.batches = []
+
+        async def batch_simulate_view_first_fund(addresses):
+            client.batches.append(list(addresses))
+            if fail_batch_with in addresses:
+                raise RuntimeError("rpc down")
+            # Answer out of order to check responses are matched by id
+            responses = [
+                {'id': i + 1, 'result': {'TxnHash': f"tx:{a}", 'From': f"funder:{a}"} if a != 'none' else None}
+                for i, a in enumerate(addresses)
+            ]
+            return responses[::-1]
+
+        client.batch_simulate_view_first_fund = batch_simulate_view_first_fund
+        return client
+
+    def test_batches_are_deduplicated_and_matched_by_id(self):
+        client = self._client()
+        results = asyncio.run(client.get_first_funds(['a', 'b', 'a', 'none', 'c', 'd', 'e']))
+        self.assertEqual(client.batches, [['a', 'b', 'none'], ['c', 'd', 'e']])
+        self.assertEqual(results['c']['From'], "funder:c")
+        self.assertIsNone(results['none'])
+
+    def test_failed_batch_is_left_out(self):
+        client = self._client(fail_batch_with='d')
+        results = asyncio.run(client.get_first_funds(['a', 'b', 'c', 'd']))
+        self.assertEqual(set(results), {'a', 'b', 'c'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import unittest
+from dataclasses import dataclass
+from typing import Optional
+
+from web3_data_center.utils.json_codec import decode_json, convert
+
+
+@dataclass
+class _Pair:
+    chain_id: str
+    price_usd: Optional[str] = None
+
+
+class TestDecodeJson(unittest.TestCase):
+    def test_decodes_bytes_and_str(self):
+        self.assertEqual(decode_json(b'{"a": [1, 2]}'), {'a': [1, 2]})
+        self.assertEqual(decode_json('{"a": null}'), {'a': None})
+
+    def test_malformed_input_raises_json_decode_error(self):
+        with self.assertRaises(json.JSONDecodeError):
+            decode_json(b'<html>rate limited</html>')
+
+    def test_decodes_into_dataclass(self):
+        pair = decode_json(b'{"chain_id": "ethereum", "price_usd": "1.5", "extra": 1}', type=_Pair)
+        self.assertEqual(pair, _Pair(chain_id="ethereum", price_usd="1.5"))
+
+
+if __name__ == '__main__':
+    unittest.main()
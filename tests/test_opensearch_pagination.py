@@ -0,0 +1,679 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from opensearchpy import NotFoundError, TransportError
+from web3_data_center.clients.base_client import RateLimiter
+from web3_data_center.utils.cache import TxLocationStore
+from web3_data_center.clients.opensearch_client import OpenSearchClient, MultiSearchBatcher, BlockIndexRouter
+
+
+class FakeCluster:
+    """In-memory stand-in for AsyncOpenSearch holding one document per block."""
+
+    def __init__(self, numbers, supports_pit=True):
+        self.blocks = [
+            {'_source': {'Number': n, 'Timestamp': n, 'Hash': f"0x{n:x}", 'GasLimit': 30000000, 'GasUsed': 0, 'Miner': "0x0"}}
+            for n in sorted(numbers)
+        ]
+        self.supports_pit = supports_pit
+        self.open_pits = set()
+        self.expire_after = None  # Expire the PIT after this many searches
+        self.searches = 0
+        self.pits_created = 0
+        self.served = set()
+
+    async def create_pit(self, index, keep_alive):
+        if not self.supports_pit:
+            raise NotFoundError(404, 'no handler found')
+        self.pits_created += 1
+        pit_id = f"pit-{len(self.open_pits)}-{self.searches}"
+        self.open_pits.add(pit_id)
+        return {'pit_id': pit_id}
+
+    async def delete_pit(self, body):
+        for pit_id in body['pit_id']:
+            self.open_pits.discard(pit_id)
+
+    async def search(self, body, index=None):
+        self.searches += 1
+        if 'pit' in body:
+            if self.expire_after is not None and self.searches > self.expire_after:
+                self.open_pits.discard(body['pit']['id'])
+                self.expire_after = None
+            if body['pit']['id'] not in self.open_pits:
+                raise NotFoundError(404, 'search_context_missing_exception')
+        after = body.get('search_after', [-1])[0]
+        lo, hi = -1, float('inf')
+        for clause in body.get('query', {}).get('bool', {}).get('filter', []):
+            lo, hi = clause['range']['Number']['gte'], clause['range']['Number']['lte']
+        page = [
+            dict(hit, sort=[hit['_source']['Number']]) for hit in self.blocks
+            if hit['_source']['Number'] > after and lo <= hit['_source']['Number'] <= hi
+        ]
+        page = page[:body['size']]
+        self.served.update(hit['_source']['Number'] for hit in page)
+        return {'hits': {'hits': page}}
+
+
+def make_client(cluster, max_concurrent=8):
+    client = OpenSearchClient.__new__(OpenSearchClient)
+    client.client = cluster
+    client.rate_limiter = RateLimiter(rpm=60000)
+    client.max_concurrent = max_concurrent
+    client.semaphore = asyncio.Semaphore(max_concurrent)
+    client._init_limiter_stats()
+    client.msearch_batcher = MultiSearchBatcher(client._send_msearch, window=0.005, max_batch=50)
+    client.tx_locations = None
+    client.index_router = BlockIndexRouter(client._rate_limited_search)
+    return client
+
+
+async def collect(client, **kwargs):
+    pages = []
+    async for hits, cursor in client.paginate("eth_block", {"query": {"match_all": {}}}, **kwargs):
+        pages.append(([hit['_source']['Number'] for hit in hits], cursor))
+    return pages
+
+
+class TestPaginate(unittest.TestCase):
+    def test_pages_in_block_order_and_closes_pit(self):
+        cluster = FakeCluster(range(10))
+        pages = asyncio.run(collect(make_client(cluster), page_size=4))
+        self.assertEqual([numbers for numbers, _ in pages], [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]])
+        self.assertEqual(pages[0][1], [3])
+        self.assertEqual(cluster.open_pits, set())
+
+    def test_resumes_from_cursor(self):
+        cluster = FakeCluster(range(10))
+        pages = asyncio.run(collect(make_client(cluster), page_size=4, cursor=[5]))
+        self.assertEqual([numbers for numbers, _ in pages], [[6, 7, 8, 9]])
+
+    def test_expired_pit_is_reopened_without_losing_hits(self):
+        cluster = FakeCluster(range(10))
+        cluster.expire_after = 1
+        pages = asyncio.run(collect(make_client(cluster), page_size=3))
+        self.assertEqual(sum((numbers for numbers, _ in pages), []), list(range(10)))
+
+    def test_falls_back_to_search_after_without_pit(self):
+        cluster = FakeCluster(range(5), supports_pit=False)
+        pages = asyncio.run(collect(make_client(cluster), page_size=2, max_pages=2))
+        self.assertEqual([numbers for numbers, _ in pages], [[0, 1], [2, 3]])
+
+    def test_single_page_skips_the_pit(self):
+        cluster = FakeCluster(range(10))
+        pages = asyncio.run(collect(make_client(cluster), page_size=3, max_pages=1))
+        self.assertEqual(pages, [([0, 1, 2], [2])])
+        self.assertEqual((cluster.pits_created, cluster.searches), (0, 1))
+
+
+class TestScanBlocks(unittest.TestCase):
+    def test_slices_cover_range_in_block_order(self):
+        cluster = FakeCluster(range(100, 200))
+        client = make_client(cluster)
+
+        async def scan():
+            numbers = []
+            async for hits, _ in client.scan_blocks("eth_block", {"query": {"match_all": {}}}, 100, 199, slices=7, page_size=5):
+                numbers.extend(hit['_source']['Number'] for hit in hits)
+            return numbers
+
+        self.assertEqual(asyncio.run(scan()), list(range(100, 200)))
+        self.assertEqual(cluster.open_pits, set())
+
+    def test_split_block_range(self):
+        self.assertEqual(OpenSearchClient._split_block_range(0, 9, 3), [(0, 3), (4, 7), (8, 9)])
+        self.assertEqual(OpenSearchClient._split_block_range(5, 6, 4), [(5, 5), (6, 6)])
+
+    def test_sliced_scan_resumes_from_cursor_and_stops_early(self):
+        cluster = FakeCluster(range(50))
+        client = make_client(cluster)
+
+        async def scan():
+            pages = []
+            async for hits, _ in client._block_pages("eth_block", {}, 0, 49, slices=4, cursor=[9], max_pages=2):
+                pages.append([hit['_source']['Number'] for hit in hits])
+            return pages
+
+        pages = asyncio.run(scan())
+        self.assertEqual(len(pages), 2)
+        self.assertEqual(pages[0][0], 10)
+        self.assertEqual(cluster.open_pits, set())
+
+    def test_stopped_scan_closes_every_worker_pit(self):
+        cluster = FakeCluster(range(100))
+        client = make_client(cluster)
+
+        async def scan():
+            pages = client.scan_blocks("eth_block", {"query": {"match_all": {}}}, 0, 99, slices=4, page_size=2)
+            async for _ in pages:
+                # Let every worker open its PIT and fill its buffer before stopping
+                await asyncio.sleep(0.01)
+                break
+            await pages.aclose()
+            return set(cluster.open_pits)
+
+        self.assertEqual(asyncio.run(scan()), set())
+        self.assertGreater(cluster.pits_created, 4)
+
+    def test_later_chunks_progress_while_the_first_is_consumed(self):
+        cluster = FakeCluster(range(200))
+        client = make_client(cluster)
+
+        async def scan():
+            # 8 chunks of 25 blocks, at most 4 fetched ahead of the consumer
+            pages = client.scan_blocks("eth_block", {"query": {"match_all": {}}}, 0, 199,
+                                       slices=2, page_size=5, chunks_per_slice=4)
+            async for hits, _ in pages:
+                await asyncio.sleep(0.05)
+                served = set(cluster.served)
+                break
+            await pages.aclose()
+            return [hit['_source']['Number'] for hit in hits], served
+
+        first_page, served = asyncio.run(scan())
+        self.assertEqual(first_page, [0, 1, 2, 3, 4])
+        # Chunks 1-3 were fetched in full while the consumer held chunk 0's first page
+        self.assertEqual(served, set(range(100)))
+        self.assertEqual(cluster.open_pits, set())
+
+
+class TestStreaming(unittest.TestCase):
+    def test_iter_blocks_brief_yields_bounded_pages(self):
+        client = make_client(FakeCluster(range(25)))
+
+        async def stream():
+            return [page async for page in client.iter_blocks_brief(0, 24, size=10)]
+
+        pages = asyncio.run(stream())
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual(pages[2][-1]['block_number'], 24)
+        self.assertEqual(pages[0][0]['block_hash'], "0x0")
+
+    def test_get_blocks_brief_collects_the_stream(self):
+        client = make_client(FakeCluster(range(25)))
+        blocks = asyncio.run(client.get_blocks_brief(0, 24, size=10))
+        self.assertEqual([block['block_number'] for block in blocks], list(range(25)))
+
+    def test_eth_transfers_batch_streams_in_input_order_and_skips_failures(self):
+        client = make_client(FakeCluster([]))
+        started = []
+
+        async def fake_get_eth_transfers(start_block, end_block, **kwargs):
+            started.append(start_block)
+            await asyncio.sleep(0.01 if start_block == 0 else 0)
+            if start_block == 20:
+                raise ValueError("boom")
+            return [{'BlockNumber': start_block}]
+
+        client.get_eth_transfers = fake_get_eth_transfers
+        ranges = [{'start': i, 'end': i + 9} for i in range(0, 50, 10)]
+
+        async def stream():
+            return [page[0]['BlockNumber'] async for page in client.iter_eth_transfers_batch(ranges, max_parallel=2)]
+
+        self.assertEqual(asyncio.run(stream()), [0, 10, 30, 40])
+        self.assertEqual(sorted(started), [0, 10, 20, 30, 40])
+
+
+class _SlowCluster:
+    def __init__(self, fail_with=None):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_with = fail_with
+
+    async def search(self, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.fail_with is not None:
+                raise self.fail_with
+            return {'hits': {'hits': []}}
+        finally:
+            self.in_flight -= 1
+
+
+class TestLimiter(unittest.TestCase):
+    def test_concurrency_is_bounded_and_reported(self):
+        cluster = _SlowCluster()
+        client = make_client(cluster, max_concurrent=3)
+
+        async def fan_out():
+            tasks = [asyncio.ensure_future(client.search(index="eth_block", body={})) for _ in range(12)]
+            await asyncio.sleep(0.005)
+            depth = client.limiter_stats()['queue_depth']
+            await asyncio.gather(*tasks)
+            return depth
+
+        depth = asyncio.run(fan_out())
+        stats = client.limiter_stats()
+        self.assertEqual(cluster.max_in_flight, 3)
+        self.assertEqual(depth, 9)
+        self.assertEqual((stats['requests'], stats['queue_depth'], stats['in_flight']), (12, 0, 0))
+        self.assertGreater(stats['max_wait'], 0.015)
+
+    def test_429_slows_the_bucket(self):
+        client = make_client(_SlowCluster(fail_with=TransportError(429, 'too_many_requests')))
+        client.rate_limiter = RateLimiter(rpm=600)
+        with self.assertRaises(TransportError):
+            asyncio.run(client.search(index="eth_block", body={}))
+        self.assertEqual(client.rate_limiter.rate_limit, 300)
+        self.assertEqual(client.limiter_stats()['throttled'], 1)
+
+    def test_burst_caps_bucket_capacity(self):
+        limiter = RateLimiter(rpm=600, burst=5)
+        self.assertEqual(limiter.tokens, 5)
+
+
+class TestProjectionProfiles(unittest.TestCase):
+    TX = {'Hash': "0xabc", 'FromAddress': "0x1", 'ToAddress': "0x2", 'Value': "5", 'StorageRead': ["big"]}
+    HIT = {'_source': {'Number': 7, 'Timestamp': 70}, 'inner_hits': {'Transactions': {'hits': {'hits': [{'_source': TX}]}}}}
+
+    def test_minimal_profile_fetches_and_builds_only_its_fields(self):
+        query = OpenSearchClient._build_specific_txs_query("0x2", 0, 10, 100, profile='minimal')
+        inner_source = query['query']['bool']['must'][1]['nested']['inner_hits']['_source']
+        self.assertEqual(inner_source, ["Transactions.FromAddress", "Transactions.Hash", "Transactions.ToAddress", "Transactions.Value"])
+
+        [tx] = OpenSearchClient._process_specific_txs([self.HIT], "0x2", profile='minimal')
+        self.assertEqual(tx, {'block_number': 7, 'timestamp': 70, 'hash': "0xabc", 'from_address': "0x1", 'to_address': "0x2", 'value': "5"})
+
+    def test_full_profile_keeps_every_field(self):
+        query = OpenSearchClient._build_specific_txs_query("0x2", 0, 10, 100)
+        self.assertIs(query['query']['bool']['must'][1]['nested']['inner_hits']['_source'], True)
+        [tx] = OpenSearchClient._process_specific_txs([self.HIT], "0x2")
+        self.assertEqual(len(tx), len(OpenSearchClient.TX_FIELDS) + 2)
+        self.assertEqual(tx['storage_read'], ["big"])
+
+    def test_unknown_profile_is_rejected(self):
+        with self.assertRaises(ValueError):
+            OpenSearchClient._build_specific_txs_query("0x2", 0, 10, 100, profile='everything')
+
+
+class _BalanceCluster:
+    """Answers _msearch lookups of Transactions.Hash with one balance write per hash."""
+
+    def __init__(self):
+        self.msearch_calls = []
+
+    async def msearch(self, body):
+        self.msearch_calls.append(len(body) // 2)
+        responses = []
+        for header, query in zip(body[::2], body[1::2]):
+            tx_hash = query['query']['nested']['query']['term']['Transactions.Hash']['value']
+            if tx_hash == "0xbad":
+                responses.append({'status': 400, 'error': {'type': 'query_shard_exception'}})
+                continue
+            if tx_hash == "0xmissing":
+                responses.append({'status': 404, 'error': {'type': 'index_not_found_exception'}})
+                continue
+            write = {'Address': tx_hash, 'Prev': "1", 'Current': "3"}
+            inner = {'matching_transactions': {'hits': {'hits': [{'_source': {'BalanceWrite': [write]}}]}}}
+            responses.append({'hits': {'total': {'value': 1}, 'hits': [{'inner_hits': inner}]}})
+        return {'responses': responses}
+
+
+class TestMultiSearchBatching(unittest.TestCase):
+    def test_concurrent_point_lookups_share_one_msearch(self):
+        cluster = _BalanceCluster()
+        client = make_client(cluster)
+
+        async def lookups():
+            return await asyncio.gather(*[client.get_native_balance_changes(f"0x{i}") for i in range(20)])
+
+        results = asyncio.run(lookups())
+        self.assertEqual(cluster.msearch_calls, [20])
+        self.assertEqual([changes[0]['address'] for changes in results], [f"0x{i}" for i in range(20)])
+        self.assertEqual(results[0][0]['difference'], 2)
+
+    def test_batches_are_capped_and_errors_stay_with_their_caller(self):
+        cluster = _BalanceCluster()
+        client = make_client(cluster)
+        client.msearch_batcher.max_batch = 4
+
+        async def lookups():
+            hashes = ["0x1", "0xbad", "0x2", "0x3", "0x4", "0x5"]
+            return await asyncio.gather(*[client.get_native_balance_changes(h) for h in hashes], return_exceptions=True)
+
+        results = asyncio.run(lookups())
+        self.assertEqual(cluster.msearch_calls, [4, 2])
+        self.assertIsInstance(results[1], TransportError)
+        self.assertNotIsInstance(results[1], NotFoundError)
+        self.assertEqual(results[2][0]['address'], "0x2")
+
+    def test_missing_index_surfaces_as_not_found(self):
+        client = make_client(_BalanceCluster())
+
+        async def lookup():
+            return await client.point_search("eth_block_missing", {
+                "query": {"nested": {"path": "Transactions", "query": {"term": {"Transactions.Hash": {"value": "0xmissing"}}}}}
+            })
+
+        with self.assertRaises(NotFoundError):
+            asyncio.run(lookup())
+
+
+class _ShardedCluster:
+    """Two yearly indices; answers range aggregations and batched hash lookups."""
+
+    RANGES = {'eth_block_2023': (16000000, 18999999), 'eth_block_2024': (19000000, 21999999)}
+
+    def __init__(self):
+        self.range_loads = 0
+        self.searched_indices = []
+
+    async def search(self, index, body):
+        if 'aggs' not in body:
+            return self._lookup(index, body)
+        self.range_loads += 1
+        buckets = [
+            {'key': name, 'min_block': {'value': low}, 'max_block': {'value': high}}
+            for name, (low, high) in self.RANGES.items()
+        ]
+        return {'aggregations': {'indices': {'buckets': buckets}}}
+
+    async def msearch(self, body):
+        return {'responses': [self._lookup(header['index'], query) for header, query in zip(body[::2], body[1::2])]}
+
+    def _lookup(self, index, query):
+        self.searched_indices.append(index)
+        hashes = query['query']['nested']['query']['terms']['Transactions.Hash']
+        hits = []
+        for tx_hash in hashes:
+            block = int(tx_hash, 16)
+            write = {'Address': "0xabc", 'Prev': str(block), 'Current': str(block + 1)}
+            inner = {'matching_transactions': {'hits': {'hits': [{'_source': {'Hash': tx_hash, 'BalanceWrite': [write]}}]}}}
+            hits.append({'_source': {'Number': block}, 'inner_hits': inner})
+        return {'hits': {'total': {'value': len(hits)}, 'hits': hits}}
+
+
+async def first_page(client, hashes):
+    async for page in client.iter_native_balance_changes(hashes):
+        return page
+
+
+class TestIndexRouting(unittest.TestCase):
+    def test_block_hints_target_one_index_per_group(self):
+        cluster = _ShardedCluster()
+        client = make_client(cluster)
+        hashes = [hex(17000000), hex(20000000), hex(17000001), "0xdead"]
+        hints = {hashes[0]: 17000000, hashes[1]: 20000000, hashes[2]: 17000001}
+
+        async def stream():
+            return [page async for page in client.iter_native_balance_changes(hashes, block_numbers=hints)]
+
+        pages = asyncio.run(stream())
+        self.assertEqual(cluster.searched_indices, ['eth_block_2023', 'eth_block_2024', 'eth_block_*'])
+        self.assertEqual([len(page) for page in pages], [2, 1, 1])
+        self.assertEqual(cluster.range_loads, 1)
+        self.assertEqual(client.msearch_batcher.batches, 0, "Bulk hash batches must not share an _msearch")
+
+    def test_seen_hashes_are_routed_without_a_hint(self):
+        cluster = _ShardedCluster()
+        client = make_client(cluster)
+
+        async def twice():
+            await first_page(client, [hex(20000005)])
+            await first_page(client, [hex(20000005)])
+
+        asyncio.run(twice())
+        self.assertEqual(cluster.searched_indices, ['eth_block_*', 'eth_block_2024'])
+
+    def test_ranges_are_reloaded_after_the_interval(self):
+        cluster = _ShardedCluster()
+        router = BlockIndexRouter(cluster.search, refresh_interval=0)
+
+        async def route_twice():
+            first = await router.route(block_number=16500000)
+            second = await router.route(block_number=30000000)
+            return first, second
+
+        self.assertEqual(asyncio.run(route_twice()), ('eth_block_2023', 'eth_block_*'))
+        self.assertEqual(cluster.range_loads, 2)
+
+    def test_failed_range_load_falls_back_to_pattern(self):
+        async def failing_search(**kwargs):
+            raise TransportError(503, 'unavailable')
+
+        router = BlockIndexRouter(failing_search)
+        self.assertEqual(asyncio.run(router.route(block_number=17000000)), 'eth_block_*')
+
+
+class TestTxLocations(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = TxLocationStore(Path(self.tmpdir.name) / "tx_locations.sqlite")
+        self.addCleanup(self.tmpdir.cleanup)
+        self.addCleanup(self.store.close)
+
+    def _client(self, cluster):
+        client = make_client(cluster)
+        client.tx_locations = self.store
+        client.index_router.locations = self.store
+        return client
+
+    def test_bulk_build_records_every_transaction(self):
+        cluster = FakeCluster(range(100, 120))
+        for hit in cluster.blocks:
+            number = hit['_source']['Number']
+            hit['_index'] = 'eth_block_2024'
+            hit['_source']['Transactions'] = [{'Hash': f"0x{number:x}{i:02x}"} for i in range(3)]
+        client = self._client(cluster)
+
+        recorded = asyncio.run(client.build_tx_index(100, 119, slices=3, page_size=4))
+        self.assertEqual(recorded, 60)
+        self.assertEqual(len(self.store), 60)
+        self.assertEqual(tuple(self.store.get(f"0x{110:x}02")), (110, 2, 'eth_block_2024'))
+
+    def test_transfer_streams_record_locations(self):
+        cluster = FakeCluster(range(3))
+        for hit in cluster.blocks:
+            number = hit['_source']['Number']
+            tx = {'Hash': f"0x{number:x}aa", 'FromAddress': "0x1", 'ToAddress': "0x2", 'Value': "1"}
+            hit['inner_hits'] = {'parent_txs': {'hits': {'hits': [{'_source': tx, '_nested': {'offset': 4}}]}}}
+        client = self._client(cluster)
+
+        async def stream():
+            return [page async for page in client.iter_eth_transfers(0, 2, size=10)]
+
+        asyncio.run(stream())
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(tuple(self.store.get("0x1aa"))[:2], (1, 4))
+
+    def test_known_hashes_search_only_their_index(self):
+        cluster = _ShardedCluster()
+        client = self._client(cluster)
+        self.store.put_many([(hex(17000000), 17000000, 0, 'eth_block_2023')])
+
+        async def stream():
+            return [page async for page in client.iter_native_balance_changes([hex(17000000), hex(20000000)])]
+
+        asyncio.run(stream())
+        self.assertEqual(cluster.searched_indices, ['eth_block_2023', 'eth_block_*'])
+        self.assertEqual(cluster.range_loads, 0, "A stored index name needs no range lookup")
+        self.assertEqual(self.store.get(hex(20000000)).block_number, 20000000)
+
+
+class _AggCluster:
+    """
+    Answers aggregation searches; composite pages are served from ``addresses``.
+
+    Addresses in ``unmatched`` have nested docs, but none passing the bucket filter.
+    """
+
+    def __init__(self, addresses=(), unmatched=()):
+        self.unmatched = set(unmatched)
+        self.addresses = sorted(set(addresses) | self.unmatched)
+        self.bodies = []
+
+    async def search(self, index, body):
+        self.bodies.append(body)
+        aggs = body['aggs']['nested']['aggs']
+        if 'groups' not in aggs:
+            return {'aggregations': {'nested': {'doc_count': 120, 'filtered': {'doc_count': 42, 'users': {'value': 7}}}}}
+        composite = aggs['groups']['composite']
+        after = composite.get('after', {}).get('address', '')
+        page = [a for a in self.addresses if a > after][:composite['size']]
+        buckets = []
+        for a in page:
+            matched = {'doc_count': 0, 'total_value': {'value': 0.0}} if a in self.unmatched else \
+                {'doc_count': 2, 'total_value': {'value': 5.0}}
+            buckets.append({'key': {'address': a}, 'doc_count': 3, 'matched': matched})
+        groups = {'buckets': buckets}
+        if buckets:
+            groups['after_key'] = buckets[-1]['key']
+        return {'aggregations': {'nested': {'doc_count': 0, 'groups': groups}}}
+
+
+class TestAggregations(unittest.TestCase):
+    def test_contract_stats_are_computed_on_the_cluster(self):
+        cluster = _AggCluster()
+        client = make_client(cluster)
+
+        stats = asyncio.run(client.get_contract_tx_stats("0xABC", start_block=1, end_block=9))
+        self.assertEqual(stats, {'tx_count': 42, 'user_count': 7})
+        body = cluster.bodies[0]
+        self.assertEqual(body['size'], 0)
+        self.assertEqual(body['aggs']['nested']['nested'], {'path': 'Transactions'})
+        self.assertEqual(body['aggs']['nested']['aggs']['filtered']['filter'], {'term': {'Transactions.ToAddress': '0xabc'}})
+        self.assertEqual(body['query']['bool']['filter'][0], {'range': {'Number': {'gte': 1, 'lte': 9}}})
+
+    def test_composite_pages_until_exhausted(self):
+        addresses = [f"0x{i:02x}" for i in range(25)]
+        cluster = _AggCluster(addresses)
+        client = make_client(cluster)
+
+        async def stream():
+            return [page async for page in client.iter_eth_moved_by_address(1, 9, page_size=10)]
+
+        pages = asyncio.run(stream())
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertEqual([row['address'] for page in pages for row in page], addresses)
+        self.assertEqual(pages[0][0], {'address': '0x00', 'tx_count': 2, 'total_value': 5.0})
+        self.assertEqual(cluster.bodies[1]['aggs']['nested']['aggs']['groups']['composite']['after'],
+                         {'address': '0x09'})
+
+    def test_composite_sits_right_under_nested_with_the_filter_per_bucket(self):
+        cluster = _AggCluster([f"0x{i:02x}" for i in range(4)], unmatched=["0x01", "0x02"])
+        client = make_client(cluster)
+
+        async def stream():
+            return [page async for page in client.iter_eth_moved_by_address(1, 9, page_size=2)]
+
+        pages = asyncio.run(stream())
+        # The page holding only unmatched addresses is skipped, not the rest of the scan
+        self.assertEqual([[row['address'] for row in page] for page in pages], [['0x00'], ['0x03']])
+        nested = cluster.bodies[0]['aggs']['nested']
+        self.assertEqual(nested['nested'], {'path': 'Transactions'})
+        self.assertEqual(set(nested['aggs']), {'groups'})
+        groups = nested['aggs']['groups']
+        self.assertIn('composite', groups)
+        matched = groups['aggs']['matched']
+        self.assertEqual(matched['filter']['bool']['filter'][0], {'range': {'Transactions.Value': {'gt': 0}}})
+        self.assertEqual(matched['aggs'], {'total_value': {'sum': {'field': 'Transactions.Value'}}})
+
+    def test_invalid_side_is_rejected(self):
+        client = make_client(_AggCluster())
+
+        async def stream():
+            async for _ in client.iter_eth_moved_by_address(1, 9, side="both"):
+                pass
+
+        with self.assertRaises(ValueError):
+            asyncio.run(stream())
+
+
+class _TailCluster:
+    """Blocks appear as tests add them, in any order."""
+
+    def __init__(self, numbers=()):
+        self.numbers = set(numbers)
+
+    def _block(self, number):
+        log = {'Address': f"0xlog{number}"}
+        return {'Number': number, 'Transactions': [{'Hash': f"0xtx{number}", 'Logs': [log]}]}
+
+    async def search(self, index, body):
+        numbers = sorted(self.numbers)
+        if body['sort'][0]['Number']['order'] == 'desc':
+            numbers = numbers[::-1]
+        else:
+            after = body.get('search_after', [body['query']['bool']['filter'][0]['range']['Number']['gt']])[0]
+            skip = set(body['query']['bool'].get('must_not', [{'terms': {'Number': []}}])[0]['terms']['Number'])
+            numbers = [n for n in numbers if n > after and n not in skip]
+        return {'hits': {'hits': [{'_source': self._block(n), 'sort': [n]} for n in numbers[:body['size']]]}}
+
+
+class TestBlockTailer(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.checkpoint_path = Path(self.tmpdir.name) / "tailer.json"
+
+    def _tailer(self, cluster, **kwargs):
+        return make_client(cluster).tailer(self.checkpoint_path, page_size=2, **kwargs)
+
+    def test_starts_at_head_and_streams_to_consumers(self):
+        cluster = _TailCluster(range(100, 105))
+        tailer = self._tailer(cluster)
+        blocks, txs, logs = [], [], []
+        tailer.subscribe(lambda block: blocks.append(block['Number']))
+        tailer.subscribe(lambda tx, block: txs.append(tx['Hash']), kind="transaction")
+
+        async def on_log(log, tx, block):
+            logs.append(log['Address'])
+        tailer.subscribe(on_log, kind="log")
+
+        self.assertEqual(asyncio.run(tailer.poll()), 0)
+        cluster.numbers.update(range(105, 110))
+        self.assertEqual(asyncio.run(tailer.poll()), 5)
+        self.assertEqual(blocks, list(range(105, 110)))
+        self.assertEqual(txs[0], "0xtx105")
+        self.assertEqual(logs[-1], "0xlog109")
+        self.assertEqual(json.loads(self.checkpoint_path.read_text()), {'checkpoint': 109, 'delivered': []})
+
+    def test_late_blocks_are_delivered_once(self):
+        cluster = _TailCluster([1, 2, 4, 5])
+        tailer = self._tailer(cluster, start_block=1)
+        delivered = []
+        tailer.subscribe(lambda block: delivered.append(block['Number']))
+
+        asyncio.run(tailer.poll())
+        self.assertEqual((tailer.checkpoint, tailer.delivered), (2, {4, 5}))
+        cluster.numbers.add(3)
+        asyncio.run(tailer.poll())
+        self.assertEqual(delivered, [1, 2, 4, 5, 3])
+        self.assertEqual((tailer.checkpoint, tailer.delivered), (5, set()))
+
+    def test_gap_is_skipped_after_timeout(self):
+        tailer = self._tailer(_TailCluster([1, 3]), start_block=1, late_block_timeout=0)
+        asyncio.run(tailer.poll())
+        self.assertEqual(tailer.checkpoint, 1)
+        asyncio.run(tailer.poll())
+        self.assertEqual(tailer.checkpoint, 3)
+
+    def test_restart_resumes_and_failed_block_is_retried(self):
+        cluster = _TailCluster(range(1, 5))
+        tailer = self._tailer(cluster, start_block=1)
+
+        def fail_on_three(block):
+            if block['Number'] == 3:
+                raise RuntimeError("consumer down")
+        tailer.subscribe(fail_on_three)
+        with self.assertRaises(RuntimeError):
+            asyncio.run(tailer.poll())
+
+        restarted = self._tailer(cluster)
+        delivered = []
+        restarted.subscribe(lambda block: delivered.append(block['Number']))
+        asyncio.run(restarted.poll())
+        self.assertEqual(delivered, [3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
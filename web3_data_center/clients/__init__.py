@@ -1,4 +1,4 @@
-from .base_client import BaseClient
+from .base_client import BaseClient, SessionRegistry, CircuitBreaker, CircuitOpenError
 from .geckoterminal_client import GeckoTerminalClient
 from .gmgn_api_client import GMGNAPIClient
 from .birdeye_client import BirdeyeClient
@@ -15,6 +15,9 @@ from .database.web3_label_client import Web3LabelClient
 
 __all__ = [
     'BaseClient',
+    'SessionRegistry',
+    'CircuitBreaker',
+    'CircuitOpenError',
     'GeckoTerminalClient',
     'GMGNAPIClient',
     'BirdeyeClient',
@@ -6,42 +6,291 @@ from aiohttp import ClientTimeout
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 import asyncio
+import copy
 import requests
 import time
-from typing import Dict, Any, Optional
+import weakref
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Set, Union, Iterable, AsyncIterator
 import logging
 import json
 
+from ..utils.cache import ResponseCache
+from ..utils.json_codec import decode_json, convert
+
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
 class RateLimiter:
-    def __init__(self, rpm: int = 120):
-        self.rate_limit = rpm
+    """
+    Adaptive token bucket shared by every client that uses the same API key.
+
+    The refill rate follows AIMD: it grows additively on successful responses up to
+    ``max_rpm`` and halves on 429s, never dropping below ``min_rpm``. ``Retry-After``
+    and ``X-RateLimit-Remaining``/``X-RateLimit-Reset`` headers pause the bucket until
+    the provider's window reopens.
+
+    Tokens are reserved synchronously and callers sleep outside of any lock, so one
+    waiting caller never blocks the others from reserving their own slot.
+    """
+
+    _instances: Dict[str, 'RateLimiter'] = {}
+
+    def __init__(self, rpm: int = 120, min_rpm: Optional[int] = None, max_rpm: Optional[int] = None,
+                 burst: Optional[int] = None):
+        self.rate_limit = float(rpm)
+        self.min_rate = float(min_rpm or max(1, rpm // 10))
+        self.max_rate = float(max_rpm or rpm * 2)
+        self.increase_step = max(1.0, rpm * 0.1)  # rpm gained per minute of clean responses
         self.time_period = 60.0  # 1 minute in seconds
-        self.tokens = rpm
-        self.updated_at = asyncio.get_event_loop().time()
-        self.lock = asyncio.Lock()
+        # Bucket capacity; defaults to a full minute of requests
+        self.burst = float(burst) if burst else None
+        self.tokens = min(float(rpm), self.burst or float(rpm))
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    @classmethod
+    def for_key(cls, key: str, rpm: int = 120, min_rpm: Optional[int] = None, max_rpm: Optional[int] = None,
+                burst: Optional[int] = None) -> 'RateLimiter':
+        """Get the limiter shared by all clients using ``key``, creating it if needed."""
+        if key not in cls._instances:
+            cls._instances[key] = cls(rpm, min_rpm=min_rpm, max_rpm=max_rpm, burst=burst)
+        return cls._instances[key]
+
+    def _refill(self, now: float):
+        time_passed = now - self.updated_at
+        capacity = min(self.rate_limit, self.burst) if self.burst else self.rate_limit
+        self.tokens = min(capacity, self.tokens + time_passed * (self.rate_limit / self.time_period))
+        self.updated_at = now
 
     async def acquire(self):
-        async with self.lock:
-            now = asyncio.get_event_loop().time()
-            time_passed = now - self.updated_at
-            self.tokens += time_passed * (self.rate_limit / self.time_period)
-            if self.tokens > self.rate_limit:
-                self.tokens = self.rate_limit
-            self.updated_at = now
-
-            if self.tokens < 1:
-                wait_time = (1 - self.tokens) * (self.time_period / self.rate_limit)
-                await asyncio.sleep(wait_time)
-                self.tokens = 0
-                self.updated_at = asyncio.get_event_loop().time()
-            else:
-                self.tokens -= 1
+        # No await happens between refill and reservation, so this is atomic on the event loop
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= 1
+        wait_time = max(0.0, self.blocked_until - now)
+        if self.tokens < 0:
+            wait_time = max(wait_time, -self.tokens * (self.time_period / self.rate_limit))
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+    def update_from_response(self, status: int, headers: Optional[Dict[str, str]] = None):
+        """Adjust the refill rate from a provider response."""
+        headers = headers or {}
+        now = time.monotonic()
+        self._refill(now)
+
+        if status == 429:
+            self.rate_limit = max(self.min_rate, self.rate_limit / 2)
+            self.tokens = min(self.tokens, 0.0)
+            retry_after = _parse_retry_after(headers.get('Retry-After'))
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            logger.warning(f"Rate limited (429), reducing rate to {self.rate_limit:.1f} rpm")
+            return
+
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is not None:
+            try:
+                remaining = int(float(remaining))
+            except ValueError:
+                remaining = None
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+            if remaining <= 0:
+                reset = headers.get('X-RateLimit-Reset')
+                try:
+                    reset = float(reset) if reset is not None else None
+                except ValueError:
+                    reset = None
+                if reset is not None:
+                    # Providers send either an epoch timestamp or seconds until reset
+                    delay = reset - time.time() if reset > 1e9 else reset
+                    self.blocked_until = max(self.blocked_until, now + max(0.0, delay))
+                return
+
+        if 200 <= status < 300 and self.rate_limit < self.max_rate:
+            self.rate_limit = min(self.max_rate, self.rate_limit + self.increase_step / self.rate_limit)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while a provider's circuit is open."""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"Circuit for {provider} is open, retry in {retry_in:.1f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker shared by every client talking to that provider.
+
+    closed: requests flow and consecutive failures are counted. After
+    ``failure_threshold`` of them the circuit opens and requests fail fast with
+    CircuitOpenError for ``reset_timeout`` seconds. It then goes half-open and lets a
+    single trial request through: success closes the circuit, failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    _instances: Dict[str, 'CircuitBreaker'] = {}
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started_at: Optional[float] = None
+
+    @classmethod
+    def for_key(cls, key: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> 'CircuitBreaker':
+        """Get the breaker shared by all clients using ``key``, creating it if needed."""
+        if key not in cls._instances:
+            cls._instances[key] = cls(key, failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+        return cls._instances[key]
+
+    def retry_in(self) -> float:
+        """Seconds until the next request would be let through (0 if one would be now)."""
+        now = time.monotonic()
+        if self.state == self.OPEN:
+            return max(0.0, self.opened_at + self.reset_timeout - now)
+        if self.state == self.HALF_OPEN and self.trial_started_at is not None:
+            # A trial that never reported back expires so the circuit cannot wedge
+            return max(0.0, self.trial_started_at + self.reset_timeout - now)
+        return 0.0
+
+    def available(self) -> bool:
+        """Whether a request would currently be let through, without claiming it."""
+        return self.retry_in() == 0.0
+
+    def allow(self) -> bool:
+        """Claim permission to send a request."""
+        if not self.available():
+            return False
+        if self.state != self.CLOSED:
+            self.state = self.HALF_OPEN
+            self.trial_started_at = time.monotonic()
+        return True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trial_started_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} consecutive failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.trial_started_at = None
+
+
+class SessionRegistry:
+    """
+    Process-wide registry of pooled aiohttp sessions.
+
+    Clients attached to a registry share one TCPConnector per event loop, so
+    DNS lookups, TLS handshakes and keep-alive connections are reused across
+    every provider instead of each client building its own pool.
+    """
+
+    _shared: Optional['SessionRegistry'] = None
+
+    DEFAULT_SETTINGS = {
+        'limit': 200,               # Total simultaneous connections
+        'limit_per_host': 20,       # Connections kept per provider host
+        'ttl_dns_cache': 300,       # Seconds to cache DNS lookups
+        'keepalive_timeout': 60,    # Seconds an idle connection stays open
+    }
+
+    def __init__(self, **settings):
+        self.settings = {**self.DEFAULT_SETTINGS, **settings}
+        self._sessions = weakref.WeakKeyDictionary()  # event loop -> ClientSession
+
+    @classmethod
+    def shared(cls) -> 'SessionRegistry':
+        """Return the process-wide registry, creating it on first use."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def configure(self, **settings):
+        """Override connector settings. Only affects sessions created afterwards."""
+        self.settings.update({k: v for k, v in settings.items() if v is not None})
+
+    def _build_connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit=self.settings['limit'],
+            limit_per_host=self.settings['limit_per_host'],
+            ttl_dns_cache=self.settings['ttl_dns_cache'],
+            use_dns_cache=True,
+            keepalive_timeout=self.settings['keepalive_timeout'],
+            force_close=False,  # Keep HTTP/1.1 connections alive between requests
+            enable_cleanup_closed=True
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the pooled session bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(connector=self._build_connector())
+            self._sessions[loop] = session
+        return session
+
+    async def close(self):
+        """Close the session owned by the running event loop."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+
 
 class BaseClient:
+    # Latency SLOs (total seconds) keyed by endpoint prefix; subclasses override.
+    # Entries under api.<name>.timeouts.endpoints in config.yml take precedence.
+    ENDPOINT_TIMEOUTS: Dict[str, float] = {}
+    # Methods whose concurrent identical requests share one in-flight call. Only
+    # idempotent reads belong here; read-only JSON-RPC clients may add "POST".
+    COALESCE_METHODS = ("GET",)
+    # Response cache policy keyed by endpoint prefix, optionally with required query
+    # params (e.g. "/api?action=getcontractcreation"). A value is either the fresh TTL
+    # in seconds or {"ttl": ..., "stale": ...}; a TTL of None caches forever and 0
+    # disables caching. Entries under api.<name>.cache in config.yml take precedence.
+    CACHE_TTLS: Dict[str, Any] = {}
+    CACHEABLE_METHODS = ("GET",)
+    # Idempotent methods that may be hedged when api.<name>.hedge is set in config.yml
+    HEDGE_METHODS = ("GET",)
+    # Latency samples needed before the p95 hedge delay is trusted
+    HEDGE_MIN_SAMPLES = 20
+    # Decodes raw response bytes; orjson/msgspec when installed, stdlib json otherwise
+    json_decoder = staticmethod(decode_json)
 
     def __init__(self, api_name: str, config_path: str = "config.yml", credentials_source: str = "config", api_key_env: Optional[str] = None, use_proxy: bool = False, use_zenrows: bool = False):
         self.config = self.load_config(config_path)
@@ -53,10 +302,40 @@ class BaseClient:
         self.zenrows_api_key = self.config['zenrows']['api_key'] if use_zenrows else None
         self.proxy = 'http://127.0.0.1:7890' if use_proxy else None
         self.headers = self._set_auth_headers()
-        rpm = self.config['api'][api_name].get('rpm', 120)  # Default to 120 RPM if not specified
-        self.rate_limiter = RateLimiter(rpm)
-        self.semaphore = asyncio.Semaphore(self.config['api'][api_name].get('max_concurrent', 5))
+        api_config = self.config['api'][api_name]
+        rpm = api_config.get('rpm', 120)  # Default to 120 RPM if not specified
+        # Clients sharing an API key share one limiter, since the provider counts them together
+        limiter_key = f"{api_name}:{self.credentials.get('api_key') or ''}"
+        self.rate_limiter = RateLimiter.for_key(
+            limiter_key, rpm, min_rpm=api_config.get('min_rpm'), max_rpm=api_config.get('max_rpm')
+        )
+        self.max_concurrent = api_config.get('max_concurrent', 5)
+        self.semaphore = asyncio.Semaphore(self.max_concurrent)
         self.session = None
+        self.session_registry: Optional[SessionRegistry] = None
+        timeouts = self.config['api'][api_name].get('timeouts', {})
+        self.default_timeout = ClientTimeout(
+            total=timeouts.get('total', 30),
+            connect=timeouts.get('connect', 10),
+            sock_read=timeouts.get('read', 30)
+        )
+        self.endpoint_timeouts = {**self.ENDPOINT_TIMEOUTS, **timeouts.get('endpoints', {})}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        # Background stale-while-revalidate refreshes, referenced until they finish
+        self._revalidations: Set[asyncio.Future] = set()
+        self.cache_rules = self._parse_cache_rules({**self.CACHE_TTLS, **api_config.get('cache', {})})
+        self.response_cache = ResponseCache.shared(self.config.get('response_cache')) if self.cache_rules else None
+        # Requests through zenrows fail together when the proxy degrades, so they get their own circuit
+        breaker_config = api_config.get('circuit_breaker', {})
+        self.circuit_breaker = CircuitBreaker.for_key(
+            f"{api_name}+zenrows" if use_zenrows else api_name,
+            failure_threshold=breaker_config.get('failure_threshold', 5),
+            reset_timeout=breaker_config.get('reset_timeout', 30.0)
+        )
+        # true hedges after the observed p95 latency, a number after that many seconds
+        self.hedge = api_config.get('hedge')
+        self.latencies = deque(maxlen=200)
+        self.hedged_requests = 0
 
     async def __aenter__(self):
         """Async context manager entry"""
@@ -68,9 +347,21 @@ class BaseClient:
 
     async def close(self):
         """Close the client and cleanup resources"""
-        if self.session:
+        # Sessions handed out by a registry are owned by the registry
+        if self.session and self.session_registry is None:
             await self.session.close()
-            self.session = None
+        self.session = None
+
+    def use_session_registry(self, registry: SessionRegistry):
+        """Route this client's requests through a shared connection pool."""
+        self.session_registry = registry
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.session_registry is not None:
+            self.session = await self.session_registry.get_session()
+        elif not self.session or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        return self.session
 
     def load_config(self, config_path: str) -> Dict[str, Any]:
         try:
@@ -95,6 +386,52 @@ class BaseClient:
         else:
             raise ValueError("Invalid credentials source. Choose 'config' or 'env'.")
 
+    def _resolve_timeout(self, endpoint: str, timeout: Optional[Union[float, ClientTimeout]] = None) -> ClientTimeout:
+        """
+        Build the timeout budget for a single request.
+
+        An explicit ClientTimeout is used as-is; a number is a total budget in seconds.
+        Otherwise the longest matching endpoint SLO applies, falling back to the
+        client's default budget.
+        """
+        if isinstance(timeout, ClientTimeout):
+            return timeout
+        if timeout is None:
+            matches = [prefix for prefix in self.endpoint_timeouts if endpoint.startswith(prefix)]
+            if not matches:
+                return self.default_timeout
+            timeout = self.endpoint_timeouts[max(matches, key=len)]
+        return ClientTimeout(
+            total=timeout,
+            connect=min(timeout, self.default_timeout.connect or timeout),
+            sock_read=min(timeout, self.default_timeout.sock_read or timeout)
+        )
+
+    @staticmethod
+    def _parse_cache_rules(rules: Dict[str, Any]) -> list:
+        parsed = []
+        for rule, policy in rules.items():
+            parts = urlparse(rule)
+            if isinstance(policy, dict):
+                ttl, stale = policy.get('ttl'), policy.get('stale', 0)
+            else:
+                ttl, stale = policy, 0
+            if ttl == 0:
+                continue
+            parsed.append((parts.path, dict(parse_qsl(parts.query)), ttl, stale))
+        # Most specific rules first
+        return sorted(parsed, key=lambda r: (len(r[0]), len(r[1])), reverse=True)
+
+    def _cache_policy(self, endpoint: str, method: str, params: Optional[Dict[str, Any]]) -> Optional[tuple]:
+        """Return (ttl, stale) for a cacheable request, or None if it should not be cached."""
+        if self.response_cache is None or method.upper() not in self.CACHEABLE_METHODS:
+            return None
+        params = params or {}
+        for path, required, ttl, stale in self.cache_rules:
+            if endpoint.startswith(path) and all(str(params.get(k)) == v for k, v in required.items()):
+                return ttl, stale
+        return None
+
     def _set_auth_headers(self):
         headers = {
             'accept': 'application/json',
@@ -149,23 +486,173 @@ class BaseClient:
         token = jwt.encode(payload, secret, algorithm='HS256')
         return {'Authorization': f'Bearer {token}'}
 
+    async def _make_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[Union[float, ClientTimeout]] = None,
+        response_type: Optional[type] = None
+    ) -> Any:
+        """
+        Send a request through the response cache and the single-flight layer.
+
+        Responses matching a CACHE_TTLS rule are served from the response cache, with
+        stale entries returned immediately and refreshed in the background. Callers
+        asking for the same method, endpoint, params, body and headers while a matching
+        request is still running await its result instead of issuing their own. Every
+        caller gets its own copy of a shared or cached response, so it may mutate it.
+        Pass ``response_type`` (a dataclass or msgspec Struct) to get a typed object back.
+        """
+        result = await self._cached_request(endpoint, method, params, data, headers, timeout)
+        if response_type is not None and result is not None:
+            return convert(result, response_type)
+        return result
+
+    async def _cached_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[Union[float, ClientTimeout]] = None
+    ) -> Any:
+        policy = self._cache_policy(endpoint, method, params)
+        if policy is None:
+            return await self._coalesced_request(endpoint, method, params, data, headers, timeout)
+
+        ttl, stale = policy
+        cache_key = f"{self.api_name}:{self._request_key(endpoint, method, params, data, headers)}"
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            value, is_stale = cached
+            if is_stale:
+                # Serve the stale copy now and refresh it in the background
+                task = asyncio.ensure_future(self._revalidate(cache_key, ttl, stale, endpoint, method, params, data, headers, timeout))
+                self._revalidations.add(task)
+                task.add_done_callback(self._revalidations.discard)
+            # The cached object stays private to the cache, so callers may edit what they get
+            return copy.deepcopy(value)
+        return await self._fetch_and_cache(cache_key, ttl, stale, endpoint, method, params, data, headers, timeout)
+
+    async def _fetch_and_cache(self, cache_key: str, ttl: Optional[float], stale: float, *request_args) -> Any:
+        value = await self._coalesced_request(*request_args)
+        if self._is_cacheable(value):
+            self.response_cache.set(cache_key, copy.deepcopy(value), ttl, stale)
+        return value
+
+    def _is_cacheable(self, response: Any) -> bool:
+        """Whether a response may be stored in the response cache; subclasses reject API-level errors."""
+        return isinstance(response, (dict, list))
+
+    async def _revalidate(self, cache_key: str, ttl: Optional[float], stale: float, *request_args):
+        try:
+            await self._fetch_and_cache(cache_key, ttl, stale, *request_args)
+        except Exception as e:
+            logger.warning(f"Background refresh failed for {request_args[0]}: {str(e)}")
+
+    async def _coalesced_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[Union[float, ClientTimeout]] = None
+    ) -> Dict[str, Any]:
+        if method.upper() not in self.COALESCE_METHODS:
+            return await self._hedged_request(endpoint, method, params, data, headers, timeout)
+
+        key = self._request_key(endpoint, method, params, data, headers)
+        task = self._in_flight.get(key)
+        if task is not None:
+            # Callers that joined get their own copy, so one caller's mutations stay private
+            return copy.deepcopy(await asyncio.shield(task))
+        task = asyncio.ensure_future(self._hedged_request(endpoint, method, params, data, headers, timeout))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so one cancelled caller does not cancel the request for everyone else
+        return await asyncio.shield(task)
+
+    def _hedge_delay(self, method: str) -> Optional[float]:
+        """Seconds to wait before sending a backup request, or None to not hedge."""
+        if not self.hedge or method.upper() not in self.HEDGE_METHODS:
+            return None
+        if not isinstance(self.hedge, bool):
+            return float(self.hedge)
+        if len(self.latencies) < self.HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    async def _hedged_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[Union[float, ClientTimeout]] = None
+    ) -> Any:
+        """
+        Send a request, and a backup copy if the first is slower than the hedge delay.
+
+        Whichever copy succeeds first wins and the other is cancelled. The request
+        only fails if both copies do.
+        """
+        delay = self._hedge_delay(method)
+        if delay is None:
+            return await self._send_request(endpoint, method, params, data, headers, timeout)
+
+        tasks = [asyncio.ensure_future(self._send_request(endpoint, method, params, data, headers, timeout))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedged_requests += 1
+                tasks.append(asyncio.ensure_future(self._send_request(endpoint, method, params, data, headers, timeout)))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _request_key(
+        endpoint: str,
+        method: str,
+        params: Optional[Dict[str, Any]],
+        data: Any,
+        headers: Optional[Dict[str, str]]
+    ) -> str:
+        return json.dumps([method.upper(), endpoint, params, data, headers], sort_keys=True, default=str)
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10),
         retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError)),
         reraise=True
     )
-    async def _make_request(
+    async def _send_request(
         self,
         endpoint: str,
         method: str = "GET",
         params: Optional[Dict[str, Any]] = None,
         data: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
-        timeout: int = 30
+        timeout: Optional[Union[float, ClientTimeout]] = None
     ) -> Dict[str, Any]:
-        if not self.session:
-            self.session = aiohttp.ClientSession(timeout=ClientTimeout(total=timeout))
+        session = await self._get_session()
+        request_timeout = self._resolve_timeout(endpoint, timeout)
 
         url = f"{self.base_url}{endpoint}"
         full_headers = {**self.headers, **(headers or {})}
@@ -176,30 +663,47 @@ class BaseClient:
         if self.use_zenrows:
             url, params = self._prepare_zenrows_request(url, params)
 
+        if not self.circuit_breaker.allow():
+            raise CircuitOpenError(self.circuit_breaker.name, self.circuit_breaker.retry_in())
+        await self.rate_limiter.acquire()
+        started = time.monotonic()
         try:
-            async with self.session.request(
+            async with session.request(
                 method=method.upper(),
                 url=url,
                 params=params,
                 json=data,
                 headers=full_headers,
-                proxy=self.proxy
+                proxy=self.proxy,
+                timeout=request_timeout
             ) as response:
+                self.rate_limiter.update_from_response(response.status, response.headers)
                 response.raise_for_status()
 
                 # text = await response.text()
                 # print(text)  # For debugging
-                return await self._handle_json_response(response)
+                result = await self._handle_json_response(response)
+            self.circuit_breaker.record_success()
+            self.latencies.append(time.monotonic() - started)
+            return result
         except aiohttp.ClientResponseError as e:
+            # Only throttling and server errors mean the provider itself is unhealthy
+            if e.status == 429 or e.status >= 500:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
             logging.error(f"HTTP error {e.status}: {e.message}")
             raise
         except aiohttp.ClientError as e:
+            self.circuit_breaker.record_failure()
             logging.error(f"Client error: {str(e)}")
             raise
         except asyncio.TimeoutError:
-            logging.error("Request timed out")
+            self.circuit_breaker.record_failure()
+            logging.error(f"Request to {endpoint} timed out (budget {request_timeout.total}s)")
             raise
         except json.JSONDecodeError as e:
+            self.circuit_breaker.record_failure()
             logging.error(f"Failed to decode JSON response: {str(e)}")
             raise
         except Exception as e:
@@ -220,31 +724,84 @@ class BaseClient:
         }
         return zenrows_url, zenrows_params
 
-    async def _handle_json_response(self, response: aiohttp.ClientResponse) -> Dict[str, Any]:
+    async def _handle_json_response(self, response: aiohttp.ClientResponse) -> Any:
+        """Read the body once and decode it with the fastest available JSON backend."""
+        raw = await response.read()
+        if not raw.strip():
+            return None
         try:
-            text = await response.text()
-            
-            # If it's not JSON content type, try to parse anyway but don't error on mimetype
-            if response.content_type == 'text/plain':
-                try:
-                    return json.loads(text)
-                except json.JSONDecodeError:
-                    # If it's not JSON, return an empty dict
-                    return text
-            
-            # For application/json, use the standard json parser
-            return await response.json()
-            
+            return self.json_decoder(raw)
         except json.JSONDecodeError as e:
+            # Plain-text endpoints sometimes answer with a bare message instead of JSON
+            if response.content_type == 'text/plain':
+                return raw.decode(response.get_encoding(), errors='replace')
             logging.error(f"Failed to decode JSON response: {str(e)}")
-            logging.error(f"Raw response: {text}")
+            logging.error(f"Raw response: {raw[:1000]!r}")
             raise
 
+    async def _iter_concurrent_requests(
+        self,
+        requests: Iterable[tuple[str, dict]],  # (endpoint, params) tuples, may be a generator
+        method: str = "GET",
+        timeout: Optional[Union[float, ClientTimeout]] = None,
+        window: Optional[int] = None
+    ) -> AsyncIterator[tuple[int, Any]]:
+        """
+        Stream responses for many requests as they complete.
+
+        At most ``window`` requests are in flight at once and new ones are only
+        started as the consumer pulls results, so huge request lists never turn
+        into one coroutine per item up front.
+
+        Args:
+            requests: Iterable of (endpoint, params) tuples
+            method: HTTP method to use
+            timeout: Request timeout in seconds (defaults to the endpoint SLO)
+            window: Maximum in-flight requests (default: twice max_concurrent)
+
+        Yields:
+            (index, response) tuples in completion order, where index is the position
+            of the request in the input. Failed requests yield the exception instead.
+        """
+        window = window or self.max_concurrent * 2
+
+        async def _indexed_request(index: int, endpoint: str, params: dict) -> tuple[int, Any]:
+            try:
+                async with self.semaphore:  # Limit concurrent requests
+                    # _make_request acquires from the rate limiter
+                    return index, await self._make_request(
+                        endpoint=endpoint,
+                        method=method,
+                        params=params,
+                        timeout=timeout
+                    )
+            except Exception as e:
+                logger.error(f"Request failed: {str(e)}")
+                return index, e
+
+        request_iter = enumerate(requests)
+        pending = set()
+        try:
+            while True:
+                for index, (endpoint, params) in request_iter:
+                    pending.add(asyncio.ensure_future(_indexed_request(index, endpoint, params)))
+                    if len(pending) >= window:
+                        break
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def _make_concurrent_requests(
         self,
         requests: list[tuple[str, dict]],  # List of (endpoint, params) tuples
         method: str = "GET",
-        timeout: int = 30
+        timeout: Optional[Union[float, ClientTimeout]] = None,
+        window: Optional[int] = None
     ) -> list[Dict[str, Any]]:
         """
         Make multiple requests concurrently while respecting rate limits.
@@ -252,42 +809,48 @@ class BaseClient:
         Args:
             requests: List of (endpoint, params) tuples
             method: HTTP method to use
-            timeout: Request timeout in seconds
+            timeout: Request timeout in seconds (defaults to the endpoint SLO)
+            window: Maximum in-flight requests (default: twice max_concurrent)
             
         Returns:
-            List of API responses in the same order as the input requests
+            List of API responses in the same order as the input requests.
+            Failed requests are represented by their exception.
         """
-        async def _rate_limited_request(endpoint: str, params: dict) -> Dict[str, Any]:
-            async with self.semaphore:  # Limit concurrent requests
-                await self.rate_limiter.acquire()  # Respect rate limits
-                return await self._make_request(
-                    endpoint=endpoint,
-                    method=method,
-                    params=params,
-                    timeout=timeout
-                )
-        
-        tasks = [
-            _rate_limited_request(endpoint, params)
-            for endpoint, params in requests
-        ]
-        
-        results = []
-        for task in asyncio.as_completed(tasks):
-            try:
-                result = await task
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Request failed: {str(e)}")
-                results.append(e)
-                
+        results: list[Any] = [None] * len(requests)
+        async for index, result in self._iter_concurrent_requests(requests, method, timeout, window):
+            results[index] = result
         return results
 
 # Example config.yml structure
 """
+response_cache:  # Optional, settings for the shared provider response cache
+  max_entries: 10000
+  disk: true  # Or a path; persists cached responses in SQLite
+http_pool:  # Optional, shared connection pool used by DataCenter
+  limit: 200
+  limit_per_host: 20
+  ttl_dns_cache: 300
+  keepalive_timeout: 60
 api:
   my_api:
     base_url: "https://api.example.com"
+    rpm: 120          # Starting request rate
+    min_rpm: 12       # Optional, floor after repeated 429s (default rpm / 10)
+    max_rpm: 240      # Optional, ceiling the limiter may probe up to (default rpm * 2)
+    timeouts:  # Optional, per-request budgets in seconds
+      total: 30
+      connect: 10
+      read: 30
+      endpoints:  # Latency SLO per endpoint prefix
+        "/v1/slow_endpoint": 5
+    cache:  # Optional, response cache TTLs per endpoint prefix
+      "/v1/prices": 10                      # Fresh for 10 seconds
+      "/v1/pools": {ttl: 30, stale: 120}    # Then served stale while refreshing
+      "/v1/contracts?action=creation": null # Never expires
+    circuit_breaker:  # Optional, fail fast while the provider is unhealthy
+      failure_threshold: 5  # Consecutive failures before the circuit opens
+      reset_timeout: 30     # Seconds before a trial request is let through
+    hedge: true  # Optional, send a backup GET after the p95 latency (or a number of seconds)
     credentials:
       auth_method: "APIKey"  # 支持 "OAuth2", "JWT", "Basic", "NoAuth"
       api_key: "your-api-key"
@@ -298,4 +861,20 @@ api:
       secret: "your-jwt-secret"  # 如果是JWT认证
       username: "your-username"  # 如果是Basic认证
       password: "your-password"
+  opensearch:
+    hosts: ["https://opensearch.example.com:9200"]
+    requests_per_second: 8       # Token bucket refill rate shared by all calls to the cluster
+    max_requests_per_second: 16  # Optional, ceiling the bucket may probe up to (default 2x)
+    burst: 8                     # Optional, bucket capacity (default one second of requests)
+    max_concurrent: 8            # Optional, requests in flight at once
+    msearch_window_ms: 5         # Optional, how long point lookups wait to share an _msearch
+    msearch_max_batch: 50        # Optional, lookups per _msearch
+    index_refresh_seconds: 600   # Optional, how often per-index block ranges are reloaded for routing
+    tx_index_path: "~/.web3_data_center/cache/tx_locations.sqlite"  # Optional, local tx hash -> block table (off unless set; never evicted)
+  funding:
+    base_url: "https://funding.example.com"
+    batch_size: 50               # Optional, addresses per simulate_viewFirstFund JSON-RPC batch
+    max_concurrent: 5            # Optional, batches in flight at once
+    edge_store_path: "~/.web3_data_center/cache/funding_edges.sqlite"  # Optional, persistent first-fund edges
+    negative_ttl: 86400          # Optional, seconds an "unfunded" answer is trusted before re-checking
 """
\ No newline at end of file
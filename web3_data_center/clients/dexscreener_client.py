@@ -2,6 +2,11 @@ from typing import List, Dict, Any
 from .base_client import BaseClient
 
 class DexScreenerClient(BaseClient):
+    CACHE_TTLS = {
+        "/dex/tokens": {"ttl": 15, "stale": 60},
+        "/dex/search": {"ttl": 30, "stale": 120}
+    }
+
     def __init__(self, config_path: str = "config.yml", use_proxy: bool = True):
         super().__init__('dexscreener', config_path=config_path, use_proxy=use_proxy)
 
@@ -5,9 +5,17 @@ import logging
 logger = logging.getLogger(__name__)
 
 class EtherscanClient(BaseClient):
+    CACHE_TTLS = {
+        "/api?action=getcontractcreation": None  # Contract creation never changes
+    }
+
     def __init__(self, config_path: str = "config.yml", use_proxy: bool = True):
         super().__init__('etherscan', config_path=config_path, use_proxy=use_proxy)
 
+    def _is_cacheable(self, response: Any) -> bool:
+        # Errors such as NOTOK (rate limited, invalid key) come back with HTTP 200
+        return isinstance(response, dict) and response.get('status') == "1"
+
     async def get_deployments(self, address_list: List[str], chain: str = 'eth') -> Optional[Dict[str, Any]]:
         addresses = ','.join(address_list)
         endpoint = f"/api"
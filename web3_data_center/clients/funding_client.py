@@ -1,14 +1,19 @@
 from typing import Dict, Any, List, Optional
 from .base_client import BaseClient
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 class FundingClient(BaseClient):
     """Client for interacting with the Funding JSON-RPC API"""
-    
+    # Every call is a read-only JSON-RPC POST, so identical ones may share a request
+    COALESCE_METHODS = ("GET", "POST")
+
     def __init__(self, config_path: str = "config.yml", use_proxy: bool = False):
         super().__init__('funding', config_path=config_path, use_proxy=use_proxy)
+        # Addresses per JSON-RPC batch; max_concurrent bounds the batches in flight
+        self.batch_size = self.config['api']['funding'].get('batch_size', 50)
         
     async def simulate_view_first_fund(self, address: str) -> Dict[str, Any]:
         """Simulate and view the first fund for a given address."""
@@ -34,4 +39,49 @@ class FundingClient(BaseClient):
             }
             for i, address in enumerate(addresses)
         ]
-        return await self._make_request(endpoint, method="POST", data=batch_data)
\ No newline at end of file
+        return await self._make_request(endpoint, method="POST", data=batch_data)
+
+    async def get_first_funds(self, addresses: List[str], batch_size: Optional[int] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Look up the first fund of many addresses in concurrent JSON-RPC batches.
+
+        Addresses are deduplicated and split into batches of ``batch_size``; at most
+        ``max_concurrent`` batches are in flight at once.
+
+        Args:
+            addresses: Addresses to look up
+            batch_size: Addresses per batch (defaults to the configured batch_size)
+
+        Returns:
+            Dict mapping each address to its ``result`` object (with TxnHash and
+            usually From), or None if no funding was found. Addresses whose batch
+            failed are left out, so callers can tell "unknown" from "no funder".
+        """
+        unique = list(dict.fromkeys(addresses))
+        batch_size = batch_size or self.batch_size
+        batches = [unique[i:i + batch_size] for i in range(0, len(unique), batch_size)]
+
+        async def run_batch(batch: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+            try:
+                async with self.semaphore:
+                    responses = await self.batch_simulate_view_first_fund(batch)
+            except Exception as e:
+                logger.error(f"First fund batch of {len(batch)} addresses failed: {str(e)}")
+                return {}
+            if not isinstance(responses, list):
+                logger.error(f"Unexpected first fund batch response: {str(responses)[:200]}")
+                return {}
+            # JSON-RPC batch responses may come back in any order; ids are 1-based positions
+            by_id = {response.get('id'): response for response in responses if isinstance(response, dict)}
+            results = {}
+            for i, address in enumerate(batch):
+                response = by_id.get(i + 1)
+                if response is None or 'error' in response:
+                    continue
+                results[address] = response.get('result') or None
+            return results
+
+        first_funds = {}
+        for results in await asyncio.gather(*[run_batch(batch) for batch in batches]):
+            first_funds.update(results)
+        return first_funds
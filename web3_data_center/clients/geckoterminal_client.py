@@ -31,6 +31,11 @@ class RelatedPool:
     tokens: List[Dict[str, Any]]
 
 class GeckoTerminalClient(BaseClient):
+    CACHE_TTLS = {
+        "/api/p1/": {"ttl": 15, "stale": 60},
+        "/pools": {"ttl": 30, "stale": 120}
+    }
+
     def __init__(self, config_path: str = "config.yml", use_proxy: bool = False, use_zenrows: bool = True):
         super().__init__('geckoterminal', config_path=config_path, use_proxy=use_proxy, use_zenrows=use_zenrows)
         self.headers.update({
@@ -4,16 +4,26 @@ import logging
 
 logger = logging.getLogger(__name__)
 class GoPlusClient(BaseClient):
+    ENDPOINT_TIMEOUTS = {
+        "/v1/token_security": 10
+    }
+    CACHE_TTLS = {
+        "/v1/token_security": {"ttl": 600, "stale": 3600}
+    }
+
     def __init__(self, config_path: str = "config.yml", use_proxy: bool = False):
         super().__init__('goplus', config_path=config_path, use_proxy=use_proxy)
 
+    def _is_cacheable(self, response: Any) -> bool:
+        # GoPlus reports failures in the body with any code other than 1
+        return isinstance(response, dict) and response.get('code') == 1
+
     async def get_tokens_security(self, chain_id: str, token_address_list: List[str]) -> Dict[str, Any]:
         endpoint = f"/v1/token_security/{chain_id}"
         requests = [(endpoint, {"contract_addresses": token_address}) for token_address in token_address_list]
         return await self._make_concurrent_requests(
             requests,
-            method="GET",
-            timeout=10
+            method="GET"
         )
 
     async def check_tokens_safe(self, chain_id: str, token_address_list: List[str]) -> List[bool]:
@@ -22,7 +32,7 @@ class GoPlusClient(BaseClient):
 
     def is_token_safe(self, security_info: Dict[str, Any]) -> bool:
         # This is a basic implementation. You may want to adjust the criteria based on your needs.
-        if not security_info or 'result' not in security_info:
+        if not isinstance(security_info, dict) or 'result' not in security_info:
             logger.error(f"Security info is not valid: {security_info}")
             return False
 
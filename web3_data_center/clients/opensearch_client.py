@@ -1,20 +1,468 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Iterable, Callable, Awaitable, Set, Union
 import asyncio
+import json
 import logging
+import os
 from urllib.parse import urlparse
 import traceback
 import time
+from collections import deque
+from itertools import islice
+from pathlib import Path
 
 from opensearchpy import AsyncOpenSearch, OpenSearch,ConnectionTimeout, OpenSearchException, NotFoundError
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from opensearchpy import OpenSearch, RequestError, TransportError
 
-from .base_client import BaseClient
+from .base_client import BaseClient, RateLimiter
+from ..utils.cache import LRUCache, TxLocationStore, get_cache_dir
 
 logger = logging.getLogger(__name__)
 
+
+class MultiSearchBatcher:
+    """
+    Coalesces point lookups from concurrent callers into one _msearch request.
+
+    Searches submitted within ``window`` seconds of the first pending one, up to
+    ``max_batch`` of them, are sent together; each caller gets back its own
+    response, or its own error.
+    """
+
+    def __init__(self, send: Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]],
+                 window: float = 0.005, max_batch: int = 50):
+        self._send = send
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.searches = 0
+
+    async def search(self, index: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((index, body, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._dispatch(batch))
+
+    async def _dispatch(self, batch: List[Tuple[str, Dict[str, Any], asyncio.Future]]):
+        lines = []
+        for index, body, _ in batch:
+            lines.append({"index": index})
+            lines.append(body)
+        self.batches += 1
+        self.searches += len(batch)
+        try:
+            response = await self._send(lines)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, response['responses']):
+            if future.done():  # The caller went away
+                continue
+            if 'error' in result:
+                error = result['error']
+                error_type = error.get('type', 'msearch_error') if isinstance(error, dict) else str(error)
+                status = result.get('status', 500)
+                # Raise what a plain search would, so callers' NotFoundError handling still applies
+                error_class = NotFoundError if status == 404 or error_type == 'index_not_found_exception' else TransportError
+                future.set_exception(error_class(status, error_type, error))
+            else:
+                future.set_result(result)
+
+
+class BlockIndexRouter:
+    """
+    Maps block numbers to the eth_block index that holds them.
+
+    Each index's block range comes from one min/max aggregation over ``pattern``,
+    loaded on first use and refreshed every ``refresh_interval`` seconds. Hashes
+    whose block we have seen, in memory or in the ``locations`` table, are
+    routed to one index instead of every shard of every index.
+    """
+
+    def __init__(self, search: Callable[..., Awaitable[Dict[str, Any]]], pattern: str = "eth_block_*",
+                 refresh_interval: float = 600, max_hashes: int = 100000,
+                 locations: Optional[TxLocationStore] = None):
+        self._search = search
+        self.pattern = pattern
+        self.refresh_interval = refresh_interval
+        self.ranges: List[Tuple[int, int, str]] = []
+        self.tx_blocks = LRUCache(max_entries=max_hashes)
+        self.locations = locations
+        self._loaded_at: Optional[float] = None
+        self._refreshing: Optional[asyncio.Task] = None
+
+    async def refresh(self):
+        """Reload every index's block range from the cluster."""
+        body = {
+            "size": 0,
+            "aggs": {
+                "indices": {
+                    "terms": {"field": "_index", "size": 10000},
+                    "aggs": {
+                        "min_block": {"min": {"field": "Number"}},
+                        "max_block": {"max": {"field": "Number"}}
+                    }
+                }
+            }
+        }
+        response = await self._search(index=self.pattern, body=body)
+        ranges = []
+        for bucket in response['aggregations']['indices']['buckets']:
+            low, high = bucket['min_block']['value'], bucket['max_block']['value']
+            if low is not None and high is not None:
+                ranges.append((int(low), int(high), bucket['key']))
+        self.ranges = sorted(ranges)
+        self._loaded_at = time.monotonic()
+        logger.debug(f"Loaded block ranges for {len(self.ranges)} indices matching {self.pattern}")
+
+    async def ensure_fresh(self):
+        """Load the ranges if they are missing or older than refresh_interval."""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self.refresh())
+        refreshing = self._refreshing
+        try:
+            await asyncio.shield(refreshing)
+        except Exception as e:
+            # Keep routing with the ranges we have (or the pattern) until the next interval
+            logger.warning(f"Could not load block ranges for {self.pattern}: {str(e)}")
+            self._loaded_at = time.monotonic()
+        finally:
+            if self._refreshing is refreshing:
+                self._refreshing = None
+
+    def remember(self, tx_hash: str, block_number: Optional[int]):
+        if tx_hash and block_number is not None:
+            self.tx_blocks.set(tx_hash.lower(), int(block_number))
+
+    def index_for_block(self, block_number: int) -> Optional[str]:
+        """
+        The index (or comma-separated indices) whose range holds ``block_number``.
+
+        Returns None for blocks outside every known range, e.g. ones indexed
+        since the last refresh.
+        """
+        names = [name for low, high, name in self.ranges if low <= block_number <= high]
+        return ",".join(names) if names else None
+
+    async def known_location(self, tx_hash: str) -> Tuple[Optional[int], Optional[str]]:
+        """(block number, index name) seen for a hash, either possibly None."""
+        block_number = self.tx_blocks.get(tx_hash.lower())
+        if block_number is None and self.locations is not None:
+            # The table is SQLite; read it in the default executor, off the event loop
+            loop = asyncio.get_running_loop()
+            location = await loop.run_in_executor(None, self.locations.get, tx_hash)
+            if location is not None:
+                return location.block_number, location.index
+        return block_number, None
+
+    async def route(self, tx_hash: Optional[str] = None, block_number: Optional[int] = None) -> str:
+        """
+        Pick the index to search for a transaction.
+
+        Args:
+            tx_hash: Hash to look up in the hashes seen so far
+            block_number: Block hint; takes precedence over the hash
+
+        Returns:
+            str: An index name, or ``pattern`` when the block is unknown
+        """
+        index = None
+        if block_number is None and tx_hash:
+            block_number, index = await self.known_location(tx_hash)
+        if index:
+            return index
+        if block_number is None:
+            return self.pattern
+        await self.ensure_fresh()
+        return self.index_for_block(block_number) or self.pattern
+
+    async def route_many(self, tx_hashes: List[str], block_numbers: Optional[Dict[str, int]] = None,
+                         default: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Group hashes by the index to search for them.
+
+        Args:
+            tx_hashes: Hashes to route, in the order they should be searched
+            block_numbers: Block hint per hash
+            default: Target for hashes with no known block; defaults to ``pattern``
+
+        Returns:
+            Dict[str, List[str]]: Hashes per index name, in input order
+        """
+        blocks = dict(block_numbers or {})
+        indices: Dict[str, str] = {}
+        for tx_hash in tx_hashes:
+            if tx_hash not in blocks:
+                block_number = self.tx_blocks.get(tx_hash.lower())
+                if block_number is not None:
+                    blocks[tx_hash] = block_number
+        if self.locations is not None:
+            unknown = [tx_hash for tx_hash in tx_hashes if tx_hash not in blocks]
+            loop = asyncio.get_running_loop()
+            stored = await loop.run_in_executor(None, self.locations.get_many, unknown) if unknown else {}
+            for tx_hash, location in stored.items():
+                if location.index:
+                    indices[tx_hash] = location.index
+                else:
+                    blocks[tx_hash] = location.block_number
+        if any(tx_hash not in indices for tx_hash in blocks):
+            await self.ensure_fresh()
+        groups: Dict[str, List[str]] = {}
+        for tx_hash in tx_hashes:
+            index = indices.get(tx_hash)
+            if index is None and tx_hash in blocks:
+                index = self.index_for_block(blocks[tx_hash])
+            groups.setdefault(index or default or self.pattern, []).append(tx_hash)
+        return groups
+
+
+class BlockTailer:
+    """
+    Follows the chain head in OpenSearch and hands new blocks to registered consumers.
+
+    Each poll fetches blocks numbered above the checkpoint that were not delivered
+    yet. Blocks are delivered as soon as they are indexed, even out of order; the
+    checkpoint only advances over a contiguous run of delivered blocks, so a block
+    indexed late is still picked up. A gap that stays open for
+    ``late_block_timeout`` seconds is skipped with a warning. The checkpoint is
+    written atomically after every poll that changes it, and a block counts as
+    delivered only once every consumer returned, so a restart redelivers at most
+    the block that was in progress.
+    """
+
+    KINDS = ("block", "transaction", "log")
+    DEFAULT_SOURCE = [
+        "Number", "Timestamp", "Hash",
+        "Transactions.Hash", "Transactions.FromAddress", "Transactions.ToAddress", "Transactions.Value",
+        "Transactions.Status", "Transactions.TxnIndex", "Transactions.Logs"
+    ]
+
+    def __init__(self, client: "OpenSearchClient", checkpoint_path: Union[str, Path], index: str = "eth_block",
+                 start_block: Optional[int] = None, page_size: int = 100, late_block_timeout: float = 60,
+                 source: Optional[List[str]] = None):
+        self.client = client
+        self.checkpoint_path = Path(checkpoint_path).expanduser()
+        self.index = index
+        self.start_block = start_block
+        self.page_size = page_size
+        self.late_block_timeout = late_block_timeout
+        self.source = source or self.DEFAULT_SOURCE
+        self.consumers: Dict[str, List[Callable]] = {kind: [] for kind in self.KINDS}
+        self.checkpoint: Optional[int] = None
+        self.delivered: Set[int] = set()
+        self._gap_since: Optional[float] = None
+        self._stopped: Optional[asyncio.Event] = None
+
+    def subscribe(self, callback: Callable, kind: str = "block"):
+        """
+        Register a consumer, sync or async.
+
+        Block consumers are called with (block), transaction consumers with
+        (tx, block) and log consumers with (log, tx, block).
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown consumer kind {kind!r}, expected one of {self.KINDS}")
+        self.consumers[kind].append(callback)
+        return callback
+
+    def _load_checkpoint(self) -> bool:
+        try:
+            with open(self.checkpoint_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return False
+        self.checkpoint = state["checkpoint"]
+        self.delivered = set(state.get("delivered", []))
+        return True
+
+    def _save_checkpoint(self):
+        """Write the checkpoint to a temporary file and rename it over the old one."""
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"checkpoint": self.checkpoint, "delivered": sorted(self.delivered)}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    async def _head(self) -> int:
+        response = await self.client._rate_limited_search(index=self.index, body={
+            "size": 1, "_source": ["Number"], "sort": [{"Number": {"order": "desc"}}]
+        })
+        hits = response["hits"]["hits"]
+        return hits[0]["_source"]["Number"] if hits else -1
+
+    async def _start(self):
+        if self.checkpoint is not None or self._load_checkpoint():
+            return
+        # Without a stored checkpoint start at start_block, or at the current head
+        self.checkpoint = self.start_block - 1 if self.start_block is not None else await self._head()
+        self._save_checkpoint()
+
+    async def _new_blocks(self) -> AsyncIterator[Dict[str, Any]]:
+        query = {"bool": {"filter": [{"range": {"Number": {"gt": self.checkpoint}}}]}}
+        if self.delivered:
+            query["bool"]["must_not"] = [{"terms": {"Number": sorted(self.delivered)}}]
+        body = {"_source": self.source, "size": self.page_size, "sort": [{"Number": {"order": "asc"}}], "query": query}
+        while True:
+            response = await self.client._rate_limited_search(index=self.index, body=body)
+            hits = response["hits"]["hits"]
+            for hit in hits:
+                yield hit["_source"]
+            if len(hits) < self.page_size:
+                return
+            body["search_after"] = hits[-1]["sort"]
+
+    @staticmethod
+    async def _call(callback: Callable, *args):
+        result = callback(*args)
+        if asyncio.iscoroutine(result):
+            await result
+
+    async def _deliver(self, block: Dict[str, Any]):
+        for callback in self.consumers["block"]:
+            await self._call(callback, block)
+        if not (self.consumers["transaction"] or self.consumers["log"]):
+            return
+        for tx in block.get("Transactions") or []:
+            for callback in self.consumers["transaction"]:
+                await self._call(callback, tx, block)
+            for log in tx.get("Logs") or []:
+                for callback in self.consumers["log"]:
+                    await self._call(callback, log, tx, block)
+
+    def _advance(self) -> bool:
+        """Move the checkpoint over delivered blocks; skip a gap open for too long."""
+        before = self.checkpoint
+        while self.checkpoint + 1 in self.delivered:
+            self.checkpoint += 1
+            self.delivered.discard(self.checkpoint)
+        if not self.delivered:
+            self._gap_since = None
+        elif self._gap_since is None:
+            self._gap_since = time.monotonic()
+        elif time.monotonic() - self._gap_since >= self.late_block_timeout:
+            resume = min(self.delivered)
+            logger.warning(f"Blocks {self.checkpoint + 1}-{resume - 1} were not indexed within "
+                           f"{self.late_block_timeout}s, skipping them")
+            self.checkpoint = resume - 1
+            self._gap_since = None
+            self._advance()
+        return self.checkpoint != before
+
+    async def poll(self) -> int:
+        """
+        Deliver every block indexed since the last poll.
+
+        Returns:
+            int: Number of blocks delivered
+        """
+        await self._start()
+        count = 0
+        try:
+            async for block in self._new_blocks():
+                number = block["Number"]
+                if number <= self.checkpoint or number in self.delivered:
+                    continue
+                await self._deliver(block)
+                self.delivered.add(number)
+                count += 1
+        finally:
+            if self._advance() or count:
+                self._save_checkpoint()
+        return count
+
+    async def run(self, poll_interval: float = 2.0):
+        """Poll until stop() is called; errors from the cluster are logged and retried."""
+        self._stopped = asyncio.Event()
+        while not self._stopped.is_set():
+            try:
+                await self.poll()
+            except (ConnectionTimeout, TransportError) as e:
+                logger.warning(f"Tailing {self.index} failed, retrying: {str(e)}")
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        if self._stopped is not None:
+            self._stopped.set()
+
+
 class OpenSearchClient(BaseClient):
+    # Output key and eth_block Transactions field for every transaction attribute we expose
+    TX_FIELDS = [
+        ('hash', 'Hash'),
+        ('from_address', 'FromAddress'),
+        ('to_address', 'ToAddress'),
+        ('value', 'Value'),
+        ('gas_price', 'GasPrice'),
+        ('gas_limit', 'GasLimit'),
+        ('gas_used', 'GasUsed'),
+        ('gas_used_exec', 'GasUsedExec'),
+        ('gas_used_init', 'GasUsedInit'),
+        ('gas_used_refund', 'GasUsedRefund'),
+        ('nonce', 'Nonce'),
+        ('status', 'Status'),
+        ('type', 'Type'),
+        ('txn_index', 'TxnIndex'),
+        ('call_function', 'CallFunction'),
+        ('call_parameter', 'CallParameter'),
+        ('gas_fee_cap', 'GasFeeCap'),
+        ('gas_tip_cap', 'GasTipCap'),
+        ('blob_fee_cap', 'BlobFeeCap'),
+        ('blob_hashes', 'BlobHashes'),
+        ('con_address', 'ConAddress'),
+        ('cum_gas_used', 'CumGasUsed'),
+        ('error_info', 'ErrorInfo'),
+        ('int_txn_count', 'IntTxnCount'),
+        ('output', 'Output'),
+        ('serial_number', 'SerialNumber'),
+        ('access_list', 'AccessList'),
+        ('balance_read', 'BalanceRead'),
+        ('balance_write', 'BalanceWrite'),
+        ('code_info_read', 'CodeInfoRead'),
+        ('code_read', 'CodeRead'),
+        ('code_write', 'CodeWrite'),
+        ('created', 'Created'),
+        ('internal_txns', 'InternalTxns'),
+        ('logs', 'Logs'),
+        ('nonce_read', 'NonceRead'),
+        ('nonce_write', 'NonceWrite'),
+        ('storage_read', 'StorageRead'),
+        ('storage_write', 'StorageWrite'),
+        ('suicided', 'Suicided'),
+    ]
+    # Named projections over TX_FIELDS; only these fields are fetched and built. None means all.
+    TX_PROFILES: Dict[str, Optional[List[str]]] = {
+        'minimal': ['hash', 'from_address', 'to_address', 'value'],
+        'transfers': ['hash', 'from_address', 'to_address', 'value', 'status', 'txn_index',
+                      'call_function', 'internal_txns'],
+        'balances': ['hash', 'from_address', 'to_address', 'value', 'status', 'balance_read',
+                     'balance_write', 'gas_used', 'gas_price'],
+        'full': None,
+    }
+
     def __init__(self, config_path: str = "config.yml", use_proxy: bool = False):
         super().__init__('opensearch', config_path=config_path, use_proxy=use_proxy)
         
@@ -26,9 +474,36 @@ class OpenSearchClient(BaseClient):
             verify_certs=True,
             timeout=self.config['api']['opensearch'].get('timeout', 120)
         )
-        self._last_request_time = 0
-        self._requests_per_second = 8
-        self._rate_limiter = asyncio.Semaphore(self._requests_per_second)
+        # Every cluster call goes through one token bucket (request rate, with AIMD
+        # backoff on 429s) and one semaphore (requests in flight), shared per host
+        opensearch_config = self.config['api']['opensearch']
+        requests_per_second = opensearch_config.get('requests_per_second', 8)
+        self.rate_limiter = RateLimiter.for_key(
+            f"opensearch:{parsed_url.hostname}",
+            rpm=requests_per_second * 60,
+            min_rpm=opensearch_config.get('min_requests_per_second', 1) * 60,
+            max_rpm=opensearch_config.get('max_requests_per_second', requests_per_second * 2) * 60,
+            burst=opensearch_config.get('burst', requests_per_second)
+        )
+        self.max_concurrent = opensearch_config.get('max_concurrent', 8)
+        self.semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._init_limiter_stats()
+        # Point lookups by hash issued within a few ms of each other share one _msearch
+        self.msearch_batcher = MultiSearchBatcher(
+            self._send_msearch,
+            window=opensearch_config.get('msearch_window_ms', 5) / 1000,
+            max_batch=opensearch_config.get('msearch_max_batch', 50)
+        )
+        # Where every transaction seen in a scan lives, so hash lookups skip the fan-out.
+        # Off unless tx_index_path is set: the table has no eviction and grows with every scan.
+        tx_index_path = opensearch_config.get('tx_index_path')
+        self.tx_locations = TxLocationStore(tx_index_path) if tx_index_path else None
+        # Hash lookups target the one index holding the transaction's block when known
+        self.index_router = BlockIndexRouter(
+            self._rate_limited_search,
+            refresh_interval=opensearch_config.get('index_refresh_seconds', 600),
+            locations=self.tx_locations
+        )
         self._batch_size = 500
 
     async def __aenter__(self):
@@ -48,28 +523,91 @@ class OpenSearchClient(BaseClient):
         if hasattr(self, 'client') and self.client is not None:
             await self.client.close()
             self.client = None
+        if getattr(self, 'tx_locations', None) is not None:
+            self.tx_locations.close()
+            self.tx_locations = None
+            self.index_router.locations = None
         await super().close()
 
-    async def _rate_limited_search(self, **kwargs):
+    def _init_limiter_stats(self):
+        self._queued = 0
+        self._in_flight_requests = 0
+        self._request_count = 0
+        self._throttled_count = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def limiter_stats(self) -> Dict[str, Any]:
         """
-        Execute a rate-limited search request.
-        Ensures we don't exceed the specified requests per second limit.
+        Report how hard the limiter is holding callers back.
+
+        Returns:
+            Dict with the current queue depth and requests in flight, the bucket's
+            current rate, and the number of requests, 429s and wait times so far
         """
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
-        
-        if time_since_last_request < 1.0 / self._requests_per_second:
-            await asyncio.sleep(1.0 / self._requests_per_second - time_since_last_request)
-        
+        return {
+            'queue_depth': self._queued,
+            'in_flight': self._in_flight_requests,
+            'max_concurrent': self.max_concurrent,
+            'requests_per_second': self.rate_limiter.rate_limit / 60,
+            'requests': self._request_count,
+            'throttled': self._throttled_count,
+            'avg_wait': self._total_wait / self._request_count if self._request_count else 0.0,
+            'max_wait': self._max_wait,
+        }
+
+    async def _request(self, api: str, **kwargs):
+        """
+        Call an AsyncOpenSearch API method under the token bucket and concurrency limit.
+
+        A 429 from the cluster halves the bucket's rate; successful calls let it
+        creep back up to the configured maximum.
+        """
+        started = time.monotonic()
+        self._queued += 1
+        try:
+            await self.rate_limiter.acquire()
+            await self.semaphore.acquire()
+        finally:
+            self._queued -= 1
+        wait = time.monotonic() - started
+        self._request_count += 1
+        self._total_wait += wait
+        self._max_wait = max(self._max_wait, wait)
+        self._in_flight_requests += 1
         try:
-            async with self._rate_limiter:
-                result = await self.client.search(**kwargs)
-            self._last_request_time = time.time()
-            return result
+            result = await getattr(self.client, api)(**kwargs)
+        except TransportError as e:
+            if e.status_code == 429:
+                self._throttled_count += 1
+                self.rate_limiter.update_from_response(429)
+            raise
+        finally:
+            self._in_flight_requests -= 1
+            self.semaphore.release()
+        self.rate_limiter.update_from_response(200)
+        return result
+
+    async def _rate_limited_search(self, **kwargs):
+        """Execute a search through the client's limiter."""
+        try:
+            return await self._request('search', **kwargs)
         except Exception as e:
             logger.error(f"Error in rate limited search: {str(e)}")
             raise
 
+    async def _send_msearch(self, body: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return await self._request('msearch', body=body)
+
+    async def point_search(self, index: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a single small search through the msearch micro-batcher.
+
+        Use this for lookups by hash or address that many tasks issue at once; the
+        response has the same shape as a normal search response.
+        """
+        return await self.msearch_batcher.search(index, body)
+
     async def search(self, **kwargs):
         """
         Rate-limited search method that wraps the AsyncOpenSearch search method.
@@ -77,23 +615,284 @@ class OpenSearchClient(BaseClient):
         """
         return await self._rate_limited_search(**kwargs)
 
-    async def _rate_limited_scroll(self, scroll_id: str, scroll: str = '2m') -> Dict:
-        """Rate-limited scroll operation"""
+    def tailer(self, checkpoint_path: Optional[Union[str, Path]] = None, index: str = "eth_block",
+               **kwargs) -> BlockTailer:
+        """
+        Create a BlockTailer following ``index``.
+
+        Args:
+            checkpoint_path: Where the checkpoint is stored; defaults to a file per
+                index in the cache directory
+            index: Index or alias holding the blocks
+            **kwargs: start_block, page_size, late_block_timeout, source
+
+        Returns:
+            BlockTailer: Register consumers with ``subscribe`` and start it with ``run``
+        """
+        if checkpoint_path is None:
+            checkpoint_path = get_cache_dir() / f"tailer_{index}.json"
+        return BlockTailer(self, checkpoint_path, index=index, **kwargs)
+
+    async def _open_pit(self, index: str, keep_alive: str) -> Optional[str]:
+        """Open a point in time on ``index``, or return None if the cluster can't."""
         try:
-            async with self._rate_limiter:
-                return await self.client.scroll(scroll_id=scroll_id, scroll=scroll)
-        except Exception as e:
-            logger.error(f"Error in rate limited scroll: {str(e)}")
-            raise
+            response = await self._request('create_pit', index=index, keep_alive=keep_alive)
+            return response['pit_id']
+        except (TransportError, AttributeError) as e:
+            # PITs need OpenSearch 2.4+; plain search_after is still exact on a unique sort key
+            logger.warning(f"Point in time unavailable for {index}, paging without it: {e}")
+            return None
 
-    async def _rate_limited_clear_scroll(self, scroll_id: str) -> Dict:
-        """Rate-limited clear scroll operation"""
+    async def _close_pit(self, pit_id: str):
         try:
-            async with self._rate_limiter:
-                return await self.client.clear_scroll(scroll_id=scroll_id)
+            await self._request('delete_pit', body={"pit_id": [pit_id]})
         except Exception as e:
-            logger.error(f"Error in rate limited clear scroll: {str(e)}")
-            raise
+            logger.warning(f"Failed to delete point in time: {str(e)}")
+
+    async def paginate(self, index: str, body: Dict[str, Any], page_size: Optional[int] = None,
+                       cursor: Optional[List[Any]] = None, keep_alive: str = "2m",
+                       max_pages: Optional[int] = None) -> AsyncIterator[Tuple[List[Dict[str, Any]], List[Any]]]:
+        """
+        Page through every hit of a query using point in time + search_after.
+
+        Hits are sorted by block ``Number`` unless the query brings its own sort. Each
+        page is yielded with its cursor (the sort values of its last hit); pass that
+        back as ``cursor`` to resume a scan after a crash or in another process. If
+        the PIT expires under a slow consumer, a new one is opened and the scan
+        carries on from the cursor, which is exact because block numbers are unique.
+
+        Args:
+            index: Index or pattern to search
+            body: Query body; ``size`` is the page size unless ``page_size`` is given
+            page_size: Number of hits per page
+            cursor: Sort values to resume after
+            keep_alive: How long the PIT survives between pages
+            max_pages: Stop after this many pages
+
+        Yields:
+            (hits, cursor) for each non-empty page
+        """
+        body = dict(body)
+        body['size'] = page_size or body.get('size', 1000)
+        body.setdefault('sort', [{"Number": {"order": "asc"}}])
+        # A single page needs no consistent view across requests, so skip the PIT round trips
+        pit_id = await self._open_pit(index, keep_alive) if max_pages != 1 else None
+        pages = 0
+        reopened = False
+        try:
+            while max_pages is None or pages < max_pages:
+                if cursor is not None:
+                    body['search_after'] = cursor
+                try:
+                    if pit_id is None:
+                        response = await self._rate_limited_search(index=index, body=body)
+                    else:
+                        response = await self._rate_limited_search(body={**body, "pit": {"id": pit_id, "keep_alive": keep_alive}})
+                except NotFoundError:
+                    if pit_id is None or reopened:
+                        raise
+                    logger.warning(f"Point in time on {index} expired, resuming after {cursor}")
+                    pit_id = await self._open_pit(index, keep_alive)
+                    reopened = True
+                    continue
+                reopened = False
+                pit_id = response.get('pit_id', pit_id)
+                hits = response['hits']['hits']
+                if not hits:
+                    break
+                cursor = hits[-1]['sort']
+                pages += 1
+                yield hits, cursor
+                if len(hits) < body['size']:
+                    break
+        finally:
+            if pit_id is not None:
+                await self._close_pit(pit_id)
+
+    @staticmethod
+    def _split_block_range(start_block: int, end_block: int, slices: int) -> List[Tuple[int, int]]:
+        step = max(1, -(-(end_block - start_block + 1) // slices))
+        return [(lo, min(lo + step - 1, end_block)) for lo in range(start_block, end_block + 1, step)]
+
+    @staticmethod
+    def _restrict_to_blocks(body: Dict[str, Any], start_block: int, end_block: int) -> Dict[str, Any]:
+        """Copy a query body, narrowed to blocks in [start_block, end_block]."""
+        return {
+            **body,
+            "query": {
+                "bool": {
+                    "must": [body.get("query", {"match_all": {}})],
+                    "filter": [{"range": {"Number": {"gte": start_block, "lte": end_block}}}]
+                }
+            }
+        }
+
+    async def scan_blocks(self, index: str, body: Dict[str, Any], start_block: int, end_block: int,
+                          slices: int = 4, page_size: Optional[int] = None,
+                          prefetch: Optional[int] = None,
+                          chunks_per_slice: int = 8) -> AsyncIterator[Tuple[List[Dict[str, Any]], List[Any]]]:
+        """
+        Scan a block range with ``slices`` concurrent workers, yielding pages in block order.
+
+        The range is split into ``slices * chunks_per_slice`` contiguous chunks, handed
+        out in order to whichever worker is free; each chunk is paged through the
+        client's rate limiter. Pages are yielded in block order from a reorder buffer.
+        Workers only start chunks less than ``prefetch`` chunks ahead of the one being
+        consumed, so a slow consumer throttles the scan instead of growing memory, and
+        a worker never holds a PIT while waiting for the consumer.
+
+        Args:
+            index: Index or pattern to search
+            body: Query body; it is combined with a range filter per chunk
+            start_block: First block (inclusive)
+            end_block: Last block (inclusive)
+            slices: Number of concurrent workers
+            page_size: Number of hits per page
+            prefetch: Chunks that may be fetched ahead of the consumer (default 2 per worker)
+            chunks_per_slice: Chunks the range is split into per worker
+
+        Yields:
+            (hits, cursor) for each non-empty page, as from paginate
+        """
+        done = object()
+        bounds = self._split_block_range(start_block, end_block, slices * chunks_per_slice)
+        ahead = max(1, prefetch or 2 * slices)
+        queues = [asyncio.Queue() for _ in bounds]
+        progress = asyncio.Condition()
+        next_chunk = 0
+        consumed = 0
+
+        async def worker():
+            nonlocal next_chunk
+            while True:
+                async with progress:
+                    await progress.wait_for(lambda: next_chunk >= len(bounds) or next_chunk < consumed + ahead)
+                    if next_chunk >= len(bounds):
+                        return
+                    chunk = next_chunk
+                    next_chunk += 1
+                lo, hi = bounds[chunk]
+                pages = self.paginate(index, self._restrict_to_blocks(body, lo, hi), page_size=page_size)
+                try:
+                    async for page in pages:
+                        queues[chunk].put_nowait(page)
+                    queues[chunk].put_nowait(done)
+                except Exception as e:
+                    queues[chunk].put_nowait(e)
+                    return
+                finally:
+                    # Runs paginate's cleanup now, so a cancelled worker deletes its PIT
+                    await pages.aclose()
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(slices, len(bounds)))]
+        try:
+            for chunk, queue in enumerate(queues):
+                while True:
+                    item = await queue.get()
+                    if item is done:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+                async with progress:
+                    consumed = chunk + 1
+                    progress.notify_all()
+        finally:
+            for task in workers:
+                task.cancel()
+            # Wait for the workers to close their PITs before the scan returns
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _block_pages(self, index: str, body: Dict[str, Any], start_block: int, end_block: int,
+                           slices: int = 1, cursor: Optional[List[Any]] = None,
+                           max_pages: Optional[int] = None) -> AsyncIterator[Tuple[List[Dict[str, Any]], List[Any]]]:
+        """
+        Page through a block range, sequentially or with sliced workers.
+
+        Every transaction hash in the pages is recorded in the local location table.
+        """
+        if slices <= 1:
+            async for page in self.paginate(index, body, cursor=cursor, max_pages=max_pages):
+                await self._record_tx_locations(page[0])
+                yield page
+            return
+
+        if cursor is not None:
+            start_block = max(start_block, cursor[0] + 1)
+        if start_block > end_block:
+            return
+        pages = self.scan_blocks(index, body, start_block, end_block, slices=slices)
+        try:
+            count = 0
+            async for page in pages:
+                await self._record_tx_locations(page[0])
+                yield page
+                count += 1
+                if max_pages is not None and count >= max_pages:
+                    break
+        finally:
+            # Stop the workers now rather than when the generator is garbage collected
+            await pages.aclose()
+
+    async def _record_tx_locations(self, hits: List[Dict[str, Any]]) -> int:
+        """
+        Store (block, position, index) for every transaction hash found in block hits.
+
+        Hashes are read from ``_source.Transactions`` and from inner hits; the position
+        is TxnIndex when fetched, else the array or nested offset. The SQLite write runs
+        in the default executor so it does not block the event loop.
+        """
+        if getattr(self, 'tx_locations', None) is None:
+            return 0
+        rows = []
+        for hit in hits:
+            source = hit.get('_source') or {}
+            block_number = source.get('Number')
+            if block_number is None:
+                continue
+            index = hit.get('_index')
+            transactions = source.get('Transactions')
+            if isinstance(transactions, list):
+                for position, tx in enumerate(transactions):
+                    if isinstance(tx, dict) and tx.get('Hash'):
+                        rows.append((tx['Hash'], block_number, tx.get('TxnIndex', position), index))
+            for inner in (hit.get('inner_hits') or {}).values():
+                for tx_hit in inner['hits']['hits']:
+                    tx = tx_hit.get('_source') or {}
+                    if tx.get('Hash'):
+                        offset = (tx_hit.get('_nested') or {}).get('offset')
+                        rows.append((tx['Hash'], block_number, tx.get('TxnIndex', offset), index))
+        if not rows:
+            return 0
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.tx_locations.put_many, rows)
+
+    async def build_tx_index(self, start_block: int, end_block: int, slices: int = 4,
+                             page_size: int = 200) -> int:
+        """
+        Bulk-fill the local location table from a block range.
+
+        Args:
+            start_block: First block to index
+            end_block: Last block to index
+            slices: Number of concurrent scan workers
+            page_size: Blocks per page
+
+        Returns:
+            int: Number of transactions recorded
+        """
+        if getattr(self, 'tx_locations', None) is None:
+            raise ValueError("The transaction location table is disabled (tx_index_path)")
+        body = {
+            "_source": ["Number", "Transactions.Hash", "Transactions.TxnIndex"],
+            "size": page_size,
+            "query": {"range": {"Number": {"gte": start_block, "lte": end_block}}}
+        }
+        recorded = 0
+        async for hits, _ in self._block_pages("eth_block", body, start_block, end_block, slices):
+            recorded += sum(len(hit['_source'].get('Transactions') or []) for hit in hits)
+        logger.info(f"Indexed {recorded} transactions from blocks {start_block}-{end_block}")
+        return recorded
 
     @retry(
         stop=stop_after_attempt(5),
@@ -104,7 +903,8 @@ class OpenSearchClient(BaseClient):
     async def search_transaction_batch(self, batch_hashes: List[str], index: str = "eth_block") -> Dict:
         """
         Search for a batch of transaction hashes with rate limiting and scroll support.
-        Uses parallel processing for better performance.
+        Uses parallel processing for better performance. Hashes whose block is known
+        locally only search the index holding it.
         
         Args:
             batch_hashes: List of transaction hashes to search for
@@ -113,13 +913,21 @@ class OpenSearchClient(BaseClient):
         Returns:
             Dict containing the search results with all matching transactions
         """
+        groups = {index: batch_hashes}
+        if index in ("eth_block", self.index_router.pattern):
+            groups = await self.index_router.route_many(batch_hashes, default=index)
+
         # Split hashes into smaller batches
-        batches = [batch_hashes[i:i + self._batch_size] for i in range(0, len(batch_hashes), self._batch_size)]
+        batches = [
+            (target, hashes[i:i + self._batch_size])
+            for target, hashes in groups.items()
+            for i in range(0, len(hashes), self._batch_size)
+        ]
         
         # Process batches in parallel
         tasks = []
-        for batch in batches:
-            tasks.append(self._search_batch(batch, index))
+        for target, batch in batches:
+            tasks.append(self._search_batch(batch, target))
         
         # Wait for all batches to complete
         batch_results = await asyncio.gather(*tasks)
@@ -150,7 +958,7 @@ class OpenSearchClient(BaseClient):
         """
         query = {
             "size": len(hashes),
-            "_source": False,  # Don't fetch the _source field at all
+            "_source": ["Number"],  # Only the block number, to record where each hash lives
             "query": {
                 "nested": {
                     "path": "Transactions",
@@ -178,8 +986,9 @@ class OpenSearchClient(BaseClient):
         }
 
         try:
-            # Direct search without scrolling
+            # Direct search without scrolling; too large for the point-lookup batcher
             response = await self._rate_limited_search(index=index, body=query)
+            await self._record_tx_locations(response['hits']['hits'])
             
             # Return results directly
             return {
@@ -194,30 +1003,27 @@ class OpenSearchClient(BaseClient):
             return None
 
     async def search_logs(self, index: str, start_block: int, end_block: int, 
-                          event_topics: List[str], size: int = 1000, address: Optional[str] = None) -> List[Dict[str, Any]]:
+                          event_topics: List[str], size: int = 1000, address: Optional[str] = None,
+                          slices: int = 1) -> List[Dict[str, Any]]:
+        hits = []
+        async for page in self.iter_search_logs(index, start_block, end_block, event_topics, size, address, slices):
+            hits.extend(page)
+        return hits
+
+    async def iter_search_logs(self, index: str, start_block: int, end_block: int,
+                               event_topics: List[str], size: int = 1000, address: Optional[str] = None,
+                               slices: int = 1) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream the block hits of search_logs one page of at most ``size`` blocks at a time."""
         query = self._build_query(start_block, end_block, event_topics, size, address)
-        # print(query)
-        
         try:
-            response = await self.client.search(index=index, body=query, scroll='2m')
-            scroll_id = response['_scroll_id']
-            hits = response['hits']['hits']
-
-            while len(response['hits']['hits']) > 0:
-                response = await self._rate_limited_scroll(scroll_id=scroll_id)
-                scroll_id = response['_scroll_id']
-                hits.extend(response['hits']['hits'])
-
-            return hits
+            async for page, _ in self._block_pages(index, query, start_block, end_block, slices):
+                yield page
         except ConnectionTimeout as e:
             logger.error(f"Connection timeout occurred: {e}. Retrying...")
             raise
         except OpenSearchException as e:
             logger.error(f"OpenSearch exception occurred: {e}")
             raise
-        finally:
-            if 'scroll_id' in locals():
-                await self._rate_limited_clear_scroll(scroll_id=scroll_id)
 
     @staticmethod
     def _build_query(start_block: int, end_block: int, event_topics: List[str], size: int, address: Optional[str] = None) -> Dict[str, Any]:
@@ -261,168 +1067,39 @@ class OpenSearchClient(BaseClient):
             "sort": [{"Number": {"order": "asc"}}]
         }
 
-    async def get_specific_txs(self, to_address: str, start_block: int, end_block: int, size: int = 1000, max_iterations: int = 1000000000) -> List[Dict[str, Any]]:
-        query = self._build_specific_txs_query(to_address, start_block, end_block, size)
-
+    async def get_specific_txs(self, to_address: str, start_block: int, end_block: int, size: int = 1000,
+                               max_iterations: int = 1000000000, slices: int = 1,
+                               profile: str = 'full') -> List[Dict[str, Any]]:
         transactions = []
-        iteration_count = 0
-        total_hits = 0
-
-        try:
-            response = await self.client.search(index="eth_block", body=query, scroll='2m')
-            scroll_id = response['_scroll_id']
-            while response['hits']['hits']:
-                for hit in response['hits']['hits']:
-                    block_number = hit['_source']['Number']
-                    timestamp = hit['_source']['Timestamp']
-                    for tx in hit['inner_hits']['Transactions']['hits']['hits']:
-                        tx_source = tx['_source']
-                        if tx_source.get('ToAddress') == to_address:
-                            processed_tx = {
-                                'block_number': block_number,
-                                'timestamp': timestamp,
-                                'hash': tx_source.get('Hash'),
-                                'from_address': tx_source.get('FromAddress'),
-                                'to_address': tx_source.get('ToAddress'),
-                                'value': tx_source.get('Value'),
-                                'gas_price': tx_source.get('GasPrice'),
-                                'gas_limit': tx_source.get('GasLimit'),
-                                'gas_used': tx_source.get('GasUsed'),
-                                'gas_used_exec': tx_source.get('GasUsedExec'),
-                                'gas_used_init': tx_source.get('GasUsedInit'),
-                                'gas_used_refund': tx_source.get('GasUsedRefund'),
-                                'nonce': tx_source.get('Nonce'),
-                                'status': tx_source.get('Status'),
-                                'type': tx_source.get('Type'),
-                                'txn_index': tx_source.get('TxnIndex'),
-                                'call_function': tx_source.get('CallFunction'),
-                                'call_parameter': tx_source.get('CallParameter'),
-                                'gas_fee_cap': tx_source.get('GasFeeCap'),
-                                'gas_tip_cap': tx_source.get('GasTipCap'),
-                                'blob_fee_cap': tx_source.get('BlobFeeCap'),
-                                'blob_hashes': tx_source.get('BlobHashes'),
-                                'con_address': tx_source.get('ConAddress'),
-                                'cum_gas_used': tx_source.get('CumGasUsed'),
-                                'error_info': tx_source.get('ErrorInfo'),
-                                'int_txn_count': tx_source.get('IntTxnCount'),
-                                'output': tx_source.get('Output'),
-                                'serial_number': tx_source.get('SerialNumber'),
-                                'access_list': tx_source.get('AccessList'),
-                                'balance_read': tx_source.get('BalanceRead'),
-                                'balance_write': tx_source.get('BalanceWrite'),
-                                'code_info_read': tx_source.get('CodeInfoRead'),
-                                'code_read': tx_source.get('CodeRead'),
-                                'code_write': tx_source.get('CodeWrite'),
-                                'created': tx_source.get('Created'),
-                                'internal_txns': tx_source.get('InternalTxns'),
-                                'logs': tx_source.get('Logs'),
-                                'nonce_read': tx_source.get('NonceRead'),
-                                'nonce_write': tx_source.get('NonceWrite'),
-                                'storage_read': tx_source.get('StorageRead'),
-                                'storage_write': tx_source.get('StorageWrite'),
-                                'suicided': tx_source.get('Suicided')
-                            }
-                            transactions.append(processed_tx)
-                total_hits += len(response['hits']['hits'])
-                iteration_count += 1
-                if iteration_count >= max_iterations:
-                    logger.warning(f"Reached maximum number of iterations ({max_iterations}) in get_specific_txs")
-                    break
-                response = await self._rate_limited_scroll(scroll_id=scroll_id)
-                scroll_id = response['_scroll_id']
-
-            await self._rate_limited_clear_scroll(scroll_id=scroll_id)
-            logger.info(f"Processed {total_hits} hits, retrieved {len(transactions)} matching transactions")
-            return transactions
-        except RequestError as e:
-            logger.error(f"OpenSearch request error: {e}")
-            logger.error(f"Query: {query}")
-            logger.error(f"Error details: {e.info}")
-            raise
-        except TransportError as e:
-            logger.error(f"OpenSearch transport error: {e}")
-            logger.error(f"Query: {query}")
-            raise
-        except Exception as e:
-            logger.error(f"Unexpected error in get_specific_txs: {e}")
-            logger.error(f"Query: {query}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
-            raise
+        async for batch in self.get_specific_txs_batched(to_address, start_block, end_block, size, max_iterations,
+                                                         slices=slices, profile=profile):
+            transactions.extend(batch)
+        logger.info(f"Retrieved {len(transactions)} matching transactions")
+        return transactions
+
+    async def get_specific_txs_batched(self, to_address: str, start_block: int, end_block: int, size: int = 1000,
+                                       max_iterations: int = 1000000000, cursor: Optional[List[Any]] = None,
+                                       slices: int = 1, profile: str = 'full') -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream transactions sent to ``to_address``, one page of blocks at a time.
 
-    async def get_specific_txs_batched(self, to_address: str, start_block: int, end_block: int, size: int = 1000, max_iterations: int = 1000000000) -> List[Dict[str, Any]]:
-        query = self._build_specific_txs_query(to_address, start_block, end_block, size)
+        A long backfill can be resumed by passing ``[last_finished_block]`` as ``cursor``.
+        With ``slices`` > 1 the range is read by that many concurrent workers and
+        batches still arrive in block order. ``profile`` names an entry of TX_PROFILES;
+        only its fields are fetched and returned, besides block_number and timestamp.
+        """
+        query = self._build_specific_txs_query(to_address, start_block, end_block, size, profile)
 
         iteration_count = 0
         total_hits = 0
-
-        # search_after = None
         try:
-            response = await self.client.search(index="eth_block", body=query, scroll='2m')
-            scroll_id = response['_scroll_id']
-            while response['hits']['hits']:
-                batch_transactions = []
-                for hit in response['hits']['hits']:
-                    block_number = hit['_source']['Number']
-                    timestamp = hit['_source']['Timestamp']
-                    for tx in hit['inner_hits']['Transactions']['hits']['hits']:
-                        tx_source = tx['_source']
-                        if tx_source.get('ToAddress') == to_address:
-                            processed_tx = {
-                                'block_number': block_number,
-                                'timestamp': timestamp,
-                                'hash': tx_source.get('Hash'),
-                                'from_address': tx_source.get('FromAddress'),
-                                'to_address': tx_source.get('ToAddress'),
-                                'value': tx_source.get('Value'),
-                                'gas_price': tx_source.get('GasPrice'),
-                                'gas_limit': tx_source.get('GasLimit'),
-                                'gas_used': tx_source.get('GasUsed'),
-                                'gas_used_exec': tx_source.get('GasUsedExec'),
-                                'gas_used_init': tx_source.get('GasUsedInit'),
-                                'gas_used_refund': tx_source.get('GasUsedRefund'),
-                                'nonce': tx_source.get('Nonce'),
-                                'status': tx_source.get('Status'),
-                                'type': tx_source.get('Type'),
-                                'txn_index': tx_source.get('TxnIndex'),
-                                'call_function': tx_source.get('CallFunction'),
-                                'call_parameter': tx_source.get('CallParameter'),
-                                'gas_fee_cap': tx_source.get('GasFeeCap'),
-                                'gas_tip_cap': tx_source.get('GasTipCap'),
-                                'blob_fee_cap': tx_source.get('BlobFeeCap'),
-                                'blob_hashes': tx_source.get('BlobHashes'),
-                                'con_address': tx_source.get('ConAddress'),
-                                'cum_gas_used': tx_source.get('CumGasUsed'),
-                                'error_info': tx_source.get('ErrorInfo'),
-                                'int_txn_count': tx_source.get('IntTxnCount'),
-                                'output': tx_source.get('Output'),
-                                'serial_number': tx_source.get('SerialNumber'),
-                                'access_list': tx_source.get('AccessList'),
-                                'balance_read': tx_source.get('BalanceRead'),
-                                'balance_write': tx_source.get('BalanceWrite'),
-                                'code_info_read': tx_source.get('CodeInfoRead'),
-                                'code_read': tx_source.get('CodeRead'),
-                                'code_write': tx_source.get('CodeWrite'),
-                                'created': tx_source.get('Created'),
-                                'internal_txns': tx_source.get('InternalTxns'),
-                                'logs': tx_source.get('Logs'),
-                                'nonce_read': tx_source.get('NonceRead'),
-                                'nonce_write': tx_source.get('NonceWrite'),
-                                'storage_read': tx_source.get('StorageRead'),
-                                'storage_write': tx_source.get('StorageWrite'),
-                                'suicided': tx_source.get('Suicided')
-                            }
-                            batch_transactions.append(processed_tx)
-                total_hits += len(response['hits']['hits'])
+            async for hits, _ in self._block_pages("eth_block", query, start_block, end_block, slices, cursor, max_iterations):
+                total_hits += len(hits)
                 iteration_count += 1
-                yield batch_transactions
+                yield self._process_specific_txs(hits, to_address, profile)
 
-                if iteration_count >= max_iterations:
-                    logger.warning(f"Reached maximum number of iterations ({max_iterations}) in get_specific_txs_batch")
-                    break
-                response = await self._rate_limited_scroll(scroll_id=scroll_id)
-                scroll_id = response['_scroll_id']
-
-            await self._rate_limited_clear_scroll(scroll_id=scroll_id)
+            if iteration_count >= max_iterations:
+                logger.warning(f"Reached maximum number of iterations ({max_iterations}) in get_specific_txs_batched")
             logger.info(f"Processed {total_hits} hits in {iteration_count} iterations")
         except RequestError as e:
             logger.error(f"OpenSearch request error: {e}")
@@ -434,67 +1111,100 @@ class OpenSearchClient(BaseClient):
             logger.error(f"Query: {query}")
             raise
         except Exception as e:
-            logger.error(f"Unexpected error in get_specific_txs_batch: {e}")
+            logger.error(f"Unexpected error in get_specific_txs_batched: {e}")
             logger.error(f"Query: {query}")
             logger.error(f"Traceback: {traceback.format_exc()}")
             raise
 
-    @staticmethod
-    def _build_specific_txs_query(to_address: str, start_block: int, end_block: int, size: int) -> Dict[str, Any]:
-                return {
-        "query": {
-            "bool": {
-                "must": [
-                    {
-                        "range": {
-                            "Number": {
-                                "gte": start_block,
-                                "lte": end_block
+    @classmethod
+    def _tx_fields(cls, profile: str) -> List[Tuple[str, str]]:
+        """(output key, source field) pairs for a projection profile."""
+        if profile not in cls.TX_PROFILES:
+            raise ValueError(f"Unknown projection profile {profile!r}, expected one of {sorted(cls.TX_PROFILES)}")
+        keys = cls.TX_PROFILES[profile]
+        if keys is None:
+            return list(cls.TX_FIELDS)
+        return [(key, field) for key, field in cls.TX_FIELDS if key in keys]
+
+    @classmethod
+    def _process_specific_txs(cls, hits: List[Dict[str, Any]], to_address: str, profile: str = 'full') -> List[Dict[str, Any]]:
+        fields = cls._tx_fields(profile)
+        transactions = []
+        for hit in hits:
+            block_number = hit['_source']['Number']
+            timestamp = hit['_source']['Timestamp']
+            for tx in hit['inner_hits']['Transactions']['hits']['hits']:
+                tx_source = tx['_source']
+                if tx_source.get('ToAddress') == to_address:
+                    processed_tx = {'block_number': block_number, 'timestamp': timestamp}
+                    for key, field in fields:
+                        processed_tx[key] = tx_source.get(field)
+                    transactions.append(processed_tx)
+        return transactions
+
+    @classmethod
+    def _build_specific_txs_query(cls, to_address: str, start_block: int, end_block: int, size: int,
+                                  profile: str = 'full') -> Dict[str, Any]:
+        fields = cls._tx_fields(profile)
+        if cls.TX_PROFILES[profile] is None:
+            tx_source = True
+        else:
+            # ToAddress is always needed to re-check the match on the client side
+            tx_source = sorted({f"Transactions.{field}" for _, field in fields} | {"Transactions.ToAddress"})
+        return {
+            "query": {
+                "bool": {
+                    "must": [
+                        {
+                            "range": {
+                                "Number": {
+                                    "gte": start_block,
+                                    "lte": end_block
+                                }
                             }
-                        }
-                    },
-                    {
-                        "nested": {
-                            "path": "Transactions",
-                            "query": {
-                                "term": {
-                                    "Transactions.ToAddress": to_address
+                        },
+                        {
+                            "nested": {
+                                "path": "Transactions",
+                                "query": {
+                                    "term": {
+                                        "Transactions.ToAddress": to_address
+                                    }
+                                },
+                                "inner_hits": {
+                                    "size": 2000,
+                                    "_source": tx_source
                                 }
-                            },
-                            "inner_hits": {
-                                "size": 2000,
-                                "_source": True
                             }
                         }
+                    ]
+                }
+            },
+            "size": size,
+            "_source": ["Number", "Timestamp"],
+            "sort": [
+                {
+                    "Number": {
+                        "order": "asc"
                     }
-                ]
-            }
-        },
-        "size": size,
-        "_source": ["Number", "Timestamp"],
-        "sort": [
-            {
-                "Number": {
-                    "order": "asc"
                 }
-            }
-        ]
-    }
+            ]
+        }
     
 
  
     async def get_eth_change_in(self, tx_hash):
         try:
-            response = await self.client.get(index="eth_block", id=tx_hash)
+            response = await self._request('get', index="eth_block", id=tx_hash)
             return response['_source']['EthChangeIn']
         except RequestError as e:
             logger.error(f"OpenSearch request error: {e}")
-            logger.error(f"Query: {query}")
+            logger.error(f"Document: eth_block/{tx_hash}")
             logger.error(f"Error details: {e.info}")
             raise
         except TransportError as e:
             logger.error(f"OpenSearch transport error: {e}")
-            logger.error(f"Query: {query}")
+            logger.error(f"Document: eth_block/{tx_hash}")
             raise
 
     @staticmethod
@@ -532,47 +1242,43 @@ class OpenSearchClient(BaseClient):
         wait=wait_exponential(multiplier=1, min=4, max=10),
         retry=retry_if_exception_type(ConnectionTimeout)
     )
-    async def get_blocks_brief(self, start_block: int, end_block: int, size: int = 1000) -> List[Dict[str, Any]]:
+    async def get_blocks_brief(self, start_block: int, end_block: int, size: int = 1000, slices: int = 1) -> List[Dict[str, Any]]:
+        blocks = []
+        async for page in self.iter_blocks_brief(start_block, end_block, size, slices):
+            blocks.extend(page)
+        return blocks
+
+    async def iter_blocks_brief(self, start_block: int, end_block: int, size: int = 1000,
+                                slices: int = 1) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream block headers one page of at most ``size`` blocks at a time."""
         query = self._build_blocks_brief_query(start_block, end_block, size)
         
         try:
-            response = await self._rate_limited_search(index="eth_block", body=query, scroll='2m')
-            scroll_id = response['_scroll_id']
-            hits = response['hits']['hits']
-
-            while len(response['hits']['hits']) > 0:
-                response = await self._rate_limited_scroll(scroll_id=scroll_id)
-                scroll_id = response['_scroll_id']
-                hits.extend(response['hits']['hits'])
-
-            blocks = []
-            for hit in hits:
-                block = hit['_source']
-                blocks.append({
-                    'block_number': block['Number'],
-                    'block_hash': block['Hash'],
-                    'timestamp': block['Timestamp'],
-                    'gas_limit': block['GasLimit'],
-                    'gas_used': block['GasUsed'],
-                    'base_fee': block.get('BaseFee'),
-                    'difficulty': block.get('Difficulty'),
-                    'miner': block['Miner'],
-                    'extra_data': block.get('ExtraData'),
-                    'transaction_count': block.get('TxnCount'),
-                    'blob_gas_used': block.get('BlobGasUsed'),
-                    'excess_blob_gas': block.get('ExcessBlobGas')
-                })
-            return blocks
-
+            async for hits, _ in self._block_pages("eth_block", query, start_block, end_block, slices):
+                yield [self._process_block_brief(hit['_source']) for hit in hits]
         except ConnectionTimeout as e:
             logger.error(f"Connection timeout occurred: {e}. Retrying...")
             raise
         except OpenSearchException as e:
             logger.error(f"OpenSearch exception occurred: {e}")
             raise
-        finally:
-            if 'scroll_id' in locals():
-                await self._rate_limited_clear_scroll(scroll_id=scroll_id)
+
+    @staticmethod
+    def _process_block_brief(block: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'block_number': block['Number'],
+            'block_hash': block['Hash'],
+            'timestamp': block['Timestamp'],
+            'gas_limit': block['GasLimit'],
+            'gas_used': block['GasUsed'],
+            'base_fee': block.get('BaseFee'),
+            'difficulty': block.get('Difficulty'),
+            'miner': block['Miner'],
+            'extra_data': block.get('ExtraData'),
+            'transaction_count': block.get('TxnCount'),
+            'blob_gas_used': block.get('BlobGasUsed'),
+            'excess_blob_gas': block.get('ExcessBlobGas')
+        }
 
     @retry(
         stop=stop_after_attempt(3),
@@ -611,10 +1317,7 @@ class OpenSearchClient(BaseClient):
                 }
             }
             
-            response = await self.client.search(
-                index="eth_code_all",
-                body=query
-            )
+            response = await self.point_search("eth_code_all", query)
             
             if response["hits"]["total"]["value"] > 0:
                 # Get the transaction that contains the contract creation
@@ -677,7 +1380,38 @@ class OpenSearchClient(BaseClient):
             - ToAddress (str)
             - Value (str)
         """
-        
+        query = self._build_eth_transfers_query(start_block, end_block, from_address, to_address,
+                                                min_value, max_value, size)
+        response = await self._rate_limited_search(index="eth_block", body=query)
+        await self._record_tx_locations(response['hits']['hits'])
+        transfers = self._eth_transfers_from_hits(response['hits']['hits'])
+        logger.warning(f"Total transfers found: {len(transfers)}")
+        return transfers
+
+    async def iter_eth_transfers(self,
+                                 start_block: int = None,
+                                 end_block: int = None,
+                                 from_address: str = None,
+                                 to_address: str = None,
+                                 min_value: str = None,
+                                 max_value: str = None,
+                                 size: int = 100,
+                                 max_pages: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream the transfers of get_eth_transfers one page of ``size`` blocks at a time.
+
+        Unlike get_eth_transfers, which stops after the first ``size`` blocks, this
+        pages through the whole range unless ``max_pages`` is given.
+        """
+        query = self._build_eth_transfers_query(start_block, end_block, from_address, to_address,
+                                                min_value, max_value, size)
+        async for hits, _ in self._block_pages("eth_block", query, start_block, end_block, max_pages=max_pages):
+            yield self._eth_transfers_from_hits(hits)
+
+    @staticmethod
+    def _build_eth_transfers_query(start_block: Optional[int], end_block: Optional[int],
+                                   from_address: Optional[str], to_address: Optional[str],
+                                   min_value: Optional[str], max_value: Optional[str], size: int) -> Dict[str, Any]:
         # Build the range query for blocks if provided
         must_clauses = []
         if start_block is not None or end_block is not None:
@@ -784,21 +1518,12 @@ class OpenSearchClient(BaseClient):
                 }
             }
         }
+        return query
 
-        response = await self.client.search(index="eth_block", body=query)
-        
-
-        if response['hits']['hits']:
-            first_hit = response['hits']['hits'][0]
-            if 'inner_hits' in first_hit:
-                for name, inner in first_hit['inner_hits'].items():
-                    for hit in inner['hits']['hits']:
-                        if 'inner_hits' in hit:
-                            for inner_name, inner_hits in hit['inner_hits'].items():
-                                logger.warning(f"Inner inner hits {inner_name}: {inner_hits['hits']['hits']}")
-
+    @staticmethod
+    def _eth_transfers_from_hits(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         transfers = []
-        for hit in response['hits']['hits']:
+        for hit in hits:
             block_number = hit["_source"].get("Number")
             block_timestamp = hit["_source"].get("Timestamp")
 
@@ -847,7 +1572,6 @@ class OpenSearchClient(BaseClient):
                                 "TokenAddress": "0xEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEEE",
                                 "IsInternal": True
                             })
-        logger.warning(f"Total transfers found: {len(transfers)}")
         return transfers
 
     async def get_eth_transfers_batch(self,
@@ -883,36 +1607,61 @@ class OpenSearchClient(BaseClient):
         List[Dict[str, Any]]
             Combined results from all batches
         """
-        semaphore = asyncio.Semaphore(max_parallel)
-        
-        async def get_batch(batch_range: Dict[str, int]) -> List[Dict[str, Any]]:
-            async with semaphore:
-                return await self.get_eth_transfers(
-                    start_block=batch_range['start'],
-                    end_block=batch_range['end'],
-                    from_address=from_address,
-                    to_address=to_address,
-                    min_value=min_value,
-                    max_value=max_value,
-                    size=size
-                )
-        
-        # Create tasks for all batches
-        tasks = [get_batch(batch) for batch in batch_ranges]
-        
-        # Wait for all tasks to complete
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Process results and handle any errors
         transfers = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Error in batch {batch_ranges[i]}: {str(result)}")
-                continue
-            transfers.extend(result)
-            
+        async for batch_transfers in self.iter_eth_transfers_batch(batch_ranges, from_address, to_address,
+                                                                   min_value, max_value, size, max_parallel):
+            transfers.extend(batch_transfers)
         return transfers
 
+    async def iter_eth_transfers_batch(self,
+                                       batch_ranges: Iterable[Dict[str, int]],
+                                       from_address: str = None,
+                                       to_address: str = None,
+                                       min_value: str = None,
+                                       max_value: str = None,
+                                       size: int = 100,
+                                       max_parallel: int = 5) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream the transfers of get_eth_transfers_batch one block range at a time.
+
+        Ranges are yielded in input order, with at most ``max_parallel`` of them
+        fetched ahead of the consumer. Ranges that fail are logged and skipped.
+        """
+        async def get_batch(batch_range: Dict[str, int]) -> List[Dict[str, Any]]:
+            return await self.get_eth_transfers(
+                start_block=batch_range['start'],
+                end_block=batch_range['end'],
+                from_address=from_address,
+                to_address=to_address,
+                min_value=min_value,
+                max_value=max_value,
+                size=size
+            )
+
+        ranges = iter(batch_ranges)
+        pending = deque()
+
+        def schedule():
+            for batch_range in islice(ranges, max_parallel - len(pending)):
+                pending.append((batch_range, asyncio.ensure_future(get_batch(batch_range))))
+
+        try:
+            schedule()
+            while pending:
+                batch_range, task = pending.popleft()
+                try:
+                    result = await task
+                except Exception as e:
+                    logger.error(f"Error in batch {batch_range}: {str(e)}")
+                    result = None
+                # Keep the window full while the consumer works on this range
+                schedule()
+                if result is not None:
+                    yield result
+        finally:
+            for _, task in pending:
+                task.cancel()
+
     async def get_eth_transfers_batched(self, 
                                 start_block: int = None,
                                 end_block: int = None,
@@ -953,7 +1702,35 @@ class OpenSearchClient(BaseClient):
             - ToAddress (str)
             - Value (str)
         """
-        
+        query = self._build_eth_transfers_batched_query(start_block, end_block, from_address, to_address, size)
+        response = await self._rate_limited_search(index="eth_block", body=query)
+        await self._record_tx_locations(response['hits']['hits'])
+        transfers = self._eth_transfers_batched_from_hits(response['hits']['hits'])
+        logger.warning(f"Total transfers found: {len(transfers)}")
+        return transfers
+
+    async def iter_eth_transfers_batched(self,
+                                         start_block: int = None,
+                                         end_block: int = None,
+                                         from_address: str = None,
+                                         to_address: str = None,
+                                         min_value: str = None,
+                                         max_value: str = None,
+                                         size: int = 100,
+                                         max_pages: Optional[int] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream the transfers of get_eth_transfers_batched one page of ``size`` blocks at a time.
+
+        Unlike get_eth_transfers_batched, which stops after the first ``size`` blocks,
+        this pages through the whole range unless ``max_pages`` is given.
+        """
+        query = self._build_eth_transfers_batched_query(start_block, end_block, from_address, to_address, size)
+        async for hits, _ in self._block_pages("eth_block", query, start_block, end_block, max_pages=max_pages):
+            yield self._eth_transfers_batched_from_hits(hits)
+
+    @staticmethod
+    def _build_eth_transfers_batched_query(start_block: int, end_block: int, from_address: Optional[str],
+                                           to_address: Optional[str], size: int) -> Dict[str, Any]:
         query = {
             "size": size,
             "_source": ["Number", "Timestamp"],
@@ -1040,40 +1817,31 @@ class OpenSearchClient(BaseClient):
                     }
                 }
             })
+        return query
 
-        response = await self.client.search(index="eth_block", body=query)
-        
-        # Debug logging
-        if response['hits']['hits']:
-            first_hit = response['hits']['hits'][0]
-            if 'inner_hits' in first_hit:
-                for name, inner in first_hit['inner_hits'].items():
-                    for hit in inner['hits']['hits']:
-                        if 'inner_hits' in hit:
-                            for inner_name, inner_hits in hit['inner_hits'].items():
-                                logger.warning(f"Inner inner hits {inner_name}: {inner_hits['hits']['hits']}")
-
+    @staticmethod
+    def _eth_transfers_batched_from_hits(hits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         transfers = []
-        for hit in response['hits']['hits']:
+        for hit in hits:
             block_number = hit["_source"].get("Number")
             block_timestamp = hit["_source"].get("Timestamp")
-            logger.warning(f"Processing block {block_number}")
+            logger.debug(f"Processing block {block_number}")
 
             # Process transactions
             if "Transactions" in hit.get("inner_hits", {}):
                 tx_hits = hit["inner_hits"]["Transactions"]["hits"]["hits"]
-                logger.warning(f"Found {len(tx_hits)} transactions in block {block_number}")
+                logger.debug(f"Found {len(tx_hits)} transactions in block {block_number}")
                 
                 for t_hit in tx_hits:
-                    logger.warning(f"Raw transaction hit: {t_hit}")
+                    logger.debug(f"Raw transaction hit: {t_hit}")
                     source = t_hit.get("_source", {})
                     tx_hash = source.get("Hash")
                     if not tx_hash:
-                        logger.warning(f"Missing Hash in transaction: {source}")
+                        logger.debug(f"Missing Hash in transaction: {source}")
                         continue
 
-                    logger.warning(f"Processing transaction {tx_hash}")
-                    logger.warning(f"Transaction source: {source}")
+                    logger.debug(f"Processing transaction {tx_hash}")
+                    logger.debug(f"Transaction source: {source}")
 
                     # Add regular transaction if it has all required fields
                     if all(key in source for key in ["FromAddress", "ToAddress", "Value"]):
@@ -1089,7 +1857,7 @@ class OpenSearchClient(BaseClient):
                         }
                         transfers.append(transfer)
                     else:
-                        logger.warning(f"Regular transfer missing required fields: {source}")
+                        logger.debug(f"Regular transfer missing required fields: {source}")
 
                     # Add internal transactions if any
                     if "InternalTxns" in t_hit.get("inner_hits", {}):
@@ -1110,10 +1878,9 @@ class OpenSearchClient(BaseClient):
                                     "IsInternal": True
                                 }
                                 transfers.append(transfer)
-                                logger.warning(f"Added internal transfer: {transfer}")
+                                logger.debug(f"Added internal transfer: {transfer}")
                             else:
-                                logger.warning(f"Internal transfer missing required fields: {i}")
-        logger.warning(f"Total transfers found: {len(transfers)}")
+                                logger.debug(f"Internal transfer missing required fields: {i}")
         return transfers
 
     async def get_erc20_transfers(self,
@@ -1152,6 +1919,20 @@ class OpenSearchClient(BaseClient):
             - Value (str)
             - TokenAddress (str)
         """
+        transfers = []
+        async for page in self.iter_erc20_transfers(start_block, end_block, token_address, from_address, to_address, size):
+            transfers.extend(page)
+        return transfers
+
+    async def iter_erc20_transfers(self,
+                                   start_block: int = None,
+                                   end_block: int = None,
+                                   token_address: str = None,
+                                   from_address: str = None,
+                                   to_address: str = None,
+                                   size: int = 1000,
+                                   slices: int = 1) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream the transfers of get_erc20_transfers one page of at most ``size`` blocks at a time."""
         # ERC20 Transfer event topic
         transfer_topic = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
         
@@ -1170,17 +1951,14 @@ class OpenSearchClient(BaseClient):
             # If only to_address provided, we'll filter it post-query
             topics.extend([None])  # Add null for from topic position
         
-        # Get all matching logs
-        logs = await self.search_logs(
-            index="eth_block",
-            start_block=start_block,
-            end_block=end_block,
-            event_topics=topics,
-            size=size
-        )
+        async for blocks in self.iter_search_logs("eth_block", start_block, end_block, topics, size, slices=slices):
+            yield self._erc20_transfers_from_hits(blocks, transfer_topic, token_address, from_address, to_address)
 
+    @staticmethod
+    def _erc20_transfers_from_hits(blocks: List[Dict[str, Any]], transfer_topic: str, token_address: Optional[str],
+                                   from_address: Optional[str], to_address: Optional[str]) -> List[Dict[str, Any]]:
         transfers = []
-        for block in logs:
+        for block in blocks:
             block_number = block['_source'].get('Number')
             
             # Process each transaction in the block
@@ -1227,12 +2005,13 @@ class OpenSearchClient(BaseClient):
         return transfers
 
     
-    async def get_native_balance_changes(self, tx_hash: str) -> List[Dict[str, Any]]:
+    async def get_native_balance_changes(self, tx_hash: str, block_number: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Get native token balance changes for a specific transaction.
         
         Args:
             tx_hash (str): Transaction hash to query
+            block_number (int, optional): Block holding the transaction; only its index is searched
             
         Returns:
             List[Dict[str, Any]]: List of balance changes, each containing:
@@ -1242,7 +2021,7 @@ class OpenSearchClient(BaseClient):
                 - difference: Balance difference (positive for increase, negative for decrease)
         """
         query = {
-            "_source": False,
+            "_source": ["Number"],
             "query": {
                 "nested": {
                     "path": "Transactions",
@@ -1265,14 +2044,12 @@ class OpenSearchClient(BaseClient):
         }
 
         try:
-            # Search across all eth_block_* indices
-            response = await self.client.search(
-                index="eth_block_*",
-                body=query
-            )
+            index = await self.index_router.route(tx_hash, block_number)
+            response = await self.point_search(index, query)
 
             balance_changes = []
             if response["hits"]["total"]["value"] > 0:
+                self.index_router.remember(tx_hash, response["hits"]["hits"][0].get("_source", {}).get("Number"))
                 # Get the first matching transaction's balance writes
                 inner_hits = response["hits"]["hits"][0]["inner_hits"]["matching_transactions"]["hits"]["hits"]
                 if inner_hits:
@@ -1294,13 +2071,15 @@ class OpenSearchClient(BaseClient):
             logger.error(f"Error fetching balance changes for tx {tx_hash}: {str(e)}")
             raise
 
-    async def get_native_balance_changes_batch(self, tx_hashes: List[str], batch_size: int = 1000) -> Dict[str, Dict[str, Any]]:
+    async def get_native_balance_changes_batch(self, tx_hashes: List[str], batch_size: int = 1000,
+                                               block_numbers: Optional[Dict[str, int]] = None) -> Dict[str, Dict[str, Any]]:
         """
         Get native token balance changes grouped by address, with consecutive change tracking.
         
         Args:
             tx_hashes (List[str]): List of transaction hashes to query
             batch_size (int, optional): Maximum number of transactions per query. Defaults to 1000.
+            block_numbers (Dict[str, int], optional): Block hint per hash, used to search only the matching indices
             
         Returns:
             Dict[str, Dict[str, Any]]: Dictionary mapping addresses to their changes:
@@ -1311,16 +2090,79 @@ class OpenSearchClient(BaseClient):
                 - last_balance: Last recorded balance
                 - tx_hashes: List of transaction hashes affecting this address
         """
-        if not tx_hashes:
-            return {}
-
         address_changes = {}
-        
-        for i in range(0, len(tx_hashes), batch_size):
-            batch = tx_hashes[i:i + batch_size]
-            
+        async for changes_page in self.iter_native_balance_changes(tx_hashes, batch_size, block_numbers):
+            for change in changes_page:
+                address = change["address"]
+                prev_balance = change["prev_balance"]
+                current_balance = change["current_balance"]
+                difference = change["difference"]
+                tx_hash = change["tx_hash"]
+
+                if address not in address_changes:
+                    address_changes[address] = {
+                        "total_change": difference,
+                        "changes_count": 1,
+                        "is_consecutive": True,
+                        "first_balance": prev_balance,
+                        "last_balance": current_balance,
+                        "_balance_history": {prev_balance, current_balance},
+                        "tx_hashes": [tx_hash]
+                    }
+                else:
+                    changes = address_changes[address]
+                    changes["total_change"] += difference
+                    changes["changes_count"] += 1
+                    changes["last_balance"] = current_balance
+                    changes["tx_hashes"].append(tx_hash)
+                    
+                    # Track balance history to check consecutiveness
+                    if prev_balance not in changes["_balance_history"]:
+                        changes["is_consecutive"] = False
+                    changes["_balance_history"].add(prev_balance)
+                    changes["_balance_history"].add(current_balance)
+
+        # Remove temporary balance history from results
+        for changes in address_changes.values():
+            changes.pop("_balance_history")
+            # Remove duplicates and maintain order
+            changes["tx_hashes"] = list(dict.fromkeys(changes["tx_hashes"]))
+
+        return address_changes
+
+    async def iter_native_balance_changes(self, tx_hashes: List[str], batch_size: int = 1000,
+                                          block_numbers: Optional[Dict[str, int]] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream native balance writes for many transactions, one query batch at a time.
+
+        Hashes are grouped by the index holding their block (from ``block_numbers``
+        or hashes seen before) and each group only searches that index; the rest
+        search every eth_block index.
+
+        Args:
+            tx_hashes (List[str]): List of transaction hashes to query
+            batch_size (int, optional): Maximum number of transactions per query. Defaults to 1000.
+            block_numbers (Dict[str, int], optional): Block hint per hash
+
+        Yields:
+            List[Dict[str, Any]]: Balance changes for one batch, each containing:
+                - tx_hash: The transaction that wrote the balance
+                - address: The affected address
+                - prev_balance: Previous balance
+                - current_balance: Current balance
+                - difference: Balance difference
+        """
+        router = self.index_router
+        by_index = await router.route_many(tx_hashes, block_numbers)
+        batches = [
+            (index, hashes[i:i + batch_size])
+            for index, hashes in by_index.items()
+            for i in range(0, len(hashes), batch_size)
+        ]
+
+        for batch_number, (index, batch) in enumerate(batches, 1):
             query = {
-                "_source": False,
+                "_source": ["Number"],
                 "query": {
                     "nested": {
                         "path": "Transactions",
@@ -1342,56 +2184,288 @@ class OpenSearchClient(BaseClient):
             }
 
             try:
-                response = await self.client.search(
-                    index="eth_block_*",
-                    body=query
-                )
-
-                if response["hits"]["total"]["value"] > 0:
-                    for hit in response["hits"]["hits"]:
-                        inner_hits = hit["inner_hits"]["matching_transactions"]["hits"]["hits"]
-                        
-                        for inner_hit in inner_hits:
-                            tx_hash = inner_hit["_source"]["Hash"]
-                            balance_writes = inner_hit["_source"].get("BalanceWrite", [])
-                            
-                            for write in balance_writes:
-                                address = write["Address"]
-                                prev_balance = int(write["Prev"])
-                                current_balance = int(write["Current"])
-                                difference = current_balance - prev_balance
-
-                                if address not in address_changes:
-                                    address_changes[address] = {
-                                        "total_change": difference,
-                                        "changes_count": 1,
-                                        "is_consecutive": True,
-                                        "first_balance": prev_balance,
-                                        "last_balance": current_balance,
-                                        "_balance_history": {prev_balance, current_balance},
-                                        "tx_hashes": [tx_hash]
-                                    }
-                                else:
-                                    changes = address_changes[address]
-                                    changes["total_change"] += difference
-                                    changes["changes_count"] += 1
-                                    changes["last_balance"] = current_balance
-                                    changes["tx_hashes"].append(tx_hash)
-                                    
-                                    # Track balance history to check consecutiveness
-                                    if prev_balance not in changes["_balance_history"]:
-                                        changes["is_consecutive"] = False
-                                    changes["_balance_history"].add(prev_balance)
-                                    changes["_balance_history"].add(current_balance)
-
+                # A bulk query, so it skips the point-lookup batcher
+                response = await self._rate_limited_search(index=index, body=query)
             except Exception as e:
-                logger.error(f"Error fetching batch balance changes for batch {i//batch_size + 1}: {str(e)}")
+                logger.error(f"Error fetching batch balance changes for batch {batch_number}: {str(e)}")
                 raise
 
-        # Remove temporary balance history from results
-        for changes in address_changes.values():
-            changes.pop("_balance_history")
-            # Remove duplicates and maintain order
-            changes["tx_hashes"] = list(dict.fromkeys(changes["tx_hashes"]))
+            await self._record_tx_locations(response["hits"]["hits"])
+            changes_page = []
+            for hit in response["hits"]["hits"]:
+                for inner_hit in hit["inner_hits"]["matching_transactions"]["hits"]["hits"]:
+                    tx_hash = inner_hit["_source"]["Hash"]
+                    router.remember(tx_hash, hit.get("_source", {}).get("Number"))
+                    for write in inner_hit["_source"].get("BalanceWrite", []):
+                        prev_balance = int(write["Prev"])
+                        current_balance = int(write["Current"])
+                        changes_page.append({
+                            "tx_hash": tx_hash,
+                            "address": write["Address"],
+                            "prev_balance": prev_balance,
+                            "current_balance": current_balance,
+                            "difference": current_balance - prev_balance
+                        })
+            yield changes_page
 
-        return address_changes
+    @staticmethod
+    def _aggregation_body(aggs: Dict[str, Any], query: Optional[Dict[str, Any]] = None, path: Optional[str] = None,
+                          path_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if path_filter is not None:
+            aggs = {"filtered": {"filter": path_filter, "aggs": aggs}}
+        if path is not None:
+            aggs = {"nested": {"nested": {"path": path}, "aggs": aggs}}
+        body = {"size": 0, "track_total_hits": False, "aggs": aggs}
+        if query is not None:
+            body["query"] = query
+        return body
+
+    @staticmethod
+    def _unwrap_aggregations(aggregations: Dict[str, Any], path: Optional[str] = None,
+                             path_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if path is not None:
+            aggregations = aggregations["nested"]
+        if path_filter is not None:
+            aggregations = aggregations["filtered"]
+        return aggregations
+
+    @staticmethod
+    def _agg_scope(start_block: Optional[int], end_block: Optional[int], path: Optional[str] = None,
+                   path_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Root query selecting the blocks in range that hold at least one matching nested doc."""
+        filters = []
+        if start_block is not None or end_block is not None:
+            block_range = {}
+            if start_block is not None:
+                block_range["gte"] = start_block
+            if end_block is not None:
+                block_range["lte"] = end_block
+            filters.append({"range": {"Number": block_range}})
+        if path is not None and path_filter is not None:
+            filters.append({"nested": {"path": path, "query": path_filter}})
+        return {"bool": {"filter": filters}} if filters else {"match_all": {}}
+
+    async def aggregate(self, aggs: Dict[str, Any], query: Optional[Dict[str, Any]] = None,
+                        path: Optional[str] = None, path_filter: Optional[Dict[str, Any]] = None,
+                        index: str = "eth_block") -> Dict[str, Any]:
+        """
+        Run aggregations on the cluster and return only their results.
+
+        Args:
+            aggs: Aggregations in OpenSearch syntax, e.g. ``{"users": {"cardinality": {...}}}``
+            query: Root query selecting the blocks to aggregate over
+            path: Nested path ("Transactions" or "Transactions.Logs") to aggregate within
+            path_filter: Query on the nested docs; only matching ones are aggregated
+            index: Index or pattern to search
+
+        Returns:
+            Dict[str, Any]: The aggregation results by name, plus ``doc_count`` of the
+            nested docs aggregated when ``path`` is given
+        """
+        body = self._aggregation_body(aggs, query, path, path_filter)
+        response = await self._rate_limited_search(index=index, body=body)
+        return self._unwrap_aggregations(response["aggregations"], path, path_filter)
+
+    @staticmethod
+    def _flatten_bucket(bucket: Dict[str, Any]) -> Dict[str, Any]:
+        """A bucket with its metric sub-aggregations reduced to their values."""
+        flat = {}
+        for name, value in bucket.items():
+            if isinstance(value, dict) and set(value) <= {"value", "value_as_string"}:
+                value = value.get("value")
+            flat[name] = value
+        return flat
+
+    async def iter_composite(self, group_by: Dict[str, Any], aggs: Optional[Dict[str, Any]] = None,
+                             query: Optional[Dict[str, Any]] = None, path: Optional[str] = None,
+                             path_filter: Optional[Dict[str, Any]] = None, index: str = "eth_block",
+                             page_size: int = 1000,
+                             after: Optional[Dict[str, Any]] = None) -> AsyncIterator[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Page through every bucket of a composite aggregation.
+
+        Use this for group-bys with too many keys for a terms aggregation. Each page
+        is yielded with its ``after_key``; pass that back as ``after`` to resume.
+
+        Args:
+            group_by: Source name to field name (a terms source) or to a full
+                composite source definition
+            aggs: Sub-aggregations computed per bucket
+            query: Root query selecting the blocks to aggregate over
+            path: Nested path to aggregate within
+            path_filter: Query on the nested docs; only matching ones are aggregated
+            index: Index or pattern to search
+            page_size: Buckets per request
+            after: Composite key to resume after
+
+        Yields:
+            (buckets, after_key) where each bucket has ``key``, ``doc_count`` and the
+            value of each metric sub-aggregation. With ``path_filter``, buckets with
+            no matching nested docs are dropped, so a page may come back empty.
+        """
+        sources = [
+            {name: {"terms": {"field": source}} if isinstance(source, str) else source}
+            for name, source in group_by.items()
+        ]
+        # A composite may only sit at the top level or right under nested, so the
+        # nested-doc condition is applied inside each bucket instead of above it
+        if path_filter is not None:
+            aggs = {"matched": {"filter": path_filter, "aggs": aggs or {}}}
+        while True:
+            composite = {"size": page_size, "sources": sources}
+            if after is not None:
+                composite["after"] = after
+            groups = {"composite": composite}
+            if aggs:
+                groups["aggs"] = aggs
+            result = await self.aggregate({"groups": groups}, query, path, index=index)
+            buckets = result["groups"]["buckets"]
+            if not buckets:
+                return
+            after = result["groups"].get("after_key", buckets[-1]["key"])
+            if path_filter is not None:
+                buckets = [
+                    {**bucket["matched"], "key": bucket["key"]}
+                    for bucket in buckets if bucket["matched"]["doc_count"] > 0
+                ]
+            yield [self._flatten_bucket(bucket) for bucket in buckets], after
+            if len(result["groups"]["buckets"]) < page_size:
+                return
+
+    async def get_contract_tx_stats(self, contract_address: str, start_block: Optional[int] = None,
+                                    end_block: Optional[int] = None) -> Dict[str, int]:
+        """
+        Count transactions sent to a contract and their distinct senders on the cluster.
+
+        Args:
+            contract_address: The contract address
+            start_block: Optional first block
+            end_block: Optional last block
+
+        Returns:
+            Dict[str, int]: ``tx_count`` (exact) and ``user_count`` (HyperLogLog
+            estimate, exact below 40000 senders)
+        """
+        path_filter = {"term": {"Transactions.ToAddress": contract_address.lower()}}
+        result = await self.aggregate(
+            {"users": {"cardinality": {"field": "Transactions.FromAddress", "precision_threshold": 40000}}},
+            query=self._agg_scope(start_block, end_block, "Transactions", path_filter),
+            path="Transactions",
+            path_filter=path_filter
+        )
+        return {"tx_count": result["doc_count"], "user_count": result["users"]["value"]}
+
+    async def iter_eth_moved_by_address(self, start_block: int, end_block: int, side: str = "from",
+                                        counterparty: Optional[str] = None,
+                                        page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream the total ETH value each address sent (or received) over a block range.
+
+        Args:
+            start_block: First block
+            end_block: Last block
+            side: "from" to group by sender, "to" to group by recipient
+            counterparty: Only count transactions with this address on the other side
+            page_size: Addresses per page
+
+        Yields:
+            List[Dict[str, Any]]: One page of addresses, each with ``address``,
+            ``tx_count`` and ``total_value`` (wei summed as a double, so approximate)
+        """
+        if side not in ("from", "to"):
+            raise ValueError(f"side must be 'from' or 'to', got {side!r}")
+        group_field, other_field = "Transactions.FromAddress", "Transactions.ToAddress"
+        if side == "to":
+            group_field, other_field = other_field, group_field
+        path_filter = {"bool": {"filter": [{"range": {"Transactions.Value": {"gt": 0}}}]}}
+        if counterparty:
+            path_filter["bool"]["filter"].append({"term": {other_field: counterparty.lower()}})
+        pages = self.iter_composite(
+            {"address": group_field},
+            aggs={"total_value": {"sum": {"field": "Transactions.Value"}}},
+            query=self._agg_scope(start_block, end_block, "Transactions", path_filter),
+            path="Transactions",
+            path_filter=path_filter,
+            page_size=page_size
+        )
+        async for buckets, _ in pages:
+            if not buckets:
+                continue
+            yield [
+                {"address": bucket["key"]["address"], "tx_count": bucket["doc_count"], "total_value": bucket["total_value"]}
+                for bucket in buckets
+            ]
+
+    async def get_tx_histogram(self, contract_address: Optional[str] = None, interval: str = "1d",
+                               start_block: Optional[int] = None, end_block: Optional[int] = None,
+                               timestamp_field: str = "Timestamp") -> List[Dict[str, Any]]:
+        """
+        Count transactions per time bucket, optionally only those sent to a contract.
+
+        Args:
+            contract_address: Only count transactions to this address
+            interval: Calendar interval of the buckets, e.g. "1h", "1d", "1w"
+            start_block: Optional first block
+            end_block: Optional last block
+            timestamp_field: Block time field to bucket on
+
+        Returns:
+            List[Dict[str, Any]]: ``timestamp``, ``tx_count`` and ``user_count`` per
+            non-empty bucket, oldest first
+        """
+        path_filter = {"term": {"Transactions.ToAddress": contract_address.lower()}} if contract_address else None
+        per_bucket = self._aggregation_body(
+            {"users": {"cardinality": {"field": "Transactions.FromAddress"}}},
+            path="Transactions", path_filter=path_filter
+        )["aggs"]
+        aggs = {
+            "histogram": {
+                "date_histogram": {"field": timestamp_field, "calendar_interval": interval, "min_doc_count": 1},
+                "aggs": per_bucket
+            }
+        }
+        result = await self.aggregate(aggs, query=self._agg_scope(start_block, end_block, "Transactions", path_filter))
+        histogram = []
+        for bucket in result["histogram"]["buckets"]:
+            transactions = self._unwrap_aggregations(bucket, "Transactions", path_filter)
+            histogram.append({
+                "timestamp": bucket.get("key_as_string", bucket["key"]),
+                "tx_count": transactions["doc_count"],
+                "user_count": transactions["users"]["value"]
+            })
+        return histogram
+
+    async def get_log_stats(self, event_topic: str, address: Optional[str] = None,
+                            start_block: Optional[int] = None, end_block: Optional[int] = None,
+                            top: int = 10) -> Dict[str, Any]:
+        """
+        Count logs with a topic and the contracts emitting them on the cluster.
+
+        Args:
+            event_topic: Topic the logs must carry (usually the event signature)
+            address: Only count logs emitted by this contract
+            start_block: Optional first block
+            end_block: Optional last block
+            top: Number of top emitting contracts to return
+
+        Returns:
+            Dict[str, Any]: ``log_count``, ``contract_count`` (estimate) and
+            ``top_contracts`` as (address, log count) pairs
+        """
+        path_filter = {"bool": {"filter": [{"term": {"Transactions.Logs.Topics": event_topic}}]}}
+        if address:
+            path_filter["bool"]["filter"].append({"term": {"Transactions.Logs.Address": address.lower()}})
+        result = await self.aggregate(
+            {
+                "contracts": {"cardinality": {"field": "Transactions.Logs.Address"}},
+                "top_contracts": {"terms": {"field": "Transactions.Logs.Address", "size": top}}
+            },
+            query=self._agg_scope(start_block, end_block, "Transactions.Logs", path_filter),
+            path="Transactions.Logs",
+            path_filter=path_filter
+        )
+        return {
+            "log_count": result["doc_count"],
+            "contract_count": result["contracts"]["value"],
+            "top_contracts": [(bucket["key"], bucket["doc_count"]) for bucket in result["top_contracts"]["buckets"]]
+        }
@@ -1,11 +1,12 @@
 import asyncio
-from typing import Dict, List, Optional, Any, Union, Tuple
+from typing import Dict, List, Optional, Any, Union, Tuple, Callable, Awaitable
 from ..clients import *
 from ..models.token import Token
 from ..models.holder import Holder
 from ..models.price_history_point import PriceHistoryPoint
 from ..utils.logger import get_logger
-from ..utils.cache import file_cache
+from ..utils.cache import file_cache, LRUCache, FundingEdgeStore, get_cache_dir
+from .funding_graph import FundingEdge, FundingForest, FundingGraph, RelationshipSearch, RootResolver
 import time
 import datetime
 from chain_index import get_chain_info, get_all_chain_tokens
@@ -23,7 +24,27 @@ logger = logging.getLogger(__name__)
 TRANSFER_EVENT_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
 
 class DataCenter:
-    def __init__(self, config_path: str = "config.yml"):
+    # Cache TTLs in seconds per key family (the cache key prefix before the first ':').
+    # None means the entry never expires; unlisted families use DEFAULT_CACHE_TTL.
+    CACHE_TTLS = {
+        'token_info': 300,
+        'price_history': 60,
+        'token_price_history': 60,
+        'top_holders': 300,
+        'hot_tokens': 60,
+        'new_pairs': 30,
+        'wallet_data': 300,
+        'token_security': 600,
+        'contract_tx_user_count': 600,
+        'deployed_contracts': 3600,
+        'deployed_block': None,  # Immutable once deployed
+        'logs': 3600,
+        'blocks_brief': 3600,
+        'specific_txs': 3600,
+    }
+    DEFAULT_CACHE_TTL = 3600
+
+    def __init__(self, config_path: str = "config.yml", cache_max_entries: int = 10000, cache_max_bytes: Optional[int] = 512 * 1024 * 1024):
         # Configure logging
         logging.getLogger('web3_data_center.clients.database.postgresql_client').setLevel(logging.WARNING)
         logging.getLogger('web3_data_center.clients.database.web3_label_client').setLevel(logging.WARNING)
@@ -36,7 +57,10 @@ class DataCenter:
         
         self._config_path = config_path
         self._clients = {}
-        self.cache = {}
+        # Bounded by entry count and approximate size so long-running monitors stay flat
+        self.cache = LRUCache(max_entries=cache_max_entries, max_bytes=cache_max_bytes)
+        self._session_registry = SessionRegistry.shared()
+        self._funding_edges: Optional[FundingEdgeStore] = None
         
     def _get_client(self, client_type: str):
         """Get a client instance of the specified type.
@@ -80,6 +104,12 @@ class DataCenter:
                 self._clients[client_type] = PostgreSQLClient(config_path=self._config_path, db_section='zju')
             elif client_type == 'web3':
                 self._clients[client_type] = Web3(HTTPProvider("http://192.168.0.105:8545"))
+
+            client = self._clients.get(client_type)
+            if isinstance(client, BaseClient):
+                # Share one connection pool (DNS cache, TLS sessions) across all providers
+                self._session_registry.configure(**client.config.get('http_pool', {}))
+                client.use_session_registry(self._session_registry)
         return self._clients[client_type]
     
     @property
@@ -122,6 +152,15 @@ class DataCenter:
     def funding_client(self):
         return self._get_client('funding')
         
+    @property
+    def funding_edges(self) -> FundingEdgeStore:
+        """Persistent first-fund edges shared by every funding traversal."""
+        if self._funding_edges is None:
+            funding_config = self.funding_client.config['api']['funding']
+            path = funding_config.get('edge_store_path', get_cache_dir() / 'funding_edges.sqlite')
+            self._funding_edges = FundingEdgeStore(path, negative_ttl=funding_config.get('negative_ttl', 24 * 3600))
+        return self._funding_edges
+        
     @property
     def w3_client(self):
         return self._get_client('web3')
@@ -266,87 +305,123 @@ class DataCenter:
 
     async def get_token_price_at_time(self, address: str, chain: str = 'sol') -> Optional[Token]:
         cache_key = f"token_info:{chain}:{address}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
 
         token = await self.birdeye_client.get_token_price_at_time(address, chain)
 
         if token:
-            self.cache[cache_key] = token
+            self.set_cache_item(cache_key, token)
         return token
 
+    async def _first_available(self, providers: List[Tuple[str, Callable[[], Awaitable[Any]]]]) -> Any:
+        """
+        Walk a provider fallback chain and return the first non-empty result.
+
+        Providers whose circuit is open are skipped without waiting on them, and a
+        provider that errors is logged and skipped rather than failing the chain.
+        """
+        for client_type, call in providers:
+            client = self._get_client(client_type)
+            breaker = getattr(client, 'circuit_breaker', None)
+            if breaker is not None and not breaker.available():
+                logger.info(f"Skipping {client_type}: circuit open for another {breaker.retry_in():.1f}s")
+                continue
+            try:
+                result = await call()
+            except Exception as e:
+                logger.warning(f"{client_type} failed, trying next provider: {str(e)}")
+                continue
+            if result:
+                return result
+        return None
+
     async def get_token_info(self, address: str, chain: str = 'solana') -> Optional[Token]:
         cache_key = f"token_info:{chain}:{address}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
 
         token = None
         chaininfo = get_chain_info(chain)
         if chaininfo.chainId == -1:
-            # print(f"Token from solscan:")
-            token = await self.solscan_client.get_token_info(address)
-            if not token:
-                token = await self.birdeye_client.get_token_info(address)
-                # print(f"Token from birdeye: {token}")
-            if not token:
-                token = await self.gmgn_client.get_token_info(address, chain)
-                # print(f"Token from gmgn: {token}")
+            token = await self._first_available([
+                ('solscan', lambda: self.solscan_client.get_token_info(address)),
+                ('birdeye', lambda: self.birdeye_client.get_token_info(address)),
+                ('gmgn', lambda: self.gmgn_client.get_token_info(address, chain)),
+            ])
         elif chaininfo.chainId == 1:
-            token = await self.gmgn_client.get_token_info(address, chain)
-            if not token:
-                token = await self.dexscreener_client.get_processed_token_info([address])
+            token = await self._first_available([
+                ('gmgn', lambda: self.gmgn_client.get_token_info(address, chain)),
+                ('dexscreener', lambda: self.dexscreener_client.get_processed_token_info([address])),
+            ])
             # Implement for other chains if needed
 
         if token:
-            self.cache[cache_key] = token
+            self.set_cache_item(cache_key, token)
         return token
 
     async def get_price_history(self, address: str, chain: str = 'solana', interval: str = '15m', limit: int = 1000) -> List[PriceHistoryPoint]:
         cache_key = f"price_history:{chain}:{address}:{interval}:{limit}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
 
         price_history = await self.birdeye_client.get_price_history(address, interval=interval, max_records=limit)
-        self.cache[cache_key] = price_history
+        self.set_cache_item(cache_key, price_history)
         return price_history
 
     async def get_top_holders(self, address: str, chain: str = 'solana', limit: int = 20) -> List[Holder]:
         cache_key = f"top_holders:{chain}:{address}:{limit}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
 
-        holders = await self.solscan_client.get_top_holders(address, page_size=limit)
-        if not holders:
-            holders = await self.birdeye_client.get_all_top_traders(address, max_traders=limit)
+        holders = await self._first_available([
+            ('solscan', lambda: self.solscan_client.get_top_holders(address, page_size=limit)),
+            ('birdeye', lambda: self.birdeye_client.get_all_top_traders(address, max_traders=limit)),
+        ])
 
-        self.cache[cache_key] = holders
+        self.set_cache_item(cache_key, holders)
         return holders
 
     async def get_hot_tokens(self, chain: str = 'solana', limit: int = 100) -> List[Token]:
         cache_key = f"hot_tokens:{chain}:{limit}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
 
         hot_tokens = await self.gmgn_client.get_token_list(chain, limit=limit)
-        self.cache[cache_key] = hot_tokens
+        self.set_cache_item(cache_key, hot_tokens)
         return hot_tokens
 
-    async def search_logs(self, index: str, start_block: int, end_block: int, event_topics: List[str], size: int = 1000) -> List[Dict[str, Any]]:
+    async def search_logs(self, index: str, start_block: int, end_block: int, event_topics: List[str], size: int = 1000, slices: int = 1) -> List[Dict[str, Any]]:
         cache_key = f"logs:{index}:{start_block}:{end_block}:{':'.join(event_topics)}:{size}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
 
-        logs = await self.opensearch_client.search_logs(index, start_block, end_block, event_topics, size)
-        self.cache[cache_key] = logs
+        logs = await self.opensearch_client.search_logs(index, start_block, end_block, event_topics, size, slices=slices)
+        self.set_cache_item(cache_key, logs)
         return logs
 
-    async def get_blocks_brief(self, start_block: int, end_block: int, size: int = 1000) -> List[Dict[str, Any]]:
+    def tail_blocks(self, checkpoint_path: Optional[str] = None, index: str = "eth_block", **kwargs):
+        """
+        Follow new blocks from OpenSearch instead of re-querying overlapping windows.
+
+        Returns a BlockTailer; register consumers with ``subscribe(callback, kind)``
+        ("block", "transaction" or "log") and run it with ``await tailer.run()``.
+        """
+        return self.opensearch_client.tailer(checkpoint_path, index=index, **kwargs)
+
+    async def get_blocks_brief(self, start_block: int, end_block: int, size: int = 1000, slices: int = 1) -> List[Dict[str, Any]]:
         cache_key = f"blocks_brief:{start_block}:{end_block}"
         cached_result = self.get_cache_item(cache_key)
         if cached_result:
             return cached_result
 
-        blocks = await self.opensearch_client.get_blocks_brief(start_block, end_block, size)
+        blocks = await self.opensearch_client.get_blocks_brief(start_block, end_block, size, slices=slices)
         
         # Only cache if the result is not too large
         if len(blocks) <= 10000:  # Adjust this threshold as needed
@@ -357,30 +432,33 @@ class DataCenter:
     async def get_token_price_history(self, token_address: str, chain: str = 'eth', resolution: str = '1m', from_time: int = None, to_time: int = None) -> Optional[List[Dict[str, Any]]]:
         cache_key = f"token_price_history:{chain}:{token_address}:{resolution}:{from_time}:{to_time}"
         # logger.info(f"Getting token price history for {chain}:{token_address} with resolution {resolution} from {from_time} to {to_time}")
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
 
         price_history = await self.gmgn_client.get_token_price_history(token_address, chain, resolution, from_time, to_time)
         # logger.info(f"Got token price history for {token_address}: {price_history}")
-        self.cache[cache_key] = price_history['data']
+        self.set_cache_item(cache_key, price_history['data'])
         return price_history['data']
 
     async def get_new_pairs(self, chain: str = 'sol', limit: int = 100, max_initial_quote_reserve: float = 30) -> Optional[List[Dict[str, Any]]]:
         cache_key = f"new_pairs:{chain}:{limit}:{max_initial_quote_reserve}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
 
         new_pairs = await self.gmgn_client.get_new_pairs(chain, limit, max_initial_quote_reserve)
-        self.cache[cache_key] = new_pairs
+        self.set_cache_item(cache_key, new_pairs)
         return new_pairs
 
     async def get_wallet_data(self, address: str, chain: str = 'sol', period: str = '7d') -> Optional[Dict[str, Any]]:
         cache_key = f"wallet_data:{chain}:{address}:{period}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
 
         wallet_data = await self.gmgn_client.get_wallet_data(address, chain, period)
-        self.cache[cache_key] = wallet_data
+        self.set_cache_item(cache_key, wallet_data)
         return wallet_data
 
     async def sample_transactions(
@@ -600,8 +678,9 @@ class DataCenter:
 
     async def get_deployed_contracts(self, address: str, chain: str = 'eth') -> Optional[List[Dict[str, Any]]]:
         cache_key = f"deployed_contracts:{chain}:{address}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
         chain_obj = get_chain_info(chain)
         try:
             response = await self.chainbase_client.query({
@@ -613,7 +692,7 @@ class DataCenter:
                     row['contract_address'] 
                     for row in response['data'].get('result', [])
                 ]
-                self.cache[cache_key] = deployed_contracts
+                self.set_cache_item(cache_key, deployed_contracts)
                 return deployed_contracts
             return []
         except Exception as e:
@@ -622,8 +701,9 @@ class DataCenter:
 
     async def get_deployed_block(self, address: str, chain: str = 'eth') -> Optional[int]:
         cache_key = f"deployed_block:{chain}:{address}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
         
         try:
             deployment = await self.etherscan_client.get_deployment(address)
@@ -631,7 +711,7 @@ class DataCenter:
             tx = self.w3_client.eth.get_transaction(deployed_tx)
             deployed_block = tx['blockNumber']
 
-            self.cache[cache_key] = deployed_block
+            self.set_cache_item(cache_key, deployed_block)
             return deployed_block
         except Exception as e:
             logger.error(f"Error fetching deployed block for {address}: {str(e)}")
@@ -641,9 +721,18 @@ class DataCenter:
 
     async def get_contract_tx_user_count(self, address: str, chain: str = 'sol') -> Optional[Dict[str, Any]]:
         cache_key = f"contract_tx_user_count:{chain}:{address}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
         chain_obj = get_chain_info(chain)
+        if chain_obj.chainId == 1:
+            # Counted on the cluster; only the two numbers come back
+            try:
+                result = await self.opensearch_client.get_contract_tx_stats(address)
+                self.set_cache_item(cache_key, result)
+                return result
+            except Exception as e:
+                logger.warning(f"OpenSearch aggregation failed for {address}, falling back to Chainbase: {str(e)}")
         try:
             response = await self.chainbase_client.query({
                 "query":f"SELECT count(*) as tx_count, count(DISTINCT from_address) as user_count\nFROM {chain_obj.icon}.transactions\nWHERE to_address = '{address}'"
@@ -651,7 +740,7 @@ class DataCenter:
             if response and 'data' in response:
                 user_count = response['data']['result'][0]['user_count']
                 tx_count = response['data']['result'][0]['tx_count']
-                self.cache[cache_key] = {'user_count': user_count, 'tx_count': tx_count}
+                self.set_cache_item(cache_key, {'user_count': user_count, 'tx_count': tx_count})
                 return {'user_count': user_count, 'tx_count': tx_count}
             return {'user_count': 0, 'tx_count': 0}
         except Exception as e:
@@ -661,20 +750,19 @@ class DataCenter:
     def clear_cache(self):
         self.cache.clear()
 
-    def set_cache_item(self, key: str, value: Any, expiration: int = 3600):
-        self.cache[key] = {
-            'value': value,
-            'expiration': time.time() + expiration
-        }
+    def set_cache_item(self, key: str, value: Any, expiration: Optional[int] = None):
+        """Cache a value, using the TTL of its key family unless expiration is given."""
+        if expiration is None:
+            family = key.split(':', 1)[0]
+            expiration = self.CACHE_TTLS[family] if family in self.CACHE_TTLS else self.DEFAULT_CACHE_TTL
+        self.cache.set(key, value, expiration)
 
     def get_cache_item(self, key: str) -> Optional[Any]:
-        if key in self.cache:
-            item = self.cache[key]
-            if time.time() < item['expiration']:
-                return item['value']
-            else:
-                del self.cache[key]
-        return None
+        return self.cache.get(key)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss/eviction counters."""
+        return self.cache.stats()
 
     async def close(self):
         """Close all clients and cleanup resources"""
@@ -686,6 +774,10 @@ class DataCenter:
                     client.close()
             elif hasattr(client, 'session') and hasattr(client.session, 'close'):
                 await client.session.close()
+        await self._session_registry.close()
+        if self._funding_edges is not None:
+            self._funding_edges.close()
+            self._funding_edges = None
         
         # clients = [
         #     self.geckoterminal_client,
@@ -741,8 +833,8 @@ class DataCenter:
         """Async context manager exit with proper cleanup"""
         await self.close()
 
-    async def get_specific_txs(self, to_address: str, start_block: int, end_block: int, size: int = 1000) -> List[Dict[str, Any]]:
-        cache_key = f"specific_txs:{to_address}:{start_block}:{end_block}:{size}"
+    async def get_specific_txs(self, to_address: str, start_block: int, end_block: int, size: int = 1000, slices: int = 1, profile: str = 'full') -> List[Dict[str, Any]]:
+        cache_key = f"specific_txs:{to_address}:{start_block}:{end_block}:{size}:{profile}"
         cached_result = self.get_cache_item(cache_key)
         if cached_result is not None:
             logger.warning(f"Returning cached result for {cache_key}")
@@ -750,7 +842,7 @@ class DataCenter:
 
         logger.info(f"Fetching transactions for address {to_address} from block {start_block} to {end_block}")
         try:
-            transactions = await self.opensearch_client.get_specific_txs(to_address, start_block, end_block, size)
+            transactions = await self.opensearch_client.get_specific_txs(to_address, start_block, end_block, size, slices=slices, profile=profile)
             logger.info(f"Retrieved {len(transactions)} transactions for address {to_address}")
 
             if transactions:
@@ -769,8 +861,8 @@ class DataCenter:
             logger.error(f"Error fetching transactions: {str(e)}")
             return []
 
-    async def get_specific_txs_batched(self, to_address: str, start_block: int, end_block: int, size: int = 1000) -> List[Dict[str, Any]]:
-        cache_key = f"specific_txs_batch:{to_address}:{start_block}:{end_block}:{size}"
+    async def get_specific_txs_batched(self, to_address: str, start_block: int, end_block: int, size: int = 1000, slices: int = 1, profile: str = 'full') -> List[Dict[str, Any]]:
+        cache_key = f"specific_txs_batch:{to_address}:{start_block}:{end_block}:{size}:{profile}"
         cached_result = self.get_cache_item(cache_key)
         if cached_result is not None:
             logger.warning(f"Returning cached result for {cache_key}")
@@ -783,7 +875,7 @@ class DataCenter:
             min_block = float('inf')
             max_block = float(0)
 
-            async for batch in self.opensearch_client.get_specific_txs_batched(to_address, start_block, end_block, size):
+            async for batch in self.opensearch_client.get_specific_txs_batched(to_address, start_block, end_block, size, slices=slices, profile=profile):
                 total_transactions += len(batch)
                 if batch:
                     min_block = min(min_block, min(tx['block_number'] for tx in batch))
@@ -807,11 +899,12 @@ class DataCenter:
 
     async def get_token_security(self, address: str, chain: str = 'sol') -> Optional[Dict[str, Any]]:
         cache_key = f"token_security:{chain}:{address}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cached_result = self.get_cache_item(cache_key)
+        if cached_result is not None:
+            return cached_result
 
         token_security = await self.goplus_client.get_tokens_security([address], chain)[0]
-        self.cache[cache_key] = token_security
+        self.set_cache_item(cache_key, token_security)
         return token_security
 
     async def has_code(self, address: str, chain: str = 'eth') -> bool:
@@ -1025,15 +1118,23 @@ class DataCenter:
 
             if isinstance(tx_hash, bytes):
                 tx_hash = tx_hash.hex()
-            # Use loop.run_in_executor for blocking Web3 calls
+            # Use loop.run_in_executor for blocking Web3 calls; both are independent
             loop = asyncio.get_event_loop()
-            tx = await loop.run_in_executor(None, lambda: self.w3_client.eth.get_transaction(tx_hash))
-            receipt = await loop.run_in_executor(None, lambda: self.w3_client.eth.get_transaction_receipt(tx_hash))
+            tx, receipt = await asyncio.gather(
+                loop.run_in_executor(None, lambda: self.w3_client.eth.get_transaction(tx_hash)),
+                loop.run_in_executor(None, lambda: self.w3_client.eth.get_transaction_receipt(tx_hash))
+            )
 
             if tx is None or receipt is None:
                 logger.error("Transaction or receipt not found")
                 raise ValueError("Transaction or receipt not found")
 
+            # Remember where the transaction lives for later OpenSearch lookups by hash
+            opensearch = getattr(self, '_clients', {}).get('opensearch')
+            if opensearch is not None and opensearch.tx_locations is not None:
+                await loop.run_in_executor(None, opensearch.tx_locations.put_many,
+                                           [(tx_hash, tx['blockNumber'], tx['transactionIndex'], None)])
+
             tx_dict = dict(tx)
             for key, value in tx_dict.items():
                 if hasattr(value, 'hex'):
@@ -1365,6 +1466,115 @@ class DataCenter:
         
         return aggregated
 
+    async def get_funding_clusters(
+        self,
+        addresses: List[str],
+        max_depth: int = 20,
+        stop_at_cex: bool = True,
+        include_pairs: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Group addresses by shared funders, from one batched traversal of their funding forest.
+
+        The funders of all addresses are resolved together, one batched funding lookup
+        and one label query per depth level, and everything else (components, common
+        funders, pair depths) is computed in memory from the combined chains.
+
+        Args:
+            addresses: Addresses to cluster
+            max_depth: Maximum number of funding hops followed from each address (default: 20)
+            stop_at_cex: If True, chains end below CEX funders, so a shared exchange
+                does not relate the addresses it funded (default: True)
+            include_pairs: Also return the relationship of every related pair within
+                each cluster (default: True)
+
+        Returns:
+            List[Dict[str, Any]]: One entry per connected component, largest first:
+                - addresses: The addresses in the component
+                - common_funder: Lowest funder shared by all of them (None for single
+                  addresses, or when chains cut by max_depth leave no shared funder)
+                - depths: Depth of the common funder from each address
+                - pairs: {(address1, address2): {common_funder, depth1, depth2,
+                  tx_hash1, tx_hash2}} for related pairs, when include_pairs is set
+        """
+        try:
+            forest = await FundingForest(self._funding_graph(), addresses, max_depth, stop_at_cex).build()
+            clusters = []
+            for members in sorted(forest.components(), key=len, reverse=True):
+                common = forest.common_funder(members) if len(members) > 1 else None
+                cluster = {
+                    'addresses': members,
+                    'common_funder': common['common_funder'] if common else None,
+                    'depths': common['depths'] if common else {}
+                }
+                if include_pairs:
+                    pairs = {}
+                    for i, first in enumerate(members):
+                        for second in members[i + 1:]:
+                            relationship = forest.relationship(first, second)
+                            if relationship:
+                                pairs[(first, second)] = relationship
+                    cluster['pairs'] = pairs
+                clusters.append(cluster)
+            logger.info(f"Funding clusters of {len(forest.addresses)} addresses resolved with "
+                        f"{forest.graph.edge_fetches} funding lookups")
+            return clusters
+
+        except Exception as e:
+            logger.error(f"Error getting funding clusters: {str(e)}")
+            return []
+
+    async def find_dev_funding_relationships(
+        self,
+        dev_address: str,
+        target_addresses: List[str],
+        max_depth: int = 20,
+        stop_at_cex: bool = True,
+        min_common_depth: int = 0
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Find the closest common funder between a developer address and each target.
+
+        The dev and all targets are resolved as one funding forest (see
+        get_funding_clusters), so checking thousands of targets is one batched job
+        rather than one check_funding_relationship call per target.
+
+        Args:
+            dev_address: The developer address
+            target_addresses: Addresses to relate to the developer; the dev itself is skipped
+            max_depth: Maximum number of funding hops followed from each address (default: 20)
+            stop_at_cex: If True, a shared CEX funder does not count as a relationship (default: True)
+            min_common_depth: Ignore common funders fewer hops than this from either
+                address, e.g. 1 to skip targets funded by the dev directly (default: 0)
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Related targets mapped to:
+                - common_funder: The closest common funder (the dev or target itself at depth 0)
+                - dev_depth: Depth of the common funder in the dev's funding chain
+                - target_depth: Depth of the common funder in the target's funding chain
+                - dev_tx: Transaction from the common funder down the dev's chain
+                - target_tx: Transaction from the common funder down the target's chain
+        """
+        targets = [target for target in dict.fromkeys(target_addresses) if target.lower() != dev_address.lower()]
+        try:
+            forest = await FundingForest(self._funding_graph(), [dev_address] + targets, max_depth, stop_at_cex).build()
+            relationships = {}
+            for target in targets:
+                relationship = forest.relationship(dev_address, target, min_common_depth)
+                if relationship:
+                    relationships[target] = {
+                        'common_funder': relationship['common_funder'],
+                        'dev_depth': relationship['depth1'],
+                        'target_depth': relationship['depth2'],
+                        'dev_tx': relationship['tx_hash1'],
+                        'target_tx': relationship['tx_hash2']
+                    }
+            return relationships
+
+        except Exception as e:
+            logger.error(f"Error finding dev funding relationships: {str(e)}")
+            return {}
+
     async def get_txs_with_logs_at_block(self, block_number: int = -1, chain: str = 'eth') -> List[Dict[str, Any]]:
         try:
             chain_obj = get_chain_info(chain)
@@ -1673,9 +1883,7 @@ class DataCenter:
 
     async def get_funder_address(self, address: str) -> Optional[str]:
         """
-        Get the funder's address for a given address by:
-        1. Getting the funding transaction hash from the funding service
-        2. Querying the transaction details to get the 'from' address (funder)
+        Get the funder's address for a given address from its first funding transaction.
         
         Args:
             address: The address to find the funder for
@@ -1684,25 +1892,11 @@ class DataCenter:
             Optional[str]: The funder's address if found, None otherwise
         """
         try:
-            # Get funding transaction hash
-            funding_result = await self.funding_client.simulate_view_first_fund(address)
-            
-            if not funding_result or 'result' not in funding_result:
+            edge = (await self._fetch_funding_edges([address])).get(address)
+            if edge is None:
                 logger.error(f"No funding transaction found for address {address}")
                 return None
-            # print(funding_result['result'])
-            tx_hash = funding_result['result']['TxnHash']
-            if not tx_hash:
-                logger.error(f"Empty transaction hash returned for address {address}")
-                return None
-            
-            # Get transaction details using web3
-            tx = self.w3_client.eth.get_transaction(tx_hash)
-            if not tx:
-                logger.error(f"Could not find transaction {tx_hash}")
-                return None
-                
-            return tx['from']
+            return edge.funder
             
         except Exception as e:
             logger.error(f"Error getting funder address for {address}: {str(e)}")
@@ -1710,9 +1904,8 @@ class DataCenter:
 
     async def get_funder_addresses(self, addresses: List[str]) -> Dict[str, Optional[str]]:
         """
-        Get the funder's addresses for a list of addresses by:
-        1. Getting the funding transaction hashes in batch from the funding service
-        2. Querying the transaction details to get the 'from' addresses (funders)
+        Get the funder's addresses for a list of addresses from their first funding
+        transactions, read from the edge store or fetched in batches.
         
         Args:
             addresses: List of addresses to find the funders for
@@ -1721,62 +1914,72 @@ class DataCenter:
             Dict[str, Optional[str]]: Dictionary mapping each input address to its funder's address
         """
         try:
-            # Get funding transaction hashes in batch
-            funding_results = await self.funding_client.batch_simulate_view_first_fund(addresses)
+            edges = await self._fetch_funding_edges(addresses)
+            return {addr: edges[addr].funder if edges.get(addr) else None for addr in addresses}
             
-            if not funding_results:
-                logger.error("No funding transactions found")
-                return {addr: None for addr in addresses}
-
-            # Process results and get transaction details
-            funder_map = {}
-            for addr, result in zip(addresses, funding_results):
-                try:
-                    if not result or 'result' not in result or not result['result']:
-                        logger.error(f"No funding transaction found for address {addr}")
-                        funder_map[addr] = None
-                        continue
+        except Exception as e:
+            logger.error(f"Error getting funder addresses: {str(e)}")
+            return {addr: None for addr in addresses}
 
-                    result_data = result['result']
-                    tx_hash = result_data.get('TxnHash')
-                    if not tx_hash:
-                        logger.error(f"Empty transaction hash returned for address {addr}")
-                        funder_map[addr] = None
-                        continue
+    async def _fetch_funding_edges(self, addresses: List[str]) -> Dict[str, Optional[FundingEdge]]:
+        """
+        First-fund edges for many addresses, from the edge store or batched funding RPCs.
 
-                    # Try to get funder from API response first
-                    next_funder = result_data.get('From')
-                    
-                    if not next_funder:
-                        # Fallback to transaction lookup
-                        try:
-                            loop = asyncio.get_event_loop()
-                            tx = await loop.run_in_executor(
-                                None,
-                                self.w3_client.eth.get_transaction,
-                                tx_hash
-                            )
-                            if not tx:
-                                logger.error(f"No transaction found for hash {tx_hash}")
-                                funder_map[addr] = None
-                                continue
-                            next_funder = tx['from']
-                        except Exception as e:
-                            logger.error(f"Error getting transaction {tx_hash}: {str(e)}")
-                            funder_map[addr] = None
-                            continue
+        Edges missing from the store are fetched and written back. Funders missing
+        from the funding response are read from the funding transaction. Addresses
+        with no funding map to None; addresses whose lookup failed are left out.
+        """
+        store = self.funding_edges
+        # SQLite reads and commits run in the default executor, off the event loop
+        loop = asyncio.get_event_loop()
+        stored = await loop.run_in_executor(None, store.get_many, addresses)
+        edges = {address: FundingEdge(*edge) if edge else None for address, edge in stored.items()}
+        missing = [address for address in dict.fromkeys(addresses) if address not in edges]
+        if missing:
+            fetched = await self._fetch_funding_edges_remote(missing)
+            await loop.run_in_executor(None, store.put_many, fetched)
+            edges.update(fetched)
+        return edges
+
+    async def _fetch_funding_edges_remote(self, addresses: List[str]) -> Dict[str, Optional[FundingEdge]]:
+        first_funds = await self.funding_client.get_first_funds(addresses)
+        edges = {}
+        missing_funder = {}
+        for address in addresses:
+            if address not in first_funds:
+                continue
+            result = first_funds[address]
+            tx_hash = result.get('TxnHash') if result else None
+            if not tx_hash:
+                edges[address] = None
+            elif result.get('From'):
+                edges[address] = FundingEdge(result['From'], tx_hash)
+            else:
+                missing_funder[address] = tx_hash
 
-                    funder_map[addr] = next_funder
+        if missing_funder:
+            loop = asyncio.get_event_loop()
+            txs = await asyncio.gather(*[
+                loop.run_in_executor(None, self.w3_client.eth.get_transaction, tx_hash)
+                for tx_hash in missing_funder.values()
+            ], return_exceptions=True)
+            for (address, tx_hash), tx in zip(missing_funder.items(), txs):
+                if isinstance(tx, Exception):
+                    logger.error(f"Error getting transaction {tx_hash}: {str(tx)}")
+                elif not tx:
+                    logger.error(f"No transaction found for hash {tx_hash}")
+                    edges[address] = None
+                else:
+                    edges[address] = FundingEdge(tx['from'], tx_hash)
+        return edges
 
-                except Exception as e:
-                    logger.error(f"Error processing address {addr}: {str(e)}")
-                    funder_map[addr] = None
+    async def _fetch_funder_labels(self, addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Labels for many addresses in one query, keyed by lowercase address."""
+        label_results = self._get_client('label').get_addresses_labels(addresses)
+        return {result['address'].lower(): result for result in label_results}
 
-            return funder_map
-            
-        except Exception as e:
-            logger.error(f"Error getting funder addresses: {str(e)}")
-            return {addr: None for addr in addresses}
+    def _funding_graph(self) -> FundingGraph:
+        return FundingGraph(self._fetch_funding_edges, self._fetch_funder_labels)
 
     async def get_funder_tree(
         self, 
@@ -1785,7 +1988,11 @@ class DataCenter:
         stop_at_cex: bool = True
     ) -> Dict[str, Any]:
         """
-        Recursively get the funder tree for given addresses up to a specified depth.
+        Get the funder tree for given addresses up to a specified depth.
+
+        The tree is resolved breadth first: each depth level is one set of batched
+        funding RPCs and one label query for the whole frontier, and a funder shared
+        by several addresses is only looked up once.
         
         Args:
             addresses: List of addresses to find the funders for
@@ -1803,112 +2010,12 @@ class DataCenter:
             return {}
 
         try:
-            # Process addresses in batches of 10 for efficiency
-            tree = {}
-            batch_size = 10
-            
-            for i in range(0, len(addresses), batch_size):
-                batch_addresses = addresses[i:i + batch_size]
-                
-                # Get funding information for current batch
-                funding_results = await self.funding_client.batch_simulate_view_first_fund(batch_addresses)
-                
-                if not funding_results:
-                    logger.error(f"No funding transactions found for addresses: {batch_addresses}")
-                    tree.update({addr: None for addr in batch_addresses})
-                    continue
+            graph = self._funding_graph()
+            levels = await graph.expand(addresses, max_depth, stop_at_cex)
+            logger.info(f"Funder tree resolved {sum(len(level) for level in levels)} addresses "
+                        f"in {len(levels)} levels")
+            return graph.tree(addresses, max_depth, stop_at_cex)
 
-                # Process results and build tree
-                next_level_addresses = set()  # Using set to avoid duplicate funder addresses
-                funders_to_check = set()  # Collect funders to check labels in batch
-
-                # First pass: build current level and collect funders to check
-                for addr, result in zip(batch_addresses, funding_results):
-                    try:
-                        if not result or 'result' not in result or not result['result']:
-                            logger.error(f"No funding transaction found for address {addr}")
-                            tree[addr] = None
-                            continue
-
-                        result_data = result['result']
-                        tx_hash = result_data.get('TxnHash')
-                        if not tx_hash:
-                            logger.error(f"Empty transaction hash returned for address {addr}")
-                            tree[addr] = None
-                            continue
-
-                        # Get funder address
-                        next_funder = result_data.get('From')
-                        if not next_funder:
-                            try:
-                                tx = await asyncio.get_event_loop().run_in_executor(
-                                    None,
-                                    self.w3_client.eth.get_transaction,
-                                    tx_hash
-                                )
-                                if not tx:
-                                    logger.error(f"No transaction found for hash {tx_hash}")
-                                    tree[addr] = None
-                                    continue
-                                next_funder = tx['from']
-                            except Exception as e:
-                                logger.error(f"Error getting transaction {tx_hash}: {str(e)}")
-                                tree[addr] = None
-                                continue
-
-                        tree[addr] = {
-                            "funder": next_funder,
-                            "funded_at": tx_hash,
-                            "is_cex": False,  # Will be updated in batch
-                            "next_level": {}  # Initialize as empty dict
-                        }
-                        funders_to_check.add(next_funder)
-                        next_level_addresses.add(next_funder)
-
-                    except Exception as e:
-                        logger.error(f"Error processing address {addr}: {str(e)}")
-                        tree[addr] = None
-
-                # Check labels for all funders in this batch
-                if funders_to_check:
-                    funder_labels = self._get_client('label').get_addresses_labels(list(funders_to_check))
-                    funder_is_cex = {
-                        label_info['address']: label_info['is_cex']
-                        for label_info in funder_labels
-                    }
-                    
-                    # Update tree with CEX information
-                    for addr in batch_addresses:
-                        if tree.get(addr) and tree[addr].get('funder'):
-                            funder = tree[addr]['funder']
-                            is_cex = funder_is_cex.get(funder, False)
-                            name_tag = funder_is_cex.get(funder, '').upper()
-                            is_cex = any(cex_term in name_tag for cex_term in ['BINANCE', 'HUOBI', 'COINBASE', 'KRAKEN', 'BITFINEX', 'EXCHANGE'])
-                            tree[addr]['is_cex'] = is_cex
-                            
-                            # If this is a CEX and we should stop, don't traverse further
-                            if stop_at_cex and is_cex:
-                                tree[addr]['next_level'] = None
-                            else:
-                                next_level_addresses.add(funder)
-
-                # Recursively get next level for addresses we're continuing to traverse
-                if next_level_addresses and max_depth > 1:
-                    next_level = await self.get_funder_tree(
-                        list(next_level_addresses),
-                        max_depth - 1,
-                        stop_at_cex
-                    )
-                    
-                    # Update tree with next level results
-                    for addr in batch_addresses:
-                        if (tree.get(addr) and tree[addr].get('funder') and 
-                            tree[addr]['next_level'] is not None):
-                            funder = tree[addr]['funder']
-                            tree[addr]['next_level'] = next_level.get(funder)
-
-            return tree
-            
         except Exception as e:
             logger.error(f"Error in get_funder_tree: {str(e)}")
             return {addr: None for addr in addresses}
@@ -1921,7 +2028,7 @@ class DataCenter:
         
         Args:
             address: The address to find the root funder for
-            max_depth: Maximum depth to prevent infinite loops (default: 20)
+            max_depth: Maximum depth to prevent infinite loops (default: 100)
 
         Returns:
             Optional[Dict[str, Any]]: Dictionary containing:
@@ -1931,91 +2038,19 @@ class DataCenter:
                 - is_root: True if this is confirmed to be the root funder (no further funding found)
             Returns None if no funding information is found
         """
-        try:
-            current_address = address
-            current_depth = 0
-            last_tx_hash = None
-            
-            while current_depth < max_depth:
-                # Try to get next funder
-                result = await self.funding_client.simulate_view_first_fund(current_address)
-                
-                # If no funding info found, we've reached a root funder
-                if not result or 'result' not in result or not result['result']:
-                    if current_depth > 0:
-                        return {
-                            "address": current_address,
-                            "tx_hash": last_tx_hash,
-                            "depth": current_depth,
-                            "is_root": True  # Confirmed root as no further funding found
-                        }
-                    return None
-
-                result_data = result['result']
-                tx_hash = result_data.get('TxnHash')
-                if not tx_hash:
-                    if current_depth > 0:
-                        return {
-                            "address": current_address,
-                            "tx_hash": last_tx_hash,
-                            "depth": current_depth,
-                            "is_root": True  # No transaction hash means no further funding
-                        }
-                    return None
-
-                # Try to get funder from API response first
-                next_funder = result_data.get('From')
-                
-                if not next_funder:
-                    # Fallback to transaction lookup
-                    try:
-                        loop = asyncio.get_event_loop()
-                        tx = await loop.run_in_executor(None, lambda: self.w3_client.eth.get_transaction(tx_hash))
-                        if not tx:
-                            if current_depth > 0:
-                                return {
-                                    "address": current_address,
-                                    "tx_hash": last_tx_hash,
-                                    "depth": current_depth,
-                                    "is_root": True  # No transaction means no further funding
-                                }
-                            return None
-                        next_funder = tx['from']
-                    except Exception as tx_error:
-                        logger.error(f"Error getting transaction {tx_hash}: {str(tx_error)}")
-                        if current_depth > 0:
-                            return {
-                                "address": current_address,
-                                "tx_hash": last_tx_hash,
-                                "depth": current_depth,
-                                "is_root": False  # Error means we're not sure if this is root
-                            }
-                        return None
-
-                # Update for next iteration
-                last_tx_hash = tx_hash
-                current_address = next_funder
-                current_depth += 1
-
-            # If we reach max depth, return the last funder but indicate it might not be root
-            return {
-                "address": current_address,
-                "tx_hash": last_tx_hash,
-                "depth": current_depth,
-                "is_root": False  # Reached max depth, might not be actual root
-            }
-
-        except Exception as e:
-            logger.error(f"Error getting root funder for {address}: {str(e)}")
-            return None
+        return (await self.get_root_funders([address], max_depth)).get(address)
 
     async def get_root_funders(self, addresses: List[str], max_depth: int = 100) -> Dict[str, Optional[Dict[str, Any]]]:
         """
         Get the root funders (earliest funders with no further funding sources) for a list of addresses.
+
+        All walks advance together, one batched funding lookup per hop for every
+        pending walk, and each visited address remembers its root, so walks that
+        share ancestry stop as soon as they reach an address already resolved.
         
         Args:
             addresses: List of addresses to find the root funders for
-            max_depth: Maximum depth to prevent infinite loops (default: 20)
+            max_depth: Maximum depth to prevent infinite loops (default: 100)
             
         Returns:
             Dict[str, Optional[Dict[str, Any]]]: Dictionary mapping input addresses to their root funder info.
@@ -2025,11 +2060,17 @@ class DataCenter:
                 - depth: How many levels deep we found this funder
                 - is_root: True if this is confirmed to be the root funder
         """
-        tasks = [self.get_root_funder(addr, max_depth) for addr in addresses]
-        results = await asyncio.gather(*tasks)
-        return dict(zip(addresses, results))
+        try:
+            resolver = RootResolver(FundingGraph(self._fetch_funding_edges))
+            roots = await resolver.resolve(addresses, max_depth)
+            logger.info(f"Root funders of {len(addresses)} addresses resolved with "
+                        f"{resolver.graph.edge_fetches} funding lookups")
+            return {address: root.as_dict() if root else None for address, root in roots.items()}
+
+        except Exception as e:
+            logger.error(f"Error getting root funders: {str(e)}")
+            return {addr: None for addr in addresses}
 
-    @file_cache(namespace="funding_path", ttl=3600*24)  # Cache for 24 hours
     async def get_funding_path(self, address: str, max_depth: int = 20, stop_at_cex: bool = True) -> List[Dict[str, Any]]:
         """
         Get the complete funding path for an address up to the root funder or first CEX.
@@ -2059,33 +2100,11 @@ class DataCenter:
         
         try:
             while depth < max_depth:
-                # Get funding info for current address
-                result = await self.funding_client.simulate_view_first_fund(current_address)
-                
-                # If no funding info found, we've reached the end
-                if not result or 'result' not in result or not result['result']:
-                    break
-                    
-                result_data = result['result']
-                tx_hash = result_data.get('TxnHash')
-                if not tx_hash:
+                # Funding edges come from the shared edge store, or are fetched and stored
+                edge = (await self._fetch_funding_edges([current_address])).get(current_address)
+                if edge is None:
                     break
-                    
-                # Get funder address
-                next_funder = result_data.get('From')
-                if not next_funder:
-                    try:
-                        tx = await asyncio.get_event_loop().run_in_executor(
-                            None,
-                            self.w3_client.eth.get_transaction,
-                            tx_hash
-                        )
-                        if not tx:
-                            break
-                        next_funder = tx['from']
-                    except Exception as e:
-                        logger.error(f"Error getting transaction {tx_hash}: {str(e)}")
-                        break
+                tx_hash, next_funder = edge.tx_hash, edge.funder
                 
                 # Add to pending lists
                 pending_funders.append(next_funder)
@@ -2219,6 +2238,9 @@ class DataCenter:
         in their funding paths. A common funder can be:
         1. Same address in both paths
         2. Different addresses but belong to the same non-empty entity
+
+        Both paths are grown one hop at a time and the search stops as soon as no
+        deeper funder could beat the closest one found (see check_funding_relationships).
         
         Args:
             address1: First address to check
@@ -2241,88 +2263,43 @@ class DataCenter:
                 - entity: The entity of the funder (if any)
             Returns None if no relationship is found
         """
+        relationships = await self.check_funding_relationships([address1, address2], max_depth, stop_at_cex)
+        return relationships.get((address1, address2))
+
+    async def check_funding_relationships(
+        self,
+        addresses: List[str],
+        max_depth: int = 20,
+        stop_at_cex: bool = True
+    ) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Check every pair of addresses for a funding relationship, from one shared search.
+
+        The funding paths of all addresses grow together, one batched funding lookup
+        and one label query per hop, and each new funder is matched against the other
+        paths as it is found. Paths stop growing once none of their pairs can get a
+        closer common funder, so related wallets usually meet within a few hops.
+
+        Args:
+            addresses: Addresses to check against each other
+            max_depth: Maximum depth to search in each path (default: 20)
+            stop_at_cex: If True, stops each path at its first CEX (default: True)
+
+        Returns:
+            Dict[Tuple[str, str], Dict[str, Any]]: The closest relationship of each
+            related pair, keyed by the pair in input order, in the
+            check_funding_relationship format; unrelated pairs are left out
+        """
         try:
-            # Get funding paths for both addresses
-            path1 = await self.get_funding_path(address1, max_depth, stop_at_cex)
-            path2 = await self.get_funding_path(address2, max_depth, stop_at_cex)
-            # Create maps for faster lookup
-            path1_map = {step['address']: step for step in path1}
-            path2_map = {step['address']: step for step in path2}
-            
-            # Find relationships
-            relationships = []
-            
-            # Case 1: Same address funders
-            common_addresses = set(path1_map.keys()) & set(path2_map.keys())
-            for addr in common_addresses:
-                funder1 = path1_map[addr]
-                funder2 = path2_map[addr]
-                common_type = 1 if funder1.get('entity') and funder1['entity'] == funder2.get('entity') else 2
-                relationships.append({
-                    'common_funder1': addr,
-                    'common_funder2': addr,
-                    'funder1': funder1,
-                    'funder2': funder2,
-                    'combined_depth': funder1['depth'] + funder2['depth'],
-                    'common_type': common_type
-                })
-            
-            # Case 2: Different addresses with same non-empty entity
-            entity_map1 = {}
-            entity_map2 = {}
-            
-            for addr, data in path1_map.items():
-                entity = data.get('entity')
-                if entity:
-                    if entity not in entity_map1:
-                        entity_map1[entity] = []
-                    entity_map1[entity].append((addr, data))
-                    
-            for addr, data in path2_map.items():
-                entity = data.get('entity')
-                if entity:
-                    if entity not in entity_map2:
-                        entity_map2[entity] = []
-                    entity_map2[entity].append((addr, data))
-            
-            # Find addresses with same entity
-            common_entities = set(entity_map1.keys()) & set(entity_map2.keys())
-            for entity in common_entities:
-                for addr1, funder1 in entity_map1[entity]:
-                    for addr2, funder2 in entity_map2[entity]:
-                        if addr1 != addr2:  # Skip if same address (already handled in Case 1)
-                            relationships.append({
-                                'common_funder1': addr1,
-                                'common_funder2': addr2,
-                                'funder1': funder1,
-                                'funder2': funder2,
-                                'combined_depth': funder1['depth'] + funder2['depth'],
-                                'common_type': 1  # Same entity
-                            })
-            
-            if not relationships:
-                return None
-                
-            # Find the closest relationship (minimum combined depth)
-            closest = min(relationships, key=lambda x: x['combined_depth'])
-            
-            return {
-                'common_funder1': closest['common_funder1'],
-                'common_funder2': closest['common_funder2'],
-                'depth1': closest['funder1']['depth'],
-                'depth2': closest['funder2']['depth'],
-                'tx_hash1': closest['funder1']['tx_hash'],
-                'tx_hash2': closest['funder2']['tx_hash'],
-                'common_type': closest['common_type'],
-                'label': closest['funder1']['label'],
-                'name_tag': closest['funder1'].get('name_tag', ''),
-                'type': closest['funder1'].get('type', 'EOA'),
-                'entity': closest['funder1'].get('entity', '')
-            }
-            
+            search = RelationshipSearch(self._funding_graph(), addresses, max_depth, stop_at_cex)
+            relationships = await search.run()
+            logger.info(f"Funding relationships of {len(search.addresses)} addresses resolved with "
+                        f"{search.graph.edge_fetches} funding lookups")
+            return relationships
+
         except Exception as e:
-            logger.error(f"Error checking funding relationship: {str(e)}")
-            return None
+            logger.error(f"Error checking funding relationships: {str(e)}")
+            return {}
 
     async def get_txs_with_logs_at_block(self, block_number: int = -1, chain: str = 'eth') -> List[Dict[str, Any]]:
         try:
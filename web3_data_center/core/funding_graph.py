@@ -0,0 +1,531 @@
+"""
+Breadth-first traversal of first-fund edges.
+
+A first-fund edge says "address X was first funded by Y in transaction Z". A
+FundingGraph resolves edges one whole depth level at a time: every address on the
+frontier is looked up in one batched call, every new funder is labelled in one
+label query, and no address is resolved twice within a graph.
+"""
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Name tags that mark an exchange even when the entity category does not
+CEX_NAME_TERMS = ('BINANCE', 'HUOBI', 'COINBASE', 'KRAKEN', 'BITFINEX', 'EXCHANGE')
+
+
+class FundingEdge(NamedTuple):
+    funder: str
+    tx_hash: str
+
+
+class RootFunder(NamedTuple):
+    """The end of an address's funding chain, in the get_root_funder format."""
+    address: str
+    tx_hash: Optional[str]  # Funding tx from the root to the next address down the chain
+    depth: int
+    is_root: bool  # False when the chain was cut by max_depth or a failed lookup
+
+    def as_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+def label_is_cex(label_info: Optional[Dict[str, Any]]) -> bool:
+    """Whether a label (as returned by Web3LabelClient) belongs to a CEX."""
+    if not label_info:
+        return False
+    if label_info.get('is_cex'):
+        return True
+    label_type = (label_info.get('type') or '').upper()
+    name_tag = (label_info.get('name_tag') or '').upper()
+    return (any(term in label_type for term in ('CEX', 'EXCHANGE'))
+            or any(term in name_tag for term in CEX_NAME_TERMS))
+
+
+# Async callables the graph is built on: addresses -> edge per address (None when the
+# address has no funder, left out when unknown), and addresses -> label per lowercase address
+EdgeFetcher = Callable[[List[str]], Awaitable[Dict[str, Optional[FundingEdge]]]]
+LabelFetcher = Callable[[List[str]], Awaitable[Dict[str, Dict[str, Any]]]]
+
+
+class FundingGraph:
+    """
+    Memoized first-fund edges and funder labels, resolved one frontier at a time.
+
+    Addresses are compared case-insensitively.
+    """
+
+    def __init__(self, fetch_edges: EdgeFetcher, fetch_labels: Optional[LabelFetcher] = None):
+        self._fetch_edges = fetch_edges
+        self._fetch_labels = fetch_labels
+        self.edges: Dict[str, Optional[FundingEdge]] = {}
+        # Addresses whose lookup failed; not retried within this graph
+        self.failed: Set[str] = set()
+        self.labels: Dict[str, Dict[str, Any]] = {}
+        self.edge_fetches = 0
+        self.label_fetches = 0
+
+    def edge(self, address: str) -> Optional[FundingEdge]:
+        return self.edges.get(address.lower())
+
+    def is_resolved(self, address: str) -> bool:
+        """Whether the address was looked up, successfully or not."""
+        key = address.lower()
+        return key in self.edges or key in self.failed
+
+    def label(self, address: str) -> Dict[str, Any]:
+        return self.labels.get(address.lower()) or {}
+
+    def is_cex(self, address: str) -> bool:
+        return label_is_cex(self.labels.get(address.lower()))
+
+    async def resolve(self, addresses: Iterable[str]):
+        """Fetch the edges of every address not resolved yet, then label the new funders."""
+        pending = {}
+        for address in addresses:
+            if address and not self.is_resolved(address):
+                pending.setdefault(address.lower(), address)
+        if not pending:
+            return
+        self.edge_fetches += 1
+        fetched = await self._fetch_edges(list(pending.values()))
+        for key, address in pending.items():
+            if address in fetched:
+                self.edges[key] = fetched[address]
+            else:
+                self.failed.add(key)
+        await self.resolve_labels(edge.funder for edge in (self.edges.get(key) for key in pending) if edge)
+
+    async def resolve_labels(self, addresses: Iterable[str]):
+        """Fetch labels for every address not labelled yet, in one query."""
+        if self._fetch_labels is None:
+            return
+        pending = {}
+        for address in addresses:
+            if address and address.lower() not in self.labels:
+                pending.setdefault(address.lower(), address)
+        if not pending:
+            return
+        self.label_fetches += 1
+        try:
+            fetched = await self._fetch_labels(list(pending.values()))
+        except Exception as e:
+            logger.error(f"Error getting labels for {len(pending)} funders: {str(e)}")
+            fetched = {}
+        for key in pending:
+            self.labels[key] = fetched.get(key) or {}
+
+    async def expand(self, seeds: Iterable[str], max_depth: int, stop_at_cex: bool = True) -> List[List[str]]:
+        """
+        Resolve every address within ``max_depth`` levels of the seeds, one level per round.
+
+        Args:
+            seeds: Addresses to start from (level 0)
+            max_depth: Number of levels to resolve
+            stop_at_cex: Do not expand past funders labelled as a CEX
+
+        Returns:
+            List[List[str]]: The addresses resolved at each level; an address shared
+            by several branches only appears at the first level that reaches it
+        """
+        levels = []
+        seen = set()
+        frontier = list(seeds)
+        for _ in range(max_depth):
+            level = {}
+            for address in frontier:
+                if address and address.lower() not in seen:
+                    level.setdefault(address.lower(), address)
+            if not level:
+                break
+            seen.update(level)
+            levels.append(list(level.values()))
+            await self.resolve(level.values())
+            frontier = []
+            for address in level.values():
+                edge = self.edge(address)
+                if edge is not None and not (stop_at_cex and self.is_cex(edge.funder)):
+                    frontier.append(edge.funder)
+        return levels
+
+    def tree(self, addresses: Iterable[str], max_depth: int, stop_at_cex: bool = True) -> Dict[str, Any]:
+        """
+        Nested funder tree of already expanded addresses, in the get_funder_tree format.
+
+        Each node has ``funder``, ``funded_at``, ``is_cex`` and ``next_level``: the
+        funder's own node, None when the funder has no funder or is a CEX we stop
+        at, or {} at the depth limit. Subtrees shared by several branches are the
+        same object.
+        """
+        nodes: Dict[Any, Optional[Dict[str, Any]]] = {}
+
+        def node(address: str, depth: int) -> Optional[Dict[str, Any]]:
+            key = (address.lower(), depth)
+            if key not in nodes:
+                edge = self.edge(address)
+                if edge is None:
+                    nodes[key] = None
+                else:
+                    is_cex = self.is_cex(edge.funder)
+                    if stop_at_cex and is_cex:
+                        next_level = None
+                    elif depth + 1 >= max_depth:
+                        next_level = {}
+                    else:
+                        next_level = node(edge.funder, depth + 1)
+                    nodes[key] = {
+                        "funder": edge.funder,
+                        "funded_at": edge.tx_hash,
+                        "is_cex": is_cex,
+                        "next_level": next_level
+                    }
+            return nodes[key]
+
+        return {address: node(address, 0) for address in addresses}
+
+
+class RootResolver:
+    """
+    Root funders for many addresses, union-find style.
+
+    Every address a walk passes through has its root memoized (path compression),
+    so a later walk that reaches any visited ancestor finishes without further
+    lookups. Walks advance together: the next hop of every pending walk is
+    resolved in one batched ``FundingGraph.resolve`` call.
+    """
+
+    def __init__(self, graph: FundingGraph):
+        self.graph = graph
+        # Lowercase address -> root of its chain; depth 0 for addresses with no
+        # funder (is_root True) or whose lookup failed (is_root False)
+        self.roots: Dict[str, RootFunder] = {}
+
+    async def resolve(self, addresses: Iterable[str], max_depth: int) -> Dict[str, Optional[RootFunder]]:
+        """
+        Root funder of each address, following at most ``max_depth`` funding hops.
+
+        Returns:
+            Dict[str, Optional[RootFunder]]: Root per input address; None when the
+            address itself has no funder, could not be looked up or is empty
+        """
+        addresses = list(addresses)
+        walks: Dict[str, List[str]] = {}
+        for address in addresses:
+            if address:
+                walks.setdefault(address.lower(), [address])
+
+        results: Dict[str, Optional[RootFunder]] = {}
+        while walks:
+            frontier = {}
+            for key, path in list(walks.items()):
+                if self._advance(path, max_depth):
+                    frontier.setdefault(path[-1].lower(), path[-1])
+                else:
+                    results[key] = self._result(path, max_depth)
+                    del walks[key]
+            if frontier:
+                await self.graph.resolve(frontier.values())
+                # A tip the graph would not look up can never resolve; end its walk
+                # as a failed lookup instead of asking for it forever
+                for key in frontier:
+                    if not self.graph.is_resolved(key):
+                        self.graph.failed.add(key)
+        return {address: results[address.lower()] if address else None for address in addresses}
+
+    def _advance(self, path: List[str], max_depth: int) -> bool:
+        """
+        Follow known edges from the end of ``path``, compressing it once a root is found.
+
+        Returns True when the walk is waiting for the edge of ``path[-1]``.
+        """
+        seen = {address.lower() for address in path}
+        while True:
+            current = path[-1]
+            key = current.lower()
+            if key in self.roots:
+                self._compress(path)
+                return False
+            if len(path) > max_depth:
+                return False
+            if not self.graph.is_resolved(current):
+                return True
+            edge = self.graph.edge(current)
+            if edge is None or not edge.funder or edge.funder.lower() in seen:
+                # No funder, a failed lookup, an empty funder or a cycle: the chain ends here
+                confirmed = edge is None and key not in self.graph.failed
+                self.roots[key] = RootFunder(current, None, 0, confirmed)
+                continue
+            seen.add(edge.funder.lower())
+            path.append(edge.funder)
+
+    def _compress(self, path: List[str]):
+        """Point every address on the path straight at the root of its last address."""
+        parent = self.roots[path[-1].lower()]
+        for address in reversed(path[:-1]):
+            key = address.lower()
+            if key not in self.roots:
+                tx_hash = parent.tx_hash if parent.depth else self.graph.edge(address).tx_hash
+                self.roots[key] = RootFunder(parent.address, tx_hash, parent.depth + 1, parent.is_root)
+            parent = self.roots[key]
+
+    def _result(self, path: List[str], max_depth: int) -> Optional[RootFunder]:
+        root = self.roots.get(path[0].lower())
+        if root is not None and root.depth == 0:
+            return None
+        if root is not None and root.depth < max_depth:
+            return root
+        # Cut by max_depth: report the ancestor max_depth hops up, from known edges
+        current, tx_hash = path[0], None
+        for _ in range(max_depth):
+            edge = self.graph.edge(current)
+            current, tx_hash = edge.funder, edge.tx_hash
+        return RootFunder(current, tx_hash, max_depth, False)
+
+
+def funding_step(graph: FundingGraph, funder: str, tx_hash: str, depth: int) -> Dict[str, Any]:
+    """One step of a funding path, in the get_funding_path format."""
+    label_info = graph.label(funder)
+    label_type = (label_info.get('type') or 'DEFAULT').upper()
+    return {
+        'address': funder,
+        'tx_hash': tx_hash,
+        'depth': depth,
+        'is_cex': any(term in label_type for term in ('CEX', 'EXCHANGE')),
+        'label': label_info.get('label', 'Default'),
+        'name_tag': (label_info.get('name_tag') or '').upper(),
+        'type': label_type,
+        'entity': label_info.get('entity')
+    }
+
+
+def relationship(step1: Dict[str, Any], step2: Dict[str, Any]) -> Dict[str, Any]:
+    """A common funder of two paths, in the check_funding_relationship format."""
+    same_address = step1['address'].lower() == step2['address'].lower()
+    return {
+        'common_funder1': step1['address'],
+        'common_funder2': step2['address'],
+        'depth1': step1['depth'],
+        'depth2': step2['depth'],
+        'tx_hash1': step1['tx_hash'],
+        'tx_hash2': step2['tx_hash'],
+        # 1: same entity, 2: same address with no entity
+        'common_type': 2 if same_address and not step1.get('entity') else 1,
+        'label': step1['label'],
+        'name_tag': step1.get('name_tag', ''),
+        'type': step1.get('type', 'EOA'),
+        'entity': step1.get('entity', '')
+    }
+
+
+class RelationshipSearch:
+    """
+    Closest common funders between every pair of addresses, found bidirectionally.
+
+    Each address's funding path grows one hop per round, all paths in one batched
+    ``FundingGraph.resolve`` call, and every new step is matched against the steps
+    already on the other paths (same address, or a different address of the same
+    non-empty entity). A pair is settled as soon as no longer path can beat its
+    closest meeting, and paths stop growing once all their pairs are settled, so
+    related wallets usually cost two or three rounds instead of two full paths.
+    """
+
+    def __init__(self, graph: FundingGraph, addresses: Iterable[str], max_depth: int = 20, stop_at_cex: bool = True):
+        self.graph = graph
+        self.addresses = list(dict.fromkeys(addresses))
+        self.max_depth = max_depth
+        self.stop_at_cex = stop_at_cex
+        self.paths: Dict[str, List[Dict[str, Any]]] = {address: [] for address in self.addresses}
+        self.finished: Set[str] = set() if max_depth > 0 else set(self.addresses)
+        # Lowercase funder / entity -> {address: its steps through that funder / entity}
+        self._by_funder: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._by_entity: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._order = {address: i for i, address in enumerate(self.addresses)}
+        self.closest: Dict[Any, Dict[str, Any]] = {}
+
+    async def run(self) -> Dict[Any, Dict[str, Any]]:
+        """
+        Search until every pair is settled or its paths are exhausted.
+
+        Returns:
+            Dict[Tuple[str, str], Dict[str, Any]]: Closest relationship per related
+            pair, keyed by the two addresses in input order; unrelated pairs are left out
+        """
+        while True:
+            growing = [address for address in self.addresses if self._needs_growth(address)]
+            if not growing:
+                return self.closest
+            await self.graph.resolve(self._tip(address) for address in growing)
+            for address in growing:
+                self._grow(address)
+
+    def _tip(self, address: str) -> str:
+        path = self.paths[address]
+        return path[-1]['address'] if path else address
+
+    def _grow(self, address: str):
+        path = self.paths[address]
+        edge = self.graph.edge(self._tip(address))
+        if edge is None:
+            self.finished.add(address)
+            return
+        step = funding_step(self.graph, edge.funder, edge.tx_hash, len(path) + 1)
+        path.append(step)
+        self._meet(address, step)
+        if len(path) >= self.max_depth or (self.stop_at_cex and step['is_cex']):
+            self.finished.add(address)
+
+    def _meet(self, address: str, step: Dict[str, Any]):
+        """Match a new step against the other paths, then index it."""
+        funder = step['address'].lower()
+        entity = step.get('entity')
+        for other, other_step in self._by_funder.get(funder, {}).items():
+            self._offer(address, step, other, other_step)
+        if entity:
+            for other, other_steps in self._by_entity.get(entity, {}).items():
+                for other_step in other_steps:
+                    if other_step['address'].lower() != funder:
+                        self._offer(address, step, other, other_step)
+            self._by_entity.setdefault(entity, {}).setdefault(address, []).append(step)
+        self._by_funder.setdefault(funder, {}).setdefault(address, step)
+
+    def _offer(self, address: str, step: Dict[str, Any], other: str, other_step: Dict[str, Any]):
+        if other == address:
+            return
+        if self._order[address] > self._order[other]:
+            address, step, other, other_step = other, other_step, address, step
+        pair = (address, other)
+        best = self.closest.get(pair)
+        if best is None or step['depth'] + other_step['depth'] < best['depth1'] + best['depth2']:
+            self.closest[pair] = relationship(step, other_step)
+
+    def _bound(self, address: str) -> Optional[int]:
+        """Smallest depth a step not found yet could have on this path."""
+        return None if address in self.finished else len(self.paths[address]) + 1
+
+    def _settled(self, first: str, second: str) -> bool:
+        bounds = [bound for bound in (self._bound(first), self._bound(second)) if bound is not None]
+        if not bounds:
+            return True
+        pair = (first, second) if self._order[first] < self._order[second] else (second, first)
+        best = self.closest.get(pair)
+        # A new meeting needs a new step on one side and at least depth 1 on the other
+        return best is not None and best['depth1'] + best['depth2'] <= min(bounds) + 1
+
+    def _needs_growth(self, address: str) -> bool:
+        if address in self.finished:
+            return False
+        return any(not self._settled(address, other) for other in self.addresses if other != address)
+
+
+class FundingForest:
+    """
+    The combined first-fund chains of many addresses, resolved in one traversal.
+
+    Every chain runs from an address (depth 0) up through its funders, at most
+    ``max_depth`` hops. As each address has a single first funder, two chains that
+    meet share every funder above the meeting point, so the lowest common funder
+    of any two addresses is the first address on one chain found on the other.
+    With ``stop_at_cex``, chains end below an exchange funder, so a shared
+    exchange does not relate the addresses it funded.
+    """
+
+    def __init__(self, graph: FundingGraph, addresses: Iterable[str], max_depth: int = 20, stop_at_cex: bool = True):
+        self.graph = graph
+        self.addresses = list(dict.fromkeys(addresses))
+        self.max_depth = max_depth
+        self.stop_at_cex = stop_at_cex
+        # Address -> [(chain address, tx funding the address below it)], depth by position
+        self.chains: Dict[str, List[Any]] = {}
+        self.depths: Dict[str, Dict[str, int]] = {}
+        # Lowercase chain address -> input addresses whose chain passes through it
+        self.reach: Dict[str, List[str]] = {}
+
+    async def build(self) -> 'FundingForest':
+        """Resolve all chains level by level, then index them."""
+        await self.graph.expand(self.addresses, self.max_depth, self.stop_at_cex)
+        for address in self.addresses:
+            chain = self._chain(address)
+            self.chains[address] = chain
+            self.depths[address] = {}
+            for depth, (node, _) in enumerate(chain):
+                self.depths[address].setdefault(node.lower(), depth)
+                self.reach.setdefault(node.lower(), []).append(address)
+        return self
+
+    def _chain(self, address: str) -> List[Any]:
+        chain = [(address, None)]
+        seen = {address.lower()}
+        current = address
+        while len(chain) <= self.max_depth:
+            edge = self.graph.edge(current)
+            if edge is None or edge.funder.lower() in seen:
+                break
+            if self.stop_at_cex and self.graph.is_cex(edge.funder):
+                break
+            seen.add(edge.funder.lower())
+            chain.append((edge.funder, edge.tx_hash))
+            current = edge.funder
+        return chain
+
+    def relationship(self, first: str, second: str, min_depth: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Lowest common funder of two addresses of the forest.
+
+        Args:
+            first: An address the forest was built for
+            second: Another address the forest was built for
+            min_depth: Skip common funders fewer hops than this from either address
+
+        Returns:
+            Optional[Dict[str, Any]]: ``common_funder``, its depth from each address
+            (``depth1``, ``depth2``, 0 when it is the address itself) and the tx it
+            funded each side with (``tx_hash1``, ``tx_hash2``); None if unrelated
+        """
+        second_depths = self.depths[second]
+        for depth, (node, tx_hash) in enumerate(self.chains[first]):
+            second_depth = second_depths.get(node.lower())
+            if second_depth is not None and min(depth, second_depth) >= min_depth:
+                return {
+                    'common_funder': node,
+                    'depth1': depth,
+                    'depth2': second_depth,
+                    'tx_hash1': tx_hash,
+                    'tx_hash2': self.chains[second][second_depth][1]
+                }
+        return None
+
+    def components(self) -> List[List[str]]:
+        """Groups of addresses linked by shared funders, each in input order."""
+        parent = {address: address for address in self.addresses}
+
+        def find(address: str) -> str:
+            while parent[address] != address:
+                parent[address] = parent[parent[address]]
+                address = parent[address]
+            return address
+
+        for addresses in self.reach.values():
+            root = find(addresses[0])
+            for address in addresses[1:]:
+                parent[find(address)] = root
+
+        groups: Dict[str, List[str]] = {}
+        for address in self.addresses:
+            groups.setdefault(find(address), []).append(address)
+        return list(groups.values())
+
+    def common_funder(self, addresses: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Lowest funder shared by every given address, with its depth from each.
+
+        Chains cut by max_depth can leave a linked group without one; None then.
+        """
+        wanted = set(addresses)
+        for node, _ in self.chains[addresses[0]]:
+            if wanted.issubset(self.reach[node.lower()]):
+                return {
+                    'common_funder': node,
+                    'depths': {address: self.depths[address][node.lower()] for address in addresses}
+                }
+        return None
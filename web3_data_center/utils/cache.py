@@ -1,10 +1,17 @@
 import os
+import sys
 import json
 import time
+import itertools
+import sqlite3
 import hashlib
+import inspect
 import functools
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Callable, Optional, TypeVar, Dict
+from typing import Any, Callable, Optional, TypeVar, Dict, Tuple, Union, Iterable, Iterator, List, NamedTuple
 
 from ..utils.logger import get_logger
 
@@ -18,6 +25,430 @@ def get_cache_dir() -> Path:
     cache_dir.mkdir(parents=True, exist_ok=True)
     return cache_dir
 
+_MISSING = object()
+
+
+def approximate_size(obj: Any, _depth: int = 0) -> int:
+    """
+    Estimate the memory footprint of a JSON-like object in bytes.
+
+    Large containers are sampled and extrapolated, with smaller samples deeper in the
+    structure, so sizing a huge search result stays cheap.
+    """
+    size = sys.getsizeof(obj)
+    sample_size = max(1, 32 >> _depth)
+    if isinstance(obj, dict):
+        if obj:
+            sample = list(itertools.islice(obj.items(), sample_size))
+            sampled = sum(approximate_size(k, _depth + 1) + approximate_size(v, _depth + 1) for k, v in sample)
+            size += sampled * len(obj) // len(sample)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        if obj:
+            sample = list(itertools.islice(obj, sample_size))
+            size += sum(approximate_size(item, _depth + 1) for item in sample) * len(obj) // len(sample)
+    elif hasattr(obj, '__dict__'):
+        size += approximate_size(vars(obj), _depth + 1)
+    return size
+
+
+class LRUCache:
+    """
+    In-memory LRU cache with optional per-entry expiry.
+
+    Least recently used entries are evicted once the cache holds more than
+    ``max_entries`` entries or, if ``max_bytes`` is set, more than roughly that many
+    bytes as estimated by :func:`approximate_size`. Entries larger than ``max_bytes``
+    on their own are not stored. Operations never await, so the cache is safe to
+    share between coroutines on one event loop.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._data: "OrderedDict[str, Tuple[Any, Optional[float], int]]" = OrderedDict()  # key -> (value, expires_at, size)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        value, expires_at, _ = entry
+        if expires_at is not None and expires_at <= time.time():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        size = approximate_size(value) if self.max_bytes else 0
+        self._remove(key)
+        if self.max_bytes and size > self.max_bytes:
+            self.rejections += 1
+            return
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._data[key] = (value, expires_at, size)
+        self.total_bytes += size
+        while len(self._data) > self.max_entries or (self.max_bytes and self.total_bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._data.popitem(last=False)
+            self.total_bytes -= evicted_size
+            self.evictions += 1
+
+    def _remove(self, key: str) -> Optional[Tuple[Any, Optional[float], int]]:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+        return entry
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        entry = self._remove(key)
+        return entry[0] if entry is not None else default
+
+    def clear(self):
+        self._data.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._data),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'rejections': self.rejections
+        }
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and (entry[1] is None or entry[1] > time.time())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _SQLiteTable:
+    """
+    One table in a SQLite file in WAL mode, behind a thread-safe connection.
+
+    WAL mode lets several processes read and write the same file safely. The lock
+    lets the store be used from executor threads as well as the event loop.
+    """
+
+    # SQLite's default limit on bound parameters per statement
+    MAX_PARAMS = 999
+
+    def __init__(self, path: Union[str, Path], table: str, *schema: str):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in schema:
+            self._conn.execute(statement)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the lock and run the block in one transaction, rolled back on error."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _select_in(self, columns: str, key_column: str, keys: List[Any]) -> List[Tuple]:
+        """Rows whose ``key_column`` is in ``keys``, queried in chunks of MAX_PARAMS."""
+        rows = []
+        with self._lock:
+            for i in range(0, len(keys), self.MAX_PARAMS):
+                chunk = keys[i:i + self.MAX_PARAMS]
+                rows.extend(self._conn.execute(
+                    f"SELECT {columns} FROM {self.table} WHERE {key_column} IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall())
+        return rows
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class SQLiteStore(_SQLiteTable):
+    """
+    On-disk key-value store backed by SQLite in WAL mode.
+
+    Values are stored as JSON. Lookups are keyed by primary key and expired rows are
+    dropped lazily when read, so no operation scans the whole store.
+    """
+
+    def __init__(self, path: Union[str, Path], table: str = "kv"):
+        super().__init__(
+            path, table,
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL)",
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_created_at ON {table} (created_at)"
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return default
+            value, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return default
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, expires_at)
+            )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def evict(self, max_entries: int):
+        """Drop expired rows, then the oldest rows beyond ``max_entries``."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),))
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (max_entries,)
+            )
+
+
+class TxLocation(NamedTuple):
+    block_number: int
+    tx_index: Optional[int]
+    index: Optional[str]
+
+
+def _hash_key(tx_hash: str) -> Optional[bytes]:
+    """A hex transaction hash as raw bytes, or None if it is not hex."""
+    digits = tx_hash[2:] if tx_hash[:2].lower() == '0x' else tx_hash
+    if len(digits) % 2:
+        digits = '0' + digits
+    try:
+        return bytes.fromhex(digits)
+    except ValueError:
+        return None
+
+
+class TxLocationStore(_SQLiteTable):
+    """
+    On-disk table from transaction hash to the block, position and index holding it.
+
+    Hashes are stored as raw bytes in a clustered SQLite B-tree, so a lookup is an
+    O(log n) local read. Rows are only ever added or overwritten with the same
+    location, so there is no expiry.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        super().__init__(
+            path, "tx_locations",
+            "CREATE TABLE IF NOT EXISTS tx_locations ("
+            "hash BLOB PRIMARY KEY, block_number INTEGER NOT NULL, tx_index INTEGER, index_name TEXT"
+            ") WITHOUT ROWID"
+        )
+
+    def get(self, tx_hash: str) -> Optional[TxLocation]:
+        return self.get_many([tx_hash]).get(tx_hash)
+
+    def get_many(self, tx_hashes: Iterable[str]) -> Dict[str, TxLocation]:
+        """Locations of the given hashes that are in the table, keyed as passed in."""
+        keys = {}
+        for tx_hash in tx_hashes:
+            key = _hash_key(tx_hash)
+            if key is not None:
+                keys.setdefault(key, []).append(tx_hash)
+        found = {}
+        for key, block_number, tx_index, index_name in self._select_in("hash, block_number, tx_index, index_name",
+                                                                       "hash", list(keys)):
+            for tx_hash in keys[bytes(key)]:
+                found[tx_hash] = TxLocation(block_number, tx_index, index_name)
+        return found
+
+    def put_many(self, rows: Iterable[Tuple[str, int, Optional[int], Optional[str]]]) -> int:
+        """
+        Insert or update (tx_hash, block_number, tx_index, index_name) rows.
+
+        Returns:
+            int: Number of rows written
+        """
+        values = []
+        for tx_hash, block_number, tx_index, index_name in rows:
+            key = _hash_key(tx_hash) if tx_hash else None
+            if key is not None and block_number is not None:
+                values.append((key, int(block_number), None if tx_index is None else int(tx_index), index_name))
+        if not values:
+            return 0
+        with self._transaction() as conn:
+            # Keep a known index name and position when a later row lacks them
+            conn.executemany(
+                "INSERT INTO tx_locations (hash, block_number, tx_index, index_name) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(hash) DO UPDATE SET block_number = excluded.block_number, "
+                "tx_index = COALESCE(excluded.tx_index, tx_index), "
+                "index_name = COALESCE(excluded.index_name, index_name)",
+                values
+            )
+        return len(values)
+
+
+class FundingEdgeStore(_SQLiteTable):
+    """
+    On-disk table of first-fund edges: address -> (funder, funding tx hash).
+
+    An address's first funder never changes once it exists, so edges are kept
+    forever. "No funder yet" can change, so those rows are only trusted for
+    ``negative_ttl`` seconds. Addresses are stored lowercase.
+    """
+
+    def __init__(self, path: Union[str, Path], negative_ttl: float = 24 * 3600):
+        super().__init__(
+            path, "funding_edges",
+            "CREATE TABLE IF NOT EXISTS funding_edges ("
+            "address TEXT PRIMARY KEY, funder TEXT, tx_hash TEXT, checked_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self.negative_ttl = negative_ttl
+
+    def get_many(self, addresses: Iterable[str]) -> Dict[str, Optional[Tuple[str, str]]]:
+        """
+        Known edges of the given addresses, keyed as passed in.
+
+        Returns:
+            Dict mapping an address to (funder, tx_hash), or to None if it had no
+            funder when last checked; unknown addresses are left out
+        """
+        keys: Dict[str, List[str]] = {}
+        for address in addresses:
+            if address:
+                keys.setdefault(address.lower(), []).append(address)
+        found = {}
+        fresh_after = time.time() - self.negative_ttl
+        for key, funder, tx_hash, checked_at in self._select_in("address, funder, tx_hash, checked_at",
+                                                                "address", list(keys)):
+            if funder is None and checked_at < fresh_after:
+                continue
+            for address in keys[key]:
+                found[address] = (funder, tx_hash) if funder is not None else None
+        return found
+
+    def put_many(self, edges: Dict[str, Optional[Tuple[str, str]]]) -> int:
+        """Record (funder, tx_hash) per address, or None for addresses with no funder."""
+        now = time.time()
+        values = [
+            (address.lower(), edge[0] if edge else None, edge[1] if edge else None, now)
+            for address, edge in edges.items() if address
+        ]
+        if not values:
+            return 0
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO funding_edges (address, funder, tx_hash, checked_at) VALUES (?, ?, ?, ?)",
+                values
+            )
+        return len(values)
+
+
+class ResponseCache:
+    """
+    Two-tier cache for provider responses: an in-memory LRU in front of an optional
+    SQLite store.
+
+    Each entry is fresh for ``ttl`` seconds (``None`` means it never expires) and may
+    then be served stale for another ``stale`` seconds while the caller refreshes it.
+    """
+
+    _shared: Optional['ResponseCache'] = None
+
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[Union[str, Path]] = None):
+        self.memory = LRUCache(max_entries)
+        self.disk = SQLiteStore(disk_path, table="responses") if disk_path else None
+
+    @classmethod
+    def shared(cls, settings: Optional[Dict[str, Any]] = None) -> 'ResponseCache':
+        """
+        Return the process-wide response cache, creating it from ``settings`` on first use.
+
+        Settings come from the ``response_cache`` section of config.yml:
+        ``max_entries`` and ``disk`` (true, or a path to the SQLite file).
+        """
+        if cls._shared is None:
+            settings = settings or {}
+            disk = settings.get('disk')
+            if disk is True:
+                disk = get_cache_dir() / "responses.sqlite"
+            cls._shared = cls(max_entries=settings.get('max_entries', 10000), disk_path=disk or None)
+        return cls._shared
+
+    def get(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """Return ``(value, is_stale)`` for a cached response, or None on a miss."""
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                expires_at = entry['expires_at']
+                self.memory.set(key, entry, None if expires_at is None else max(0.0, expires_at - time.time()))
+        if entry is None:
+            return None
+        fresh_until = entry['fresh_until']
+        return entry['data'], fresh_until is not None and fresh_until <= time.time()
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, stale: float = 0):
+        now = time.time()
+        lifetime = None if ttl is None else ttl + stale
+        entry = {
+            'data': value,
+            'fresh_until': None if ttl is None else now + ttl,
+            'expires_at': None if lifetime is None else now + lifetime
+        }
+        self.memory.set(key, entry, lifetime)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, entry, lifetime)
+            except (TypeError, ValueError, sqlite3.Error) as e:
+                logger.error(f"Error writing response cache entry: {e}")
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
 def make_cache_key(*args, **kwargs) -> str:
     """Create a cache key from function arguments."""
     # Convert args and kwargs to a string representation
@@ -35,89 +466,65 @@ def file_cache(
 ):
     """
     A file-based caching decorator for async functions.
+
+    Entries are kept in a SQLite store at ``<cache dir>/<namespace>_cache.sqlite``, so
+    each call reads or writes a single row instead of the whole cache, and several
+    processes can share the cache safely. Expired entries are dropped when read.
     
     Args:
         namespace: Namespace for the cache (used in filename)
         ttl: Time to live in seconds (default: None, meaning no expiration)
         max_entries: Maximum number of entries in cache file (default: 1000)
     """
-    cache_dir = get_cache_dir()
-    cache_file = cache_dir / f"{namespace}_cache.json"
-    
-    def load_cache() -> Dict[str, Any]:
-        """Load cache from file."""
-        try:
-            if cache_file.exists():
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
-            return {}
-        except Exception as e:
-            logger.error(f"Error loading cache: {e}")
-            return {}
-    
-    def save_cache(cache: Dict[str, Any]):
-        """Save cache to file."""
-        try:
-            with open(cache_file, 'w') as f:
-                json.dump(cache, f)
-        except Exception as e:
-            logger.error(f"Error saving cache: {e}")
-    
-    def clean_expired(cache: Dict[str, Any]):
-        """Remove expired entries."""
-        if not ttl:
-            return cache
-            
-        current_time = time.time()
-        return {
-            k: v for k, v in cache.items()
-            if v.get('timestamp', 0) + ttl > current_time
-        }
-    
-    def clean_overflow(cache: Dict[str, Any]):
-        """Remove oldest entries if cache exceeds max size."""
-        if not max_entries or len(cache) <= max_entries:
-            return cache
-            
-        # Sort by timestamp and keep only the newest max_entries
-        sorted_items = sorted(
-            cache.items(),
-            key=lambda x: x[1].get('timestamp', 0),
-            reverse=True
-        )
-        return dict(sorted_items[:max_entries])
+    cache_file = get_cache_dir() / f"{namespace}_cache.sqlite"
+    store: Optional[SQLiteStore] = None
+    # Trimming to max_entries touches the index, so only do it every few writes
+    evict_every = max(1, (max_entries or 0) // 10)
+    writes_since_evict = 0
+
+    def get_store() -> SQLiteStore:
+        nonlocal store
+        if store is None:
+            store = SQLiteStore(cache_file, table="cache")
+        return store
     
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        parameters = list(inspect.signature(func).parameters)
+        is_method = bool(parameters) and parameters[0] in ("self", "cls")
+
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            # Generate cache key
-            key = make_cache_key(*args, **kwargs)
-            
-            # Load and clean cache
-            cache = load_cache()
-            cache = clean_expired(cache)
-            cache = clean_overflow(cache)
+            nonlocal writes_since_evict
+            # Leave out the bound instance: its repr changes between processes
+            key_args = args[1:] if is_method and args else args
+            key = make_cache_key(*key_args, **kwargs)
             
             # Check if we have a valid cached result
-            if key in cache:
-                return cache[key]['data']
+            try:
+                cached = get_store().get(key, _MISSING)
+            except sqlite3.Error as e:
+                logger.error(f"Error loading cache: {e}")
+                cached = _MISSING
+            if cached is not _MISSING:
+                return cached
             
             # Call the original function
             result = await func(*args, **kwargs)
             
             # Store result in cache
-            cache[key] = {
-                'data': result,
-                'timestamp': time.time()
-            }
-            
-            # Save updated cache
-            save_cache(cache)
+            try:
+                get_store().set(key, result, ttl)
+                writes_since_evict += 1
+                if max_entries and writes_since_evict >= evict_every:
+                    get_store().evict(max_entries)
+                    writes_since_evict = 0
+            except (TypeError, ValueError, sqlite3.Error) as e:
+                logger.error(f"Error saving cache: {e}")
             
             return result
         
         # Add clear cache method
-        wrapper.cache_clear = lambda: cache_file.unlink(missing_ok=True)
+        wrapper.cache_clear = lambda: get_store().clear()
         
         return wrapper
     
@@ -0,0 +1,76 @@
+"""
+JSON decoding with an optional fast path.
+
+orjson or msgspec are used when installed, otherwise the stdlib ``json`` module.
+Every backend raises ``json.JSONDecodeError`` on malformed input so callers (and
+retry policies) only need to handle one exception type.
+"""
+import dataclasses
+import json
+from typing import Any, Optional, Type, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speedup
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Optional speedup and typed decoding
+    msgspec = None
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+elif msgspec is not None:
+    JSON_BACKEND = "msgspec"
+else:
+    JSON_BACKEND = "json"
+
+
+def _as_decode_error(raw: Union[bytes, str], error: Exception) -> json.JSONDecodeError:
+    doc = raw.decode('utf-8', errors='replace') if isinstance(raw, bytes) else raw
+    return json.JSONDecodeError(str(error), doc, 0)
+
+
+def decode_json(raw: Union[bytes, str], type: Optional[Type] = None) -> Any:
+    """
+    Decode a JSON document from bytes or str.
+
+    Args:
+        raw: The JSON document, ideally the raw response bytes
+        type: Optional dataclass or msgspec Struct to decode into
+
+    Returns:
+        The decoded builtins, or an instance of ``type`` when given
+    """
+    if type is not None and msgspec is not None:
+        try:
+            return msgspec.json.decode(raw, type=type, strict=False)
+        except msgspec.DecodeError as e:
+            raise _as_decode_error(raw, e) from e
+    if orjson is not None:
+        # orjson.JSONDecodeError already subclasses json.JSONDecodeError
+        obj = orjson.loads(raw)
+    elif msgspec is not None:
+        try:
+            obj = msgspec.json.decode(raw)
+        except msgspec.DecodeError as e:
+            raise _as_decode_error(raw, e) from e
+    else:
+        obj = json.loads(raw)
+    return obj if type is None else convert(obj, type)
+
+
+def convert(obj: Any, type: Type) -> Any:
+    """
+    Convert decoded builtins into ``type``.
+
+    Uses msgspec when installed. Without it only dataclasses are supported: unknown
+    keys are dropped and anything that is not a dict is returned unchanged.
+    """
+    if msgspec is not None:
+        return msgspec.convert(obj, type, strict=False)
+    if dataclasses.is_dataclass(type) and isinstance(obj, dict):
+        names = {field.name for field in dataclasses.fields(type)}
+        return type(**{key: value for key, value in obj.items() if key in names})
+    return obj